@@ -3,11 +3,10 @@ Flask web application for campaign automation.
 Provides a user-friendly form interface for creating campaigns in HubSpot and Salesforce.
 """
 import os
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, flash, redirect, url_for
 from dotenv import load_dotenv
 from src.run_campaign import run as run_campaign
-import tempfile
-import yaml
+from src import metrics
 from pathlib import Path
 
 load_dotenv()
@@ -98,26 +97,11 @@ def create_campaign():
             flash("Please provide at least one member status (e.g., Registered, Attended)", "error")
             return redirect(url_for("index"))
         
-        # Create temporary YAML file
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
-            temp_path = f.name
+        # Run campaign creation (the config dict is validated before any API call)
+        result = run_campaign(config)
         
-        try:
-            # Run campaign creation
-            result = run_campaign(temp_path)
-            
-            # Clean up temp file
-            os.unlink(temp_path)
-            
-            # Render results page
-            return render_template("results.html", result=result, config=config)
-            
-        except Exception as e:
-            # Clean up temp file on error
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            raise e
+        # Render results page
+        return render_template("results.html", result=result, config=config)
             
     except Exception as e:
         flash(f"Error creating campaign: {str(e)}", "error")
@@ -131,6 +115,12 @@ def health():
     return jsonify({"status": "ok"})
 
 
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus metrics: stage timings, API calls per endpoint, rate-limit headroom."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     # Check if required environment variables are set
     required_vars = ["HUBSPOT_ACCESS_TOKEN", "SALESFORCE_USERNAME", "SALESFORCE_PASSWORD"]
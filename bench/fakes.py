@@ -0,0 +1,540 @@
+"""
+Local stand-ins for the HubSpot and Salesforce APIs used by the benchmarks.
+Each fake is a threaded HTTP server that keeps its state in memory and implements just the
+endpoints this repo calls, with configurable latency, rate limits, catalog sizes and error
+injection. GET /__bench/stats returns the requests served per endpoint. Multipart bodies (the
+Imports API) reach the fakes as {part name: bytes}.
+
+Run one in its own process (what bench.run does, so the fake's memory and CPU stay out of the
+measurements); it prints "READY <port>" once listening:
+
+    python -m bench.fakes hubspot '{"lists": 50000, "campaigns": 10000, "latency": 0.02}'
+    python -m bench.fakes salesforce '{"campaigns": 5000}'
+"""
+import csv
+import datetime
+import email
+import email.policy
+import io
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote_plus, urlsplit
+
+DEFAULTS = {
+    # Seconds added to every response (plus up to `jitter` seconds at random)
+    "latency": 0.02,
+    "jitter": 0.0,
+    # Requests allowed per `rate_interval` seconds (None = unlimited); 429 beyond that
+    "rate_limit": None,
+    "rate_interval": 10.0,
+    # Requests allowed per day, reported in rate-limit headers (403/429 once spent)
+    "daily_limit": 250000,
+    # Fraction of requests answered with error_status instead of being handled
+    "error_rate": 0.0,
+    "error_status": 503,
+    "error_methods": ["GET", "PUT", "DELETE"],
+    # Pre-existing catalog
+    "campaigns": 0,
+    "lists": 0,
+    "workflows": 0,
+    "seed": 1,
+}
+
+_ENDPOINT_IDS = re.compile(r"/(\d+|[0-9a-f]{8}-[0-9a-f-]{27}|[a-zA-Z0-9]{15})(?=/|$)")
+
+
+class FakeState:
+    """Request accounting, rate limiting and error injection shared by both fakes."""
+
+    def __init__(self, options: dict):
+        self.options = {**DEFAULTS, **options}
+        self.lock = threading.RLock()
+        self.random = random.Random(self.options["seed"])
+        self.requests: dict = {}
+        self.total = 0
+        self.rate_limited = 0
+        self.injected_errors = 0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._counter = 0
+
+    def next_id(self) -> int:
+        with self.lock:
+            self._counter += 1
+            return self._counter
+
+    def admit(self, method: str, path: str):
+        """Count a request; returns (status or None to handle it, rate-limit headers)."""
+        options = self.options
+        with self.lock:
+            self.total += 1
+            key = f"{method} {_ENDPOINT_IDS.sub('/{id}', path)}"
+            self.requests[key] = self.requests.get(key, 0) + 1
+            now = time.monotonic()
+            if now - self._window_start >= options["rate_interval"]:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            headers = self.limit_headers(now)
+            if self.total > options["daily_limit"]:
+                self.rate_limited += 1
+                return 429, headers
+            if options["rate_limit"] and self._window_count > options["rate_limit"]:
+                self.rate_limited += 1
+                headers["Retry-After"] = str(max(1, round(options["rate_interval"] - (now - self._window_start))))
+                return 429, headers
+            if options["error_rate"] and method in options["error_methods"] and self.random.random() < options["error_rate"]:
+                self.injected_errors += 1
+                return options["error_status"], headers
+        return None, headers
+
+    def limit_headers(self, now: float) -> dict:
+        return {}
+
+    def delay(self) -> None:
+        options = self.options
+        time.sleep(options["latency"] + (self.random.random() * options["jitter"] if options["jitter"] else 0))
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "total": self.total,
+                "rate_limited": self.rate_limited,
+                "injected_errors": self.injected_errors,
+                "requests": dict(sorted(self.requests.items())),
+            }
+
+
+class FakeHubSpot(FakeState):
+    """Campaigns, lists, campaign list assets, workflows, contact upserts and imports, list memberships."""
+
+    def __init__(self, options: dict):
+        super().__init__(options)
+        self.campaigns: dict = {}  # id -> campaign object
+        self.campaign_order: list = []  # ids, most recently updated first
+        self.campaign_names: dict = {}  # hs_name -> id
+        self.lists: dict = {}  # listId -> name
+        self.list_order: list = []
+        self.list_names: dict = {}  # name -> listId
+        self.assets: dict = {}  # campaign id -> [listId]
+        self.workflows: list = []
+        self.contacts: dict = {}  # email -> contact id
+        self.contact_ids: set = set()
+        self.members: dict = {}  # listId -> set of contact ids
+        self.imports: dict = {}  # import id -> import object
+        # Existing campaigns first, so they are the oldest in the catalog
+        for name in self.options.get("existing_campaigns", []):
+            self.seed_existing(name, self.options.get("existing_statuses", []))
+        for i in range(self.options["campaigns"]):
+            self.add_campaign({"hs_name": f"Catalog Campaign {i}"})
+        for i in range(self.options["lists"]):
+            self.add_list(f"Catalog List {i}")
+        for i in range(self.options["workflows"]):
+            self.workflows.append({"id": self.next_id(), "name": f"Catalog Workflow {i}"})
+
+    def limit_headers(self, now):
+        options = self.options
+        headers = {
+            "X-HubSpot-RateLimit-Daily": str(options["daily_limit"]),
+            "X-HubSpot-RateLimit-Daily-Remaining": str(max(0, options["daily_limit"] - self.total)),
+        }
+        if options["rate_limit"]:
+            headers.update({
+                "X-HubSpot-RateLimit-Max": str(options["rate_limit"]),
+                "X-HubSpot-RateLimit-Remaining": str(max(0, options["rate_limit"] - self._window_count)),
+                "X-HubSpot-RateLimit-Interval-Milliseconds": str(int(options["rate_interval"] * 1000)),
+            })
+        return headers
+
+    def _timestamp(self) -> str:
+        # Strictly increasing, so "most recently updated" ordering is well defined
+        moment = datetime.datetime(2024, 1, 1) + datetime.timedelta(seconds=self.next_id())
+        return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def add_campaign(self, properties: dict) -> dict:
+        campaign_id = "%08x-0000-4000-8000-%012x" % (self.random.getrandbits(32), self.next_id())
+        stamp = self._timestamp()
+        campaign = {"id": campaign_id, "properties": dict(properties), "createdAt": stamp, "updatedAt": stamp}
+        self.campaigns[campaign_id] = campaign
+        self.campaign_order.insert(0, campaign_id)
+        self.campaign_names[properties.get("hs_name")] = campaign_id
+        self.assets[campaign_id] = []
+        return campaign
+
+    def add_list(self, name: str) -> str:
+        list_id = str(self.next_id())
+        self.lists[list_id] = name
+        self.list_order.append(list_id)
+        self.list_names[name] = list_id
+        return list_id
+
+    def seed_existing(self, name: str, statuses: list) -> None:
+        """A campaign created before the rest of the catalog, with its segment lists associated."""
+        campaign = self.add_campaign({"hs_name": name})
+        for status in statuses:
+            self.assets[campaign["id"]].append(self.add_list(f"{name} - {status}"))
+
+    @staticmethod
+    def _page(items: list, query: dict, default_limit: int = 100):
+        offset = int(query.get("after", ["0"])[0] or 0)
+        limit = min(int(query.get("limit", [default_limit])[0]), 100)
+        page = items[offset:offset + limit]
+        paging = {"next": {"after": str(offset + limit)}} if offset + limit < len(items) else {}
+        return page, paging
+
+    def handle(self, method: str, path: str, query: dict, body):
+        with self.lock:
+            return self._route(method, path, query, body)
+
+    def _upsert_contacts(self, inputs: list):
+        if len(inputs) > 100:
+            return 400, {"status": "error", "category": "VALIDATION_ERROR", "message": "Batch size limit is 100"}
+        results, errors = [], []
+        for item in inputs:
+            email = str(item.get("id") or "").lower()
+            if "@" not in email:
+                errors.append({
+                    "status": "error",
+                    "category": "VALIDATION_ERROR",
+                    "message": f"Email address {email!r} is invalid",
+                    "context": {"ids": [email]},
+                })
+                continue
+            new = email not in self.contacts
+            if new:
+                self.contacts[email] = str(self.next_id())
+                self.contact_ids.add(self.contacts[email])
+            results.append({"id": self.contacts[email], "new": new, "properties": item.get("properties") or {}})
+        return (207 if errors else 200), {"status": "COMPLETE", "results": results, "errors": errors}
+
+    def _start_import(self, parts: dict):
+        """Run the import at once; it reports PROCESSING to the first status poll and DONE after."""
+        try:
+            request = json.loads(parts["importRequest"])
+            data = next(value for name, value in parts.items() if name != "importRequest")
+        except (KeyError, StopIteration, ValueError):
+            return 400, {"status": "error", "category": "VALIDATION_ERROR", "message": "Expected importRequest and a file"}
+        mappings = request["files"][0]["fileImportPage"]["columnMappings"]
+        email_column = next((m["columnName"] for m in mappings if m.get("propertyName") == "email"), None)
+        if email_column is None:
+            return 400, {"status": "error", "category": "VALIDATION_ERROR", "message": "No email column mapped"}
+        created = updated = total = 0
+        imported = set()
+        for row in csv.DictReader(io.StringIO(data.decode("utf-8-sig"))):
+            total += 1
+            address = (row.get(email_column) or "").strip().lower()
+            if "@" not in address:
+                continue
+            if address not in self.contacts:
+                self.contacts[address] = str(self.next_id())
+                self.contact_ids.add(self.contacts[address])
+                created += 1
+            elif self.contacts[address] not in imported:
+                updated += 1
+            imported.add(self.contacts[address])
+        import_id = str(self.next_id())
+        list_id = self.add_list(f"{request.get('name') or 'Import'} ({import_id})")
+        self.members[list_id] = imported
+        self.imports[import_id] = {
+            "id": import_id,
+            "state": "STARTED",
+            "polls": 0,
+            "metadata": {
+                "counters": {"TOTAL_ROWS": total, "CREATED_OBJECTS": created, "UPDATED_OBJECTS": updated},
+                "objectLists": [{"listId": list_id, "objectType": "CONTACT"}],
+            },
+        }
+        return 200, {"id": import_id, "state": "STARTED"}
+
+    def _route(self, method, path, query, body):
+        parts = path.strip("/").split("/")
+        if path == "/crm/v3/imports" and method == "POST":
+            return self._start_import(body or {})
+        if parts[:3] == ["crm", "v3", "imports"] and len(parts) == 4 and method == "GET":
+            record = self.imports.get(parts[3])
+            if record is None:
+                return 404, {"message": "Import not found"}
+            record["polls"] += 1
+            record["state"] = "PROCESSING" if record["polls"] == 1 else "DONE"
+            return 200, {key: value for key, value in record.items() if key != "polls"}
+        if path == "/marketing/v3/campaigns":
+            if method == "GET":
+                page, paging = self._page(self.campaign_order, query)
+                return 200, {"results": [self.campaigns[c] for c in page], "paging": paging}
+            if method == "POST":
+                properties = (body or {}).get("properties") or {}
+                if properties.get("hs_name") in self.campaign_names:
+                    return 409, {"status": "error", "category": "CONFLICT", "message": "Campaign already exists"}
+                return 201, self.add_campaign(properties)
+        if parts[:3] == ["marketing", "v3", "campaigns"] and len(parts) >= 4:
+            campaign = self.campaigns.get(parts[3])
+            if campaign is None:
+                return 404, {"message": "Campaign not found"}
+            if len(parts) == 4 and method == "GET":
+                return 200, campaign
+            if len(parts) == 4 and method == "PATCH":
+                campaign["properties"].update((body or {}).get("properties") or {})
+                campaign["updatedAt"] = self._timestamp()
+                self.campaign_order.remove(campaign["id"])
+                self.campaign_order.insert(0, campaign["id"])
+                return 200, campaign
+            if parts[4:] == ["assets"] and method == "GET":
+                lists = [{"id": list_id, "name": self.lists[list_id]} for list_id in self.assets[campaign["id"]]]
+                return 200, {"assets": {"OBJECT_LIST": lists}}
+            if parts[4:6] == ["assets", "OBJECT_LIST"] and len(parts) == 7 and method == "PUT":
+                if parts[6] not in self.lists:
+                    return 404, {"message": "List not found"}
+                if parts[6] not in self.assets[campaign["id"]]:
+                    self.assets[campaign["id"]].append(parts[6])
+                return 204, None
+        if path == "/crm/v3/lists":
+            if method == "GET":
+                page, paging = self._page(self.list_order, query)
+                return 200, {"lists": [{"listId": l, "name": self.lists[l]} for l in page], "paging": paging}
+            if method == "POST":
+                name = (body or {}).get("name")
+                if name in self.list_names:
+                    return 400, {"status": "error", "subCategory": "ILS.DUPLICATE_LIST_NAMES", "message": "Duplicate list name"}
+                list_id = self.add_list(name)
+                return 200, {"list": {"listId": list_id, "name": name}}
+        if path == "/crm/v3/lists/search" and method == "POST":
+            text = ((body or {}).get("query") or "").lower()
+            offset, count = int(body.get("offset") or 0), int(body.get("count") or 20)
+            matches = [l for l in self.list_order if text in self.lists[l].lower()]
+            page = matches[offset:offset + count]
+            return 200, {
+                "lists": [{"listId": l, "name": self.lists[l]} for l in page],
+                "hasMore": offset + count < len(matches),
+                "offset": offset + len(page),
+            }
+        if path == "/crm/v3/objects/contacts/batch/upsert" and method == "POST":
+            return self._upsert_contacts((body or {}).get("inputs") or [])
+        if parts[:3] == ["crm", "v3", "lists"] and parts[4:] == ["memberships", "add"] and method == "PUT":
+            if parts[3] not in self.lists:
+                return 404, {"message": "List not found"}
+            members = self.members.setdefault(parts[3], set())
+            known = {str(contact_id) for contact_id in (body or []) if str(contact_id) in self.contact_ids}
+            added = sorted(known - members)
+            members.update(added)
+            missing = [str(contact_id) for contact_id in (body or []) if str(contact_id) not in known]
+            return 200, {"recordIdsAdded": added, "recordIdsMissing": missing}
+        if parts[:3] == ["crm", "v3", "lists"] and parts[4:6] == ["memberships", "add-from"] and len(parts) == 7 and method == "PUT":
+            if parts[3] not in self.lists or parts[6] not in self.lists:
+                return 404, {"message": "List not found"}
+            self.members.setdefault(parts[3], set()).update(self.members.get(parts[6], set()))
+            return 204, None
+        if path == "/automation/v3/workflows":
+            if method == "GET":
+                return 200, {"workflows": self.workflows}
+            if method == "POST":
+                workflow = {"id": self.next_id(), "name": (body or {}).get("name"), "actions": (body or {}).get("actions", [])}
+                self.workflows.append(workflow)
+                return 200, workflow
+        return 404, {"message": f"No fake for {method} {path}"}
+
+
+class FakeSalesforce(FakeState):
+    """Campaign and CampaignMemberStatus through REST, SOQL queries and the Composite API."""
+
+    VERSION_PREFIX = re.compile(r"^/services/data/v[\d.]+")
+
+    def __init__(self, options: dict):
+        options = {"daily_limit": 15000, **options}
+        super().__init__(options)
+        self.campaigns: dict = {}  # Id -> record
+        self.statuses: dict = {}  # Id -> CampaignMemberStatus record
+        self.campaign_statuses: dict = {}  # Campaign Id -> [CampaignMemberStatus Id]
+        for name in self.options.get("existing_campaigns", []):
+            self.add_campaign({"Name": name})
+        for i in range(self.options["campaigns"]):
+            self.add_campaign({"Name": f"Catalog Campaign {i}"})
+
+    def limit_headers(self, now):
+        return {"Sforce-Limit-Info": f"api-usage={self.total}/{self.options['daily_limit']}"}
+
+    def _sf_id(self, prefix: str) -> str:
+        return f"{prefix}{self.next_id():012d}"
+
+    def add_campaign(self, fields: dict) -> str:
+        campaign_id = self._sf_id("701")
+        self.campaigns[campaign_id] = {"Id": campaign_id, **fields, "CreatedDate": self.next_id()}
+        self.campaign_statuses[campaign_id] = []
+        # Salesforce creates these two for every campaign
+        for sort_order, label in enumerate(("Sent", "Responded"), start=1):
+            self.add_status({
+                "CampaignId": campaign_id, "Label": label, "SortOrder": sort_order,
+                "IsDefault": label == "Sent", "HasResponded": label == "Responded",
+            })
+        return campaign_id
+
+    def add_status(self, fields: dict):
+        if fields.get("CampaignId") not in self.campaigns:
+            return None, [{"errorCode": "INVALID_CROSS_REFERENCE_KEY", "message": "invalid CampaignId"}]
+        siblings = self.campaign_statuses[fields["CampaignId"]]
+        if any(self.statuses[s]["Label"].lower() == str(fields.get("Label")).lower() for s in siblings):
+            return None, [{"errorCode": "DUPLICATE_VALUE", "message": "duplicate value found: Label"}]
+        status_id = self._sf_id("01Y")
+        self.statuses[status_id] = {"Id": status_id, **fields}
+        siblings.append(status_id)
+        return status_id, None
+
+    def query(self, soql: str) -> dict:
+        literals = [unquote_plus(m).replace("\\'", "'") for m in re.findall(r"'((?:[^'\\]|\\.)*)'", soql)]
+        sobject = "Campaign"
+        if re.search(r"FROM\s+CampaignMemberStatus", soql, re.I):
+            sobject = "CampaignMemberStatus"
+            records = [self.statuses[s] for s in self.campaign_statuses.get(literals[0] if literals else None, [])]
+        elif re.search(r"FROM\s+Campaign\b", soql, re.I):
+            names = {literal.lower() for literal in literals}
+            records = sorted(
+                (c for c in self.campaigns.values() if str(c.get("Name", "")).lower() in names),
+                key=lambda c: c["CreatedDate"],
+            )
+            if re.search(r"LIMIT\s+1\b", soql, re.I):
+                records = records[:1]
+        else:
+            records = []
+        return {"totalSize": len(records), "done": True, "records": [
+            {"attributes": {"type": sobject}, **record} for record in records
+        ]}
+
+    def handle(self, method: str, path: str, query: dict, body):
+        with self.lock:
+            return self._route(method, self.VERSION_PREFIX.sub("", path), query, body)
+
+    def _route(self, method, path, query, body):
+        if path.rstrip("/") in ("/query", "/queryAll") and method == "GET":
+            return 200, self.query(query.get("q", [""])[0])
+        if path == "/sobjects/Campaign" and method == "POST":
+            if not (body or {}).get("Name"):
+                return 400, [{"errorCode": "REQUIRED_FIELD_MISSING", "message": "Required fields are missing: [Name]"}]
+            return 201, {"id": self.add_campaign(body), "success": True, "errors": []}
+        match = re.match(r"^/sobjects/Campaign/(\w+)$", path)
+        if match and method == "PATCH":
+            if match.group(1) not in self.campaigns:
+                return 404, [{"errorCode": "NOT_FOUND", "message": "not found"}]
+            self.campaigns[match.group(1)].update(body or {})
+            return 204, None
+        if path == "/sobjects/CampaignMemberStatus" and method == "POST":
+            status_id, errors = self.add_status(body or {})
+            return (201, {"id": status_id, "success": True, "errors": []}) if status_id else (400, errors)
+        if path == "/composite/sobjects" and method in ("POST", "PATCH"):
+            results = []
+            for record in (body or {}).get("records", []):
+                fields = {k: v for k, v in record.items() if k not in ("attributes", "id")}
+                if method == "POST":
+                    status_id, errors = self.add_status(fields)
+                    results.append({"id": status_id, "success": bool(status_id), "errors": [
+                        {"statusCode": e["errorCode"], "message": e["message"]} for e in errors or []
+                    ]})
+                elif record.get("id") in self.statuses:
+                    self.statuses[record["id"]].update(fields)
+                    results.append({"id": record["id"], "success": True, "errors": []})
+                else:
+                    results.append({"id": record.get("id"), "success": False, "errors": [
+                        {"statusCode": "ENTITY_IS_DELETED", "message": "entity is deleted"}
+                    ]})
+            return 200, results
+        if path == "/composite" and method == "POST":
+            return 200, {"compositeResponse": self._composite((body or {}).get("compositeRequest", []))}
+        return 404, [{"errorCode": "NOT_FOUND", "message": f"No fake for {method} {path}"}]
+
+    def _composite(self, subrequests: list) -> list:
+        responses = []
+        references = {}
+
+        def substitute(value):
+            text = json.dumps(value)
+            for ref, result in references.items():
+                text = text.replace("@{" + ref + ".id}", str(result.get("id", "")))
+            return json.loads(text)
+
+        for subrequest in subrequests:
+            url = urlsplit(substitute(subrequest["url"]))
+            status, body = self._route(
+                subrequest["method"], self.VERSION_PREFIX.sub("", url.path), parse_qs(url.query), substitute(subrequest.get("body"))
+            )
+            if isinstance(body, dict):
+                references[subrequest["referenceId"]] = body
+            responses.append({"referenceId": subrequest["referenceId"], "httpStatusCode": status, "body": body})
+        return responses
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeState = None
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle + delayed ACK add ~40ms a call
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, status: int, body, headers: dict) -> None:
+        data = b"" if body is None or status == 204 else json.dumps(body).encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self) -> None:
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if url.path == "/__bench/stats":
+            self._respond(200, self.fake.stats(), {})
+            return
+        status, headers = self.fake.admit(self.command, url.path)
+        self.fake.delay()
+        if status is not None:
+            self._respond(status, {"status": "error", "message": "injected by bench fake"}, headers)
+            return
+        content_type = self.headers.get("Content-Type") or ""
+        try:
+            if content_type.startswith("multipart/"):
+                message = email.message_from_bytes(
+                    f"Content-Type: {content_type}\r\n\r\n".encode() + raw, policy=email.policy.HTTP
+                )
+                body = {
+                    part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                    for part in message.iter_parts()
+                }
+            else:
+                body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+        status, payload = self.fake.handle(self.command, url.path, parse_qs(url.query), body)
+        self._respond(status, payload, headers)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+FAKES = {"hubspot": FakeHubSpot, "salesforce": FakeSalesforce}
+
+
+def serve(kind: str, options: dict, port: int = 0) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {"fake": FAKES[kind](options)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    kind = sys.argv[1]
+    options = json.loads(sys.argv[2]) if len(sys.argv) > 2 else {}
+    server = serve(kind, options)
+    print(f"READY {server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+"""
+Offline end-to-end benchmarks.
+Starts the HubSpot and Salesforce stand-ins (bench/fakes.py) on localhost, points the clients at
+them and drives the real entry points: run_campaign.run, the webhook endpoint, the
+create_workflows_for_existing_campaign helper and the batch runner. Each scenario reports wall
+time, API calls (as the clients saw them and as the fakes served them) and peak Python memory.
+Results are written as JSON, so two commits can be compared:
+
+    python -m bench.run                                    # every scenario -> bench/results/<commit>.json
+    python -m bench.run --scenario large_catalog --repeat 3
+    python -m bench.run --output before.json               # on the old commit, then on the new one:
+    python -m bench.run --compare before.json
+
+Nothing here reaches the real APIs. Client-side pacing is raised (HUBSPOT_RATE_LIMIT_PER_SECOND,
+unless set) so wall time reflects the code rather than the token bucket; the fakes enforce their
+own limits where a scenario asks for them. Memory is measured with tracemalloc, which also slows
+allocation-heavy code down: compare wall times between bench runs, not with production.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+# Module-level settings in src are read at import time, so these go first
+_WORKDIR = tempfile.mkdtemp(prefix="campaign-bench-")
+os.environ["CAMPAIGN_JOURNAL_PATH"] = os.path.join(_WORKDIR, "journal.sqlite3")
+os.environ.setdefault("HUBSPOT_RATE_LIMIT_PER_SECOND", "1000")
+os.environ.setdefault("HUBSPOT_RATE_LIMIT_BURST", "100")
+# Empty values are kept by load_dotenv, so a developer's .env cannot turn these on mid-benchmark
+for _name in ("CAMPAIGN_TRACE_FILE", "CAMPAIGN_TRACE_OTLP_ENDPOINT", "ZAPIER_CAMPAIGN_CREATED_WEBHOOK"):
+    os.environ[_name] = ""
+
+import requests
+import yaml
+from requests.adapters import HTTPAdapter
+from simple_salesforce import Salesforce
+
+from src import batch, contact_clean, contact_upload, hubspot_client, journal, run_campaign, salesforce_client, transport
+from src.transport import RetryingSession
+
+import create_workflows_for_existing_campaign as helper
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "bench" / "results"
+
+# simple_salesforce always builds https://<instance>/ URLs; this host is rerouted to the fake
+SALESFORCE_INSTANCE = "salesforce.bench"
+
+STATUSES = ["Registered", "Attended", "No Show"]
+EXISTING_CAMPAIGN = "Bench Existing Campaign"
+PARENT_CAMPAIGN = "Bench Parent Program"
+
+LARGE_HUBSPOT = {
+    "campaigns": 10000,
+    "lists": 50000,
+    "workflows": 2000,
+    "existing_campaigns": [EXISTING_CAMPAIGN],
+    "existing_statuses": STATUSES,
+}
+LARGE_SALESFORCE = {"campaigns": 10000, "existing_campaigns": [EXISTING_CAMPAIGN, PARENT_CAMPAIGN]}
+
+# Contacts in the upload scenario's CSV; every 100th row has no email
+UPLOAD_ROWS = 50000
+
+SCENARIOS: dict = {}
+
+
+def scenario(name: str, hubspot: dict = None, salesforce: dict = None, setup=None):
+    """
+    Register a benchmark: action(backends) runs once per repeat, against fresh fakes.
+    setup(backends), if given, runs first and is not measured.
+    """
+
+    def register(action):
+        SCENARIOS[name] = {
+            "action": action,
+            "setup": setup,
+            "description": (action.__doc__ or "").strip(),
+            "hubspot": hubspot or {},
+            "salesforce": {"existing_campaigns": [PARENT_CAMPAIGN], **(salesforce or {})},
+        }
+        return action
+
+    return register
+
+
+def campaign_config(name: str, statuses=STATUSES) -> dict:
+    return {
+        "name": name,
+        "start_date": "2026-03-01",
+        "end_date": "2026-03-02",
+        "tags": ["bench"],
+        "hubspot": {"auto_create_segments": list(statuses)},
+        "salesforce": {"parent_campaign": PARENT_CAMPAIGN, "member_statuses": list(statuses)},
+    }
+
+
+def unique_name(prefix: str) -> str:
+    return f"{prefix} {uuid.uuid4().hex[:8]}"
+
+
+@scenario("fresh")
+def bench_fresh(backends):
+    """run_campaign.run: new campaign with three segments in an empty portal."""
+    run_campaign.run(campaign_config(unique_name("Bench Fresh")))
+
+
+@scenario("large_catalog", hubspot=LARGE_HUBSPOT, salesforce=LARGE_SALESFORCE)
+def bench_large_catalog(backends):
+    """run_campaign.run re-run of an existing campaign in a 10k campaign / 50k list portal."""
+    run_campaign.run(campaign_config(EXISTING_CAMPAIGN))
+
+
+@scenario(
+    "flaky",
+    hubspot={"error_rate": 0.3, "rate_limit": 6, "rate_interval": 1.0, "jitter": 0.02},
+    salesforce={"error_rate": 0.3, "jitter": 0.02},
+)
+def bench_flaky(backends):
+    """run_campaign.run against APIs that rate-limit and fail 30% of idempotent calls with 503."""
+    run_campaign.run(campaign_config(unique_name("Bench Flaky")))
+
+
+@scenario("webhook")
+def bench_webhook(backends):
+    """Synchronous POST /webhook/campaign-create with form fields, as the landing page sends it."""
+    # Imported here: the Flask app is only needed by this scenario
+    import webhook_server
+
+    response = webhook_server.app.test_client().post(
+        "/webhook/campaign-create",
+        data={
+            "campaign_name": unique_name("Bench Webhook"),
+            "campaign_start_date": "03/01/26",
+            "campaign_end_date": "03/02/26",
+            "campaign_member_statuses": ", ".join(STATUSES),
+            "parent_campaign": PARENT_CAMPAIGN,
+        },
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"webhook returned {response.status_code}: {response.get_data(as_text=True)[:500]}")
+
+
+@scenario("helper_workflows", hubspot=LARGE_HUBSPOT, salesforce=LARGE_SALESFORCE)
+def bench_helper_workflows(backends):
+    """create_workflows_for_existing_campaign for a campaign the journal does not know (name searches)."""
+    argv = sys.argv
+    sys.argv = ["create_workflows_for_existing_campaign.py", EXISTING_CAMPAIGN] + STATUSES
+    try:
+        helper.main()
+    except SystemExit as e:
+        if e.code:
+            raise RuntimeError(f"helper exited with {e.code}") from e
+    finally:
+        sys.argv = argv
+
+
+@scenario("batch")
+def bench_batch(backends):
+    """batch.run_batch: ten new campaigns from one multi-document YAML file, four at a time."""
+    path = os.path.join(backends.workdir, "batch.yaml")
+    with open(path, "w") as f:
+        yaml.safe_dump_all([campaign_config(unique_name("Bench Batch")) for _ in range(10)], f)
+    rows = batch.run_batch(path, workers=4)
+    failed = [row for row in rows if row["status"] != "created"]
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(rows)} campaigns failed: {failed[0]['error']}")
+
+
+def write_contacts_csv(backends):
+    path = os.path.join(backends.workdir, "contacts.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Email", "firstname", "lastname", "company"])
+        for i in range(UPLOAD_ROWS):
+            email = "" if i % 100 == 99 else f"Attendee.{i}@Example.com "
+            writer.writerow([email, f"First{i}", f"Last{i}", f"Company {i % 500}"])
+    backends.contacts_csv = path
+
+
+def write_messy_contacts_csv(backends):
+    """UPLOAD_ROWS rows under export-style headers: a tenth repeat an earlier email, a hundredth have none."""
+    path = os.path.join(backends.workdir, "messy_contacts.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Email Address", "First Name", "Last Name", "Company Name"])
+        for i in range(UPLOAD_ROWS):
+            person = i - 2 if i % 10 == 9 else i
+            email = "" if i % 100 == 98 else f" Attendee.{person}@Example.com "
+            writer.writerow([email, f"First{i}", f"Last{i}", f"Company {i % 500}"])
+    backends.messy_csv = path
+
+
+@scenario("clean", setup=write_messy_contacts_csv)
+def bench_clean(backends):
+    """contact_clean: 50k-row export normalized and deduped before upload (pandas if installed)."""
+    output = os.path.join(backends.workdir, "messy_contacts.clean.csv")
+    report = contact_clean.clean_contacts(backends.messy_csv, output, output + ".rejects")
+    rejected = report["rejected"]
+    if rejected["missing email"] != UPLOAD_ROWS // 100 or rejected["duplicate email"] != UPLOAD_ROWS // 10:
+        raise RuntimeError(f"unexpected clean counts: {report}")
+
+
+@scenario("upload", setup=write_contacts_csv)
+def bench_upload(backends):
+    """contact_upload: 50k-row CSV upserted 100 at a time and added to a new static list."""
+    hs = hubspot_client.get_client()
+    list_id = contact_upload.resolve_list(hs, unique_name("Bench Upload"))
+    report = contact_upload.upload_contacts(hs, backends.contacts_csv, list_id)
+    expected_failed = UPLOAD_ROWS // 100
+    if report["failed"] != expected_failed or report["added_to_list"] != report["created"] + report["updated"]:
+        raise RuntimeError(f"unexpected upload counts: {report}")
+
+
+@scenario("import", setup=write_contacts_csv)
+def bench_import(backends):
+    """contact_upload: the same 50k-row CSV through the Imports API (one multipart upload, polled at 0.1s)."""
+    hs = hubspot_client.get_client()
+    list_id = contact_upload.resolve_list(hs, unique_name("Bench Import"))
+    report = contact_upload.import_contacts(hs, backends.contacts_csv, list_id, poll_seconds=0.1, progress=False)
+    if report["failed"] != UPLOAD_ROWS // 100 or report["added_to_list"] != report["created"] + report["updated"]:
+        raise RuntimeError(f"unexpected import counts: {report}")
+
+
+class FakeServer:
+    """One fake API in a child process, so its CPU and memory stay out of the measurements."""
+
+    def __init__(self, kind: str, options: dict):
+        self.kind = kind
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "bench.fakes", kind, json.dumps(options)],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        line = self.process.stdout.readline()
+        if not line.startswith("READY "):
+            self.close()
+            raise RuntimeError(f"{kind} fake did not start (got {line!r})")
+        self.url = f"http://127.0.0.1:{int(line.split()[1])}"
+
+    def stats(self) -> dict:
+        r = requests.get(f"{self.url}/__bench/stats", timeout=10)
+        r.raise_for_status()
+        return r.json()
+
+    def close(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class _RerouteAdapter(HTTPAdapter):
+    """Sends https://<SALESFORCE_INSTANCE>/... to the fake's plain-HTTP address."""
+
+    def __init__(self, target: str):
+        super().__init__()
+        self.prefix = f"https://{SALESFORCE_INSTANCE}"
+        self.target = target
+
+    def send(self, request, **kwargs):
+        request.url = self.target + request.url[len(self.prefix):]
+        return super().send(request, **kwargs)
+
+
+def salesforce_factory(url: str):
+    """A get_client() stand-in: same session setup as salesforce_client, no login, fake instance."""
+
+    def get_client():
+        http = RetryingSession(max_retries=salesforce_client.MAX_RETRIES, service="salesforce")
+        http.mount(f"https://{SALESFORCE_INSTANCE}", _RerouteAdapter(url))
+        return Salesforce(session_id="bench", instance=SALESFORCE_INSTANCE, session=http)
+
+    return get_client
+
+
+class CallCounter:
+    """Request listener counting every call made through a RetryingSession, on any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+
+    def __call__(self, event: transport.RequestEvent) -> None:
+        with self._lock:
+            self.calls += 1
+            self.retries += event.retries
+            if event.error is not None or (event.status or 0) >= 400:
+                self.errors += 1
+
+
+class Backends:
+    """Where a scenario's clients point for one repeat."""
+
+    def __init__(self, hubspot: FakeServer, salesforce: FakeServer, workdir: str):
+        self.hubspot = hubspot
+        self.salesforce = salesforce
+        self.workdir = workdir
+        self.contacts_csv = None
+        self.messy_csv = None
+
+
+@contextlib.contextmanager
+def pointed_at(backends: Backends):
+    """Point every client factory at the fakes, with a fresh journal and HubSpot rate limiter."""
+    get_salesforce = salesforce_factory(backends.salesforce.url)
+    patches = [
+        (hubspot_client, "HUBSPOT_BASE", backends.hubspot.url),
+        (helper, "HUBSPOT_BASE", backends.hubspot.url),
+        (salesforce_client, "get_client", get_salesforce),
+        (run_campaign, "get_salesforce", get_salesforce),
+        (batch, "get_salesforce", get_salesforce),
+        (helper, "get_salesforce", get_salesforce),
+        (journal, "JOURNAL_PATH", os.path.join(backends.workdir, "journal.sqlite3")),
+        (journal, "_journal", None),
+    ]
+    saved = [(module, attr, getattr(module, attr)) for module, attr, _ in patches]
+    token = os.environ.get("HUBSPOT_ACCESS_TOKEN")
+    for module, attr, value in patches:
+        setattr(module, attr, value)
+    # A new token gets a new token bucket, so one scenario's pauses do not leak into the next
+    os.environ["HUBSPOT_ACCESS_TOKEN"] = f"bench-{uuid.uuid4().hex}"
+    salesforce_client.campaign_names.clear()
+    try:
+        yield
+    finally:
+        for module, attr, value in saved:
+            setattr(module, attr, value)
+        if token is None:
+            os.environ.pop("HUBSPOT_ACCESS_TOKEN", None)
+        else:
+            os.environ["HUBSPOT_ACCESS_TOKEN"] = token
+
+
+def run_once(name: str, verbose: bool = False) -> dict:
+    spec = SCENARIOS[name]
+    workdir = tempfile.mkdtemp(dir=_WORKDIR, prefix=f"{name}-")
+    with FakeServer("hubspot", spec["hubspot"]) as hubspot, FakeServer("salesforce", spec["salesforce"]) as salesforce:
+        backends = Backends(hubspot, salesforce, workdir)
+        output = io.StringIO()
+        error = None
+        with pointed_at(backends):
+            capture = contextlib.nullcontext() if verbose else contextlib.ExitStack()
+            with capture:
+                if not verbose:
+                    capture.enter_context(contextlib.redirect_stdout(output))
+                    capture.enter_context(contextlib.redirect_stderr(output))
+                # A listener rather than metrics.track_run(): batch workers do not inherit the context
+                if spec["setup"] is not None:
+                    spec["setup"](backends)
+                counter = CallCounter()
+                transport.add_request_listener(counter)
+                tracemalloc.start()
+                started = time.perf_counter()
+                try:
+                    spec["action"](backends)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                finally:
+                    seconds = time.perf_counter() - started
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    transport.remove_request_listener(counter)
+        served = {"hubspot": hubspot.stats(), "salesforce": salesforce.stats()}
+    if error and not verbose:
+        print(output.getvalue()[-2000:], file=sys.stderr)
+    return {
+        "ok": error is None,
+        "error": error,
+        "wall_seconds": round(seconds, 3),
+        "peak_memory_mb": round(peak / 1e6, 2),
+        "api_calls": counter.calls,
+        "api_errors": counter.errors,
+        "retries": counter.retries,
+        "served": {
+            kind: {key: stats[key] for key in ("total", "rate_limited", "injected_errors")}
+            for kind, stats in served.items()
+        },
+        "endpoints": {
+            f"{kind} {endpoint}": count
+            for kind, stats in served.items()
+            for endpoint, count in stats["requests"].items()
+        },
+    }
+
+
+def run_scenario(name: str, repeat: int = 1, verbose: bool = False) -> dict:
+    runs = [run_once(name, verbose) for _ in range(repeat)]
+    last = runs[-1]
+    return {
+        "description": SCENARIOS[name]["description"],
+        "ok": all(run["ok"] for run in runs),
+        "errors": [run["error"] for run in runs if run["error"]],
+        "wall_seconds": round(statistics.median(run["wall_seconds"] for run in runs), 3),
+        "peak_memory_mb": max(run["peak_memory_mb"] for run in runs),
+        "api_calls": round(statistics.median(run["api_calls"] for run in runs)),
+        "retries": round(statistics.median(run["retries"] for run in runs)),
+        "served": last["served"],
+        "endpoints": last["endpoints"],
+        "runs": [{key: run[key] for key in ("wall_seconds", "peak_memory_mb", "api_calls", "api_errors", "retries")} for run in runs],
+    }
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _change(old: float, new: float) -> str:
+    if not old:
+        return ""
+    percent = (new - old) / old * 100
+    return f" ({percent:+.0f}%)"
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """Print old -> new for every scenario present in both result files."""
+    print(f"\n{baseline.get('commit') or '?'} -> {current.get('commit') or '?'}")
+    print(f"{'scenario':<18} {'wall seconds':<26} {'API calls':<22} {'peak MB':<22}")
+    for name, new in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            print(f"{name:<18} (new)")
+            continue
+        wall = f"{old['wall_seconds']:.2f} -> {new['wall_seconds']:.2f}{_change(old['wall_seconds'], new['wall_seconds'])}"
+        calls = f"{old['api_calls']} -> {new['api_calls']}{_change(old['api_calls'], new['api_calls'])}"
+        memory = f"{old['peak_memory_mb']:.1f} -> {new['peak_memory_mb']:.1f}{_change(old['peak_memory_mb'], new['peak_memory_mb'])}"
+        print(f"{name:<18} {wall:<26} {calls:<22} {memory:<22}")
+        changed = {
+            endpoint: (old["endpoints"].get(endpoint, 0), count)
+            for endpoint, count in new["endpoints"].items()
+            if old["endpoints"].get(endpoint, 0) != count
+        }
+        changed.update({endpoint: (count, 0) for endpoint, count in old["endpoints"].items() if endpoint not in new["endpoints"]})
+        for endpoint, (before, after) in sorted(changed.items()):
+            print(f"{'':<18}   {endpoint}: {before} -> {after}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmarks against local HubSpot/Salesforce fakes")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; wall time and calls are medians")
+    parser.add_argument("--output", help="Results JSON (default: bench/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the scenarios' own output")
+    args = parser.parse_args()
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    if commit and _git("status", "--porcelain", "--untracked-files=no"):
+        commit += "-dirty"
+    results = {
+        "commit": commit or None,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "scenarios": {},
+    }
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            print(f"▶️  {name}: {SCENARIOS[name]['description']}")
+            result = results["scenarios"][name] = run_scenario(name, max(1, args.repeat), args.verbose)
+            status = "✅" if result["ok"] else f"❌ {result['errors'][0]}"
+            print(
+                f"   {status}  {result['wall_seconds']:.2f}s, {result['api_calls']} API calls "
+                f"({result['retries']} retries), peak {result['peak_memory_mb']:.1f} MB"
+            )
+    finally:
+        shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+    if not all(result["ok"] for result in results["scenarios"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,31 @@ Finds the campaign in HubSpot and Salesforce, then creates workflows for specifi
 import os
 import sys
 from dotenv import load_dotenv
-from src.hubspot_client import get_client as get_hubspot
-from src.salesforce_client import get_client as get_salesforce
+from src.hubspot_client import HUBSPOT_BASE, get_client as get_hubspot
+from src.salesforce_client import get_client as get_salesforce, find_campaign_by_name
+from src.journal import get_journal
 
 load_dotenv()
 
 def find_hubspot_campaign(hs, campaign_name):
     """Find HubSpot campaign by name."""
+    # Campaigns created by run_campaign are in the run journal; no search needed
+    journal = get_journal()
+    campaign_id = journal.lookup(campaign_name, "hubspot_campaign") if journal else None
+    if campaign_id:
+        print(f"✅ Found HubSpot campaign in run journal: {campaign_name} (id={campaign_id})")
+        return campaign_id
+    
     print(f"🔍 Searching for HubSpot campaign: {campaign_name}")
     
-    # Try to get recent campaigns
-    url = "https://api.hubapi.com/marketing/v3/campaigns"
+    # Exact match from the client's campaign name index (covers the whole catalog)
+    campaign_id = hs.find_campaign_by_name(campaign_name)
+    if campaign_id:
+        print(f"✅ Found HubSpot campaign: {campaign_name} (id={campaign_id})")
+        return campaign_id
+    
+    # Try recent campaigns for a partial match
+    url = f"{HUBSPOT_BASE}/marketing/v3/campaigns"
     params = {"limit": 100, "sort": "-createdAt"}
     r = hs._session.get(url, params=params)
     r.raise_for_status()
@@ -24,15 +38,6 @@ def find_hubspot_campaign(hs, campaign_name):
     
     campaigns = result.get("results", [])
     
-    # Try exact match first
-    for campaign in campaigns:
-        props = campaign.get("properties", {})
-        name = props.get("hs_name", "")
-        if name == campaign_name:
-            campaign_id = campaign.get("id")
-            print(f"✅ Found HubSpot campaign: {campaign_name} (id={campaign_id})")
-            return campaign_id
-    
     # Try partial match (in case of slight name differences)
     print(f"   Exact match not found, trying partial match...")
     for campaign in campaigns:
@@ -58,15 +63,16 @@ def find_hubspot_campaign(hs, campaign_name):
 
 def find_salesforce_campaign(sf, campaign_name):
     """Find Salesforce campaign by name."""
-    print(f"🔍 Searching for Salesforce campaign: {campaign_name}")
+    journal = get_journal()
+    campaign_id = journal.lookup(campaign_name, "salesforce_campaign") if journal else None
+    if campaign_id:
+        print(f"✅ Found Salesforce campaign in run journal: {campaign_name} (id={campaign_id})")
+        return campaign_id
     
-    # Escape single quotes in campaign name
-    escaped_name = campaign_name.replace("'", "''")
-    query = f"SELECT Id, Name FROM Campaign WHERE Name = '{escaped_name}' LIMIT 1"
-    result = sf.query(query)
+    print(f"🔍 Searching for Salesforce campaign: {campaign_name}")
     
-    if result.get("records"):
-        campaign_id = result["records"][0]["Id"]
+    campaign_id = find_campaign_by_name(sf, campaign_name)
+    if campaign_id:
         print(f"✅ Found Salesforce campaign: {campaign_name} (id={campaign_id})")
         return campaign_id
     
@@ -107,7 +113,7 @@ def find_list_by_name(hs, list_name, campaign_id=None):
     print(f"❌ List '{list_name}' not found")
     print(f"   Searching all lists for similar names...")
     try:
-        url = "https://api.hubapi.com/crm/v3/lists"
+        url = f"{HUBSPOT_BASE}/crm/v3/lists"
         params = {"limit": 100}
         r = hs._session.get(url, params=params)
         if r.status_code == 200:
@@ -141,8 +147,18 @@ def create_workflow_for_segment(hs, campaign_name, segment_name, status, salesfo
     print(f"   Status: {status}")
     print(f"   Salesforce Campaign ID: {salesforce_campaign_id}")
     
-    # Find the list ID
-    list_id = find_list_by_name(hs, segment_name, campaign_id=hubspot_campaign_id)
+    journal = get_journal()
+    workflow_id = journal.lookup(campaign_name, "workflow", status) if journal else None
+    if workflow_id:
+        print(f"✅ Workflow already created (run journal): '{segment_name}' (id={workflow_id})")
+        return workflow_id
+    
+    # Find the list ID (the run journal has the ids of segments run_campaign created)
+    list_id = journal.lookup(campaign_name, "hubspot_list", status) if journal else None
+    if list_id:
+        print(f"✅ Found list '{segment_name}' in run journal (id={list_id})")
+    else:
+        list_id = find_list_by_name(hs, segment_name, campaign_id=hubspot_campaign_id)
     if not list_id:
         print(f"❌ Cannot create workflow - list not found")
         return None
@@ -160,6 +176,8 @@ def create_workflow_for_segment(hs, campaign_name, segment_name, status, salesfo
         )
         workflow_id = workflow.get("id")
         print(f"✅ Successfully created workflow '{segment_name}' (id={workflow_id})")
+        if journal and workflow_id:
+            journal.register(campaign_name, "workflow", workflow_id, key=status)
         return workflow_id
     except Exception as e:
         print(f"❌ Failed to create workflow: {e}")
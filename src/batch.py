@@ -0,0 +1,211 @@
+"""
+Batch campaign creation.
+Runs many campaign configs (a directory of YAML files, or one multi-document YAML file) in one
+process: configs are streamed through a bounded worker pool, and every run shares one HubSpot
+client (session, rate limiter, list index) and one Salesforce session. Writes a consolidated
+JSON or CSV report of created ids and failures.
+
+Usage: python -m src.batch <dir|campaigns.yaml> [--workers N] [--report report.json|report.csv]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+import yaml
+from dotenv import load_dotenv
+
+from .config import CampaignConfig
+from .deadline import DeadlineExceeded
+from .hubspot_client import get_client as get_hubspot
+from .run_campaign import run as run_campaign
+from .salesforce_client import campaign_names, get_client as get_salesforce
+
+load_dotenv()
+
+# Campaigns created at once (each run also uses its own stage pool, see CAMPAIGN_MAX_WORKERS)
+DEFAULT_BATCH_WORKERS = int(os.environ.get("CAMPAIGN_BATCH_WORKERS", "4"))
+
+REPORT_FIELDS = (
+    "source",
+    "campaign_name",
+    "status",
+    "hubspot_campaign_id",
+    "salesforce_campaign_id",
+    "hubspot_list_ids",
+    "hubspot_workflow_ids",
+    "error",
+    "seconds",
+)
+
+
+def iter_configs(source: Union[str, Path]) -> Iterator[Tuple[str, object]]:
+    """
+    Yield (label, raw config) for every YAML document under source, one at a time.
+    source is a directory (every *.yaml / *.yml in it, sorted) or a single, possibly
+    multi-document, YAML file. Labels are "<file>" or "<file>#<n>" for multi-document files.
+    A file that cannot be parsed yields a ValueError in place of the config.
+    """
+    source = Path(source)
+    if source.is_dir():
+        paths = sorted(p for p in source.iterdir() if p.suffix in (".yaml", ".yml") and p.is_file())
+    else:
+        paths = [source]
+    for path in paths:
+        try:
+            yield from _iter_documents(path)
+        except (yaml.YAMLError, ValueError) as e:
+            # The rest of this file cannot be read; report it and carry on with the next one
+            yield path.name, ValueError(f"Could not parse {path.name}: {e}")
+
+
+def _iter_documents(path: Path) -> Iterator[Tuple[str, object]]:
+    with open(path) as f:
+        documents = (document for document in yaml.safe_load_all(f) if document is not None)
+        first = next(documents, None)
+        second = next(documents, None)
+        if second is None:
+            if first is not None:
+                yield path.name, first
+            return
+        yield f"{path.name}#1", first
+        yield f"{path.name}#2", second
+        for number, document in enumerate(documents, start=3):
+            yield f"{path.name}#{number}", document
+
+
+def _row(source: str, name: Optional[str], status: str, result: Optional[dict], error: str, seconds: float) -> dict:
+    result = result or {}
+    return {
+        "source": source,
+        "campaign_name": name or result.get("campaign_name"),
+        "status": status,
+        "hubspot_campaign_id": result.get("hubspot_campaign_id"),
+        "salesforce_campaign_id": result.get("salesforce_campaign_id"),
+        "hubspot_list_ids": list(result.get("hubspot_list_ids") or []),
+        "hubspot_workflow_ids": [w.get("id") for w in result.get("hubspot_workflows") or [] if w.get("id")],
+        "error": error,
+        "seconds": round(seconds, 3),
+    }
+
+
+def _run_one(source: str, config: CampaignConfig, hs, sf) -> dict:
+    started = time.perf_counter()
+    try:
+        result = run_campaign(config, hs=hs, sf=sf)
+    except DeadlineExceeded as e:
+        return _row(source, config.name, "timeout", e.partial, str(e), time.perf_counter() - started)
+    except Exception as e:
+        return _row(source, config.name, "failed", None, f"{type(e).__name__}: {e}", time.perf_counter() - started)
+    return _row(source, config.name, "created", result, "", time.perf_counter() - started)
+
+
+def run_batch(source: Union[str, Path], workers: Optional[int] = None, hs=None, sf=None) -> list:
+    """
+    Create every campaign under source, at most `workers` at a time. Returns one report row per
+    config, in source order. Invalid configs are reported without any API call; a failed
+    campaign does not stop the others.
+    """
+    workers = max(1, workers or DEFAULT_BATCH_WORKERS)
+    rows = []
+    running = {}
+    # Parent campaigns are resolved up front with one query (per chunk of names), so each run
+    # finds its parent in the name cache
+    parent_names = {
+        raw["salesforce"].get("parent_campaign")
+        for _, raw in iter_configs(source)
+        if isinstance(raw, dict) and isinstance(raw.get("salesforce"), dict)
+    }
+    parent_names = {name for name in parent_names if name and isinstance(name, str)}
+
+    def collect(done):
+        for future in done:
+            index = running.pop(future)
+            rows[index] = future.result()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="campaign") as pool:
+        for source_label, raw in iter_configs(source):
+            try:
+                if isinstance(raw, ValueError):
+                    raise raw
+                config = CampaignConfig.from_dict(raw)
+            except ValueError as e:
+                name = raw.get("name") if isinstance(raw, dict) else None
+                rows.append(_row(source_label, name, "invalid", None, str(e), 0.0))
+                print(f"❌ {source_label}: {e}")
+                continue
+            # One HubSpot client and one Salesforce login for the whole batch
+            if hs is None:
+                hs = get_hubspot()
+            if sf is None:
+                sf = get_salesforce()
+            if parent_names:
+                campaign_names.resolve(sf, sorted(parent_names))
+                parent_names = None
+            # Bounded read-ahead: do not parse the next config until a worker is free
+            if len(running) >= workers:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                collect(done)
+            rows.append(None)
+            running[pool.submit(_run_one, source_label, config, hs, sf)] = len(rows) - 1
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            collect(done)
+    return rows
+
+
+def write_report(rows: list, path: Union[str, Path], fmt: Optional[str] = None) -> None:
+    """Write the batch report as JSON (summary + rows) or CSV (one row per campaign)."""
+    path = Path(path)
+    fmt = fmt or ("csv" if path.suffix.lower() == ".csv" else "json")
+    if fmt == "csv":
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({
+                    **row,
+                    "hubspot_list_ids": ";".join(row["hubspot_list_ids"]),
+                    "hubspot_workflow_ids": ";".join(str(w) for w in row["hubspot_workflow_ids"]),
+                })
+        return
+    with open(path, "w") as f:
+        json.dump({"summary": summarize(rows), "campaigns": rows}, f, indent=2)
+
+
+def summarize(rows: list) -> dict:
+    summary = {"total": len(rows)}
+    for row in rows:
+        summary[row["status"]] = summary.get(row["status"], 0) + 1
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create campaigns from a directory or multi-document YAML file")
+    parser.add_argument("source", help="Directory of campaign YAML files, or one multi-document YAML file")
+    parser.add_argument("--workers", type=int, default=None, help=f"Campaigns created at once (default {DEFAULT_BATCH_WORKERS})")
+    parser.add_argument("--report", default="batch-report.json", help="Report path (.json or .csv)")
+    parser.add_argument("--format", choices=["json", "csv"], default=None, help="Report format (default from --report extension)")
+    args = parser.parse_args()
+
+    source = Path(args.source).resolve()
+    if not source.exists():
+        print(f"File not found: {source}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    rows = run_batch(source, workers=args.workers)
+    write_report(rows, args.report, args.format)
+    summary = summarize(rows)
+    print(f"\nDone in {time.perf_counter() - started:.1f}s: {summary}. Report: {args.report}")
+    if summary["total"] != summary.get("created", 0):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Typed campaign configuration.
+CampaignConfig.from_dict() validates a YAML/form config before any API call is made; run()
+accepts a YAML path, a plain dict, or a CampaignConfig, so callers that already hold the config
+in memory (webhook, web app, batch runner) skip the temp-file YAML round trip.
+"""
+import datetime
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Optional, Union
+
+import yaml
+
+
+def _slotted(cls):
+    """
+    Rebuild a dataclass with __slots__ (what dataclass(slots=True) does on Python 3.10+;
+    runtime.txt pins 3.9). Defaults live in the generated __init__, so the class attributes
+    that would clash with the slots can be dropped.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {k: v for k, v in cls.__dict__.items() if k not in names + ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slotted
+@dataclass
+class TaxonomyConfig:
+    hubspot: dict = field(default_factory=dict)
+    salesforce: dict = field(default_factory=dict)
+
+
+@_slotted
+@dataclass
+class HubSpotConfig:
+    auto_create_segments: list = field(default_factory=list)
+    list_ids: list = field(default_factory=list)
+    list_status_map: dict = field(default_factory=dict)
+    create_workflows: bool = True
+    extra_properties: dict = field(default_factory=dict)
+
+
+@_slotted
+@dataclass
+class SalesforceConfig:
+    status: str = "Planned"
+    description: Optional[str] = None
+    member_statuses: list = field(default_factory=list)
+    parent_campaign: Optional[str] = None
+    custom_fields: dict = field(default_factory=dict)
+    use_composite: bool = True
+
+
+@_slotted
+@dataclass
+class WorkflowsConfig:
+    zapier_webhook_url: Optional[str] = None
+    wait_minutes: int = 10
+
+
+@_slotted
+@dataclass
+class CampaignConfig:
+    name: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    taxonomy: TaxonomyConfig = field(default_factory=TaxonomyConfig)
+    tags: list = field(default_factory=list)
+    hubspot: HubSpotConfig = field(default_factory=HubSpotConfig)
+    salesforce: SalesforceConfig = field(default_factory=SalesforceConfig)
+    workflows: WorkflowsConfig = field(default_factory=WorkflowsConfig)
+    concurrency: Optional[int] = None
+    deadline_seconds: Optional[float] = None
+
+    @property
+    def member_statuses(self) -> list:
+        """Salesforce member statuses, defaulting to the HubSpot segment statuses."""
+        return self.salesforce.member_statuses or self.hubspot.auto_create_segments
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CampaignConfig":
+        """Validate a config dict (as loaded from YAML or built from a form). Raises ValueError."""
+        if not isinstance(data, dict):
+            raise ValueError("Campaign config must be a mapping")
+        errors = []
+        taxonomy = _section(data, "taxonomy", errors)
+        hubspot = _section(data, "hubspot", errors)
+        salesforce = _section(data, "salesforce", errors)
+        workflows = _section(data, "workflows", errors)
+
+        name = data.get("name")
+        if not isinstance(name, str) or not name.strip():
+            errors.append("name is required")
+
+        config = cls(
+            name=(name or "").strip() if isinstance(name, str) else "",
+            start_date=_date(data.get("start_date"), "start_date", errors),
+            end_date=_date(data.get("end_date"), "end_date", errors),
+            taxonomy=TaxonomyConfig(
+                hubspot=_mapping(taxonomy.get("hubspot"), "taxonomy.hubspot", errors),
+                salesforce=_mapping(taxonomy.get("salesforce"), "taxonomy.salesforce", errors),
+            ),
+            tags=_strings(data.get("tags"), "tags", errors),
+            hubspot=HubSpotConfig(
+                auto_create_segments=_strings(hubspot.get("auto_create_segments"), "hubspot.auto_create_segments", errors),
+                list_ids=[str(list_id) for list_id in _list(hubspot.get("list_ids"), "hubspot.list_ids", errors)],
+                list_status_map={
+                    str(k): v for k, v in _mapping(hubspot.get("list_status_map"), "hubspot.list_status_map", errors).items()
+                },
+                create_workflows=bool(hubspot.get("create_workflows", True)),
+                extra_properties=_mapping(hubspot.get("extra_properties"), "hubspot.extra_properties", errors),
+            ),
+            salesforce=SalesforceConfig(
+                status=salesforce.get("status") or "Planned",
+                description=salesforce.get("description") or salesforce.get("Description") or None,
+                member_statuses=_strings(salesforce.get("member_statuses"), "salesforce.member_statuses", errors),
+                parent_campaign=salesforce.get("parent_campaign") or None,
+                custom_fields=_mapping(salesforce.get("custom_fields"), "salesforce.custom_fields", errors),
+                use_composite=bool(salesforce.get("use_composite", True)),
+            ),
+            workflows=WorkflowsConfig(
+                zapier_webhook_url=workflows.get("zapier_webhook_url") or None,
+                wait_minutes=_number(workflows.get("wait_minutes", 10), "workflows.wait_minutes", errors, int, minimum=0),
+            ),
+            concurrency=_number(data.get("concurrency"), "concurrency", errors, int, minimum=1),
+            deadline_seconds=_number(data.get("deadline_seconds"), "deadline_seconds", errors, float, minimum=0, exclusive=True),
+        )
+        if config.start_date and config.end_date and config.end_date < config.start_date:
+            errors.append("end_date must not be before start_date")
+        if errors:
+            raise ValueError("Invalid campaign config: " + "; ".join(errors))
+        return config
+
+    def to_dict(self) -> dict:
+        """Plain dict (same shape as the YAML) that from_dict() accepts, e.g. for the run journal."""
+        return asdict(self)
+
+
+def _section(data: dict, key: str, errors: list) -> dict:
+    return _mapping(data.get(key), key, errors)
+
+
+def _mapping(value, key: str, errors: list) -> dict:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        errors.append(f"{key} must be a mapping")
+        return {}
+    return dict(value)
+
+
+def _list(value, key: str, errors: list) -> list:
+    if value is None:
+        return []
+    if not isinstance(value, (list, tuple)):
+        errors.append(f"{key} must be a list")
+        return []
+    return list(value)
+
+
+def _strings(value, key: str, errors: list) -> list:
+    items = _list(value, key, errors)
+    cleaned = [str(item).strip() for item in items if item is not None and str(item).strip()]
+    if len(cleaned) != len(items):
+        errors.append(f"{key} must not contain empty entries")
+    return cleaned
+
+
+def _date(value, key: str, errors: list) -> Optional[str]:
+    if value in (None, ""):
+        return None
+    # YAML turns unquoted 2025-02-01 into a date object
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    try:
+        return datetime.date.fromisoformat(str(value).strip()).isoformat()
+    except ValueError:
+        errors.append(f"{key} must be a YYYY-MM-DD date (got {value!r})")
+        return None
+
+
+def _number(value, key: str, errors: list, kind: type, minimum: float, exclusive: bool = False):
+    if value in (None, ""):
+        return None
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        errors.append(f"{key} must be a number (got {value!r})")
+        return None
+    if exclusive and number <= minimum:
+        errors.append(f"{key} must be greater than {minimum}")
+        return None
+    if number < minimum:
+        errors.append(f"{key} must be at least {minimum}")
+        return None
+    return number
+
+
+def load_config(path: Union[str, Path]) -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def resolve_config(source: Union[str, Path, dict, CampaignConfig]) -> CampaignConfig:
+    """Turn a YAML path, config dict, or CampaignConfig into a validated CampaignConfig."""
+    if isinstance(source, CampaignConfig):
+        return source
+    if isinstance(source, dict):
+        return CampaignConfig.from_dict(source)
+    return CampaignConfig.from_dict(load_config(source))
@@ -0,0 +1,371 @@
+"""
+Contact CSV cleaning (list-upload workflow).
+Normalizes and dedupes a contact CSV before it is uploaded, so messy exports (Luma, badge
+scanners) do not turn into wasted or failed upserts:
+
+- headers are mapped to HubSpot property names, through HEADER_ALIASES for the usual export
+  spellings ("Email Address", "First Name", "Company Name", ...);
+- emails are trimmed, lowercased and checked against EMAIL_PATTERN, other cells are trimmed;
+- rows whose email was already seen earlier in the file are dropped, keeping the first.
+
+The file is read in chunks of CLEAN_CHUNK_ROWS rows: with pandas (vectorized string ops) when it
+is installed, with the csv module otherwise; both write the same output. Seen emails are kept
+in a set, or, for files over CLEAN_BLOOM_ROWS rows, in a Bloom filter of fixed size (about 4 MB
+per million rows) that wrongly reports a new email as seen about once in BLOOM_ERROR_RATE.
+
+Writes the clean rows to a new CSV (the uploader's input) and the rejected rows, with their row
+number and reason, to a rejects CSV.
+
+Usage: python -m src.contact_clean <contacts.csv> [--output clean.csv] [--rejects rejects.csv]
+"""
+import argparse
+import csv
+import hashlib
+import math
+import os
+import re
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+from dotenv import load_dotenv
+
+try:
+    import pandas as pd  # optional: vectorized cleaning; the csv module is used without it
+except ImportError:
+    pd = None
+
+load_dotenv()
+
+# Rows read, cleaned and written at a time
+CLEAN_CHUNK_ROWS = int(os.environ.get("CONTACT_CLEAN_CHUNK_ROWS", "50000"))
+# Above this many rows, seen emails go in a Bloom filter instead of a set
+CLEAN_BLOOM_ROWS = int(os.environ.get("CONTACT_CLEAN_BLOOM_ROWS", "1000000"))
+BLOOM_ERROR_RATE = 1e-6
+
+# Something@domain.tld with no spaces: what HubSpot accepts as a contact email, near enough
+EMAIL_PATTERN = r"[^@\s]+@[^@\s]+\.[^@\s.]+"
+_EMAIL = re.compile(EMAIL_PATTERN)
+
+# Export header spellings -> HubSpot property names (matched after _header_key)
+HEADER_ALIASES = {
+    "email": "email",
+    "email address": "email",
+    "e mail": "email",
+    "e mail address": "email",
+    "work email": "email",
+    "attendee email": "email",
+    "first name": "firstname",
+    "given name": "firstname",
+    "last name": "lastname",
+    "surname": "lastname",
+    "family name": "lastname",
+    "company": "company",
+    "company name": "company",
+    "organization": "company",
+    "organisation": "company",
+    "job title": "jobtitle",
+    "title": "jobtitle",
+    "phone": "phone",
+    "phone number": "phone",
+    "mobile": "mobilephone",
+    "mobile phone": "mobilephone",
+    "mobile phone number": "mobilephone",
+    "website": "website",
+    "city": "city",
+    "state": "state",
+    "country": "country",
+    "zip": "zip",
+    "postal code": "zip",
+}
+
+REJECT_REASONS = ("missing email", "invalid email", "duplicate email")
+
+
+def _header_key(header: str) -> str:
+    return " ".join(re.sub(r"[_\-.]+", " ", header.strip().lower()).split())
+
+
+def property_name(header: str) -> str:
+    """HubSpot property for a CSV header: an alias, or the header itself lowercased and trimmed."""
+    return HEADER_ALIASES.get(_header_key(header), header.strip().lower())
+
+
+def map_columns(header: List[str]) -> Tuple[List[int], List[str], List[str]]:
+    """
+    (indexes of the columns kept, their property names, headers dropped). A blank header, or a
+    second column for a property already mapped, is dropped.
+    """
+    indexes, names, dropped = [], [], []
+    for index, column in enumerate(header):
+        name = property_name(column)
+        if not name or name in names:
+            dropped.append(column)
+            continue
+        indexes.append(index)
+        names.append(name)
+    return indexes, names, dropped
+
+
+class _SeenSet:
+    """Exact set of emails seen so far."""
+
+    def __init__(self):
+        self._seen = set()
+
+    def seen(self, email: str) -> bool:
+        """Whether email was seen before; records it either way."""
+        if email in self._seen:
+            return True
+        self._seen.add(email)
+        return False
+
+
+class _BloomFilter:
+    """
+    Fixed-size set of emails seen so far, sized for capacity items at error_rate false
+    positives (a new email reported as seen). Positions come from one blake2b digest by double
+    hashing.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def seen(self, email: str) -> bool:
+        """Whether email was (probably) seen before; records it either way."""
+        digest = hashlib.blake2b(email.encode(), digest_size=16).digest()
+        first, step = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        bits = self._bits
+        present = True
+        for i in range(self.hashes):
+            position = (first + i * step) % self.size
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        return present
+
+
+def estimate_rows(path: Union[str, Path]) -> int:
+    """Rows in the file, estimated from its size and the line lengths in its first megabyte."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        sample = f.read(1 << 20)
+    lines = sample.count(b"\n") or 1
+    return lines if len(sample) >= size else int(size / len(sample) * lines * 1.1)
+
+
+def _read_header(path: Union[str, Path]) -> List[str]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), None) or []
+
+
+def _csv_chunks(path: Union[str, Path], width: int, chunk_rows: int) -> Iterator[List[List[str]]]:
+    """Rows after the header, chunk_rows at a time, padded or cut to width cells; blank lines are skipped."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        chunk = []
+        for row in reader:
+            if not row:
+                continue
+            chunk.append((row + [""] * (width - len(row)))[:width])
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _clean_chunk_csv(rows: List[List[str]], email_index: int) -> Tuple[List[str], List[bool]]:
+    emails = [row[email_index].strip().lower() for row in rows]
+    return emails, [bool(_EMAIL.fullmatch(email)) for email in emails]
+
+
+def _read_frames(path: Union[str, Path], width: int, chunk_rows: int, **options):
+    reader = pd.read_csv(
+        path,
+        header=None,
+        skiprows=1,
+        names=list(range(width)),
+        index_col=False,
+        dtype=str,
+        keep_default_na=False,
+        encoding="utf-8-sig",
+        chunksize=chunk_rows,
+        **options,
+    )
+    with reader:
+        while True:
+            # index_col=False warns whenever a row is longer than names; cutting it is the point
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", pd.errors.ParserWarning)
+                frame = next(reader, None)
+            if frame is None:
+                return
+            yield frame
+
+
+def _pandas_chunks(path: Union[str, Path], width: int, chunk_rows: int):
+    """
+    DataFrames of chunk_rows rows (all cells str, missing cells ""), columns numbered 0..width-1.
+    Rows are padded or cut to width as in _csv_chunks. The C parser cuts a trailing comma on
+    every row but rejects a single row longer than the header; from that chunk on, the python
+    parser is used, which passes such rows to on_bad_lines.
+    """
+    done = 0
+    try:
+        for frame in _read_frames(path, width, chunk_rows):
+            done += len(frame)
+            yield frame.fillna("")
+        return
+    except pd.errors.ParserError:
+        pass
+    try:
+        skipped = 0
+        for frame in _read_frames(
+            path, width, chunk_rows, engine="python", on_bad_lines=lambda cells: cells[:width]
+        ):
+            if skipped < done:
+                frame, skipped = frame.iloc[done - skipped:], skipped + len(frame)
+                if frame.empty:
+                    continue
+            yield frame.fillna("")
+    except pd.errors.ParserError as e:
+        raise ValueError(f"{path} is not a well-formed CSV: {e}") from e
+
+
+def clean_contacts(
+    path: Union[str, Path],
+    output_path: Union[str, Path],
+    rejects_path: Optional[Union[str, Path]] = None,
+    chunk_rows: int = CLEAN_CHUNK_ROWS,
+    bloom_rows: int = CLEAN_BLOOM_ROWS,
+    use_pandas: Optional[bool] = None,
+) -> dict:
+    """
+    Write the clean, deduplicated rows of the CSV at path to output_path, and the rejected ones
+    to rejects_path (if given). use_pandas=None uses pandas when it is installed.
+    Returns counts: rows, clean, rejected (per reason), the column mapping, and what was used.
+    """
+    started = time.perf_counter()
+    use_pandas = pd is not None if use_pandas is None else use_pandas
+    if use_pandas and pd is None:
+        raise RuntimeError("pandas is not installed (pip install pandas), or pass use_pandas=False")
+    header = _read_header(path)
+    indexes, names, dropped = map_columns(header)
+    if "email" not in names:
+        raise ValueError(f"{path} has no email column (columns: {', '.join(header)})")
+    email_column = names.index("email")
+    email_index = indexes[email_column]
+    expected_rows = estimate_rows(path)
+    seen = _BloomFilter(expected_rows) if expected_rows > bloom_rows else _SeenSet()
+
+    report = {
+        "rows": 0,
+        "clean": 0,
+        "rejected": dict.fromkeys(REJECT_REASONS, 0),
+        "columns": {header[index]: name for index, name in zip(indexes, names)},
+        "dropped_columns": dropped,
+        "engine": "pandas" if use_pandas else "csv",
+        "dedupe": "bloom" if isinstance(seen, _BloomFilter) else "set",
+        "output": str(output_path),
+        "rejects": str(rejects_path) if rejects_path else None,
+        "seconds": 0.0,
+    }
+    rejects_file = open(rejects_path, "w", newline="", encoding="utf-8") if rejects_path else None
+    try:
+        with open(output_path, "w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            writer.writerow(names)
+            rejects = csv.writer(rejects_file) if rejects_file else None
+            if rejects:
+                rejects.writerow(["row", "reason"] + header)
+            if use_pandas:
+                chunks = _pandas_chunks(path, len(header), chunk_rows)
+            else:
+                chunks = _csv_chunks(path, len(header), chunk_rows)
+            for chunk in chunks:
+                if use_pandas:
+                    raw = chunk.values.tolist()
+                    emails = chunk[email_index].str.strip().str.lower()
+                    valid = emails.str.fullmatch(EMAIL_PATTERN).tolist()
+                    kept = chunk[indexes].apply(lambda column: column.str.strip())
+                    kept[email_index] = emails
+                    cleaned = kept.values.tolist()
+                    emails = emails.tolist()
+                else:
+                    raw = chunk
+                    emails, valid = _clean_chunk_csv(chunk, email_index)
+                    cleaned = [[row[index].strip() for index in indexes] for row in chunk]
+                    for row, email in zip(cleaned, emails):
+                        row[email_column] = email
+                clean_rows = []
+                for offset, (email, ok) in enumerate(zip(emails, valid)):
+                    if not email:
+                        reason = "missing email"
+                    elif not ok:
+                        reason = "invalid email"
+                    elif seen.seen(email):
+                        reason = "duplicate email"
+                    else:
+                        clean_rows.append(cleaned[offset])
+                        continue
+                    report["rejected"][reason] += 1
+                    if rejects:
+                        rejects.writerow([report["rows"] + offset + 1, reason] + raw[offset])
+                writer.writerows(clean_rows)
+                report["rows"] += len(emails)
+                report["clean"] += len(clean_rows)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def cleaned_paths(path: Union[str, Path]) -> Tuple[Path, Path]:
+    """Default (clean, rejects) paths next to the input: contacts.clean.csv, contacts.rejects.csv."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.clean.csv"), path.with_name(f"{path.stem}.rejects.csv")
+
+
+def print_summary(report: dict) -> None:
+    rejected = ", ".join(f"{count:,} {reason}" for reason, count in report["rejected"].items() if count)
+    print(
+        f"🧹 Cleaned {report['rows']:,} rows in {report['seconds']:.1f}s ({report['engine']}, {report['dedupe']}): "
+        f"{report['clean']:,} kept" + (f"; rejected {rejected}" if rejected else "")
+    )
+    renamed = {column: name for column, name in report["columns"].items() if column.strip().lower() != name}
+    if renamed:
+        print("   Columns: " + ", ".join(f"{column!r} -> {name}" for column, name in renamed.items()))
+    if report["dropped_columns"]:
+        print("   Dropped columns: " + ", ".join(repr(column) for column in report["dropped_columns"]))
+    if report["rejects"] and sum(report["rejected"].values()):
+        print(f"   Rejected rows: {report['rejects']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize and dedupe a contact CSV before upload")
+    parser.add_argument("csv", help="CSV file with an email column")
+    parser.add_argument("--output", help="Clean CSV (default: <name>.clean.csv next to the input)")
+    parser.add_argument("--rejects", help="Rejected rows CSV (default: <name>.rejects.csv next to the input)")
+    args = parser.parse_args()
+
+    path = Path(args.csv)
+    if not path.exists():
+        print(f"File not found: {path}")
+        sys.exit(1)
+    clean_path, rejects_path = cleaned_paths(path)
+    report = clean_contacts(path, args.output or clean_path, args.rejects or rejects_path)
+    print_summary(report)
+    print(f"   Clean rows: {report['output']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,636 @@
+"""
+Contact upload (list-upload workflow).
+Streams a CSV of contacts into HubSpot: rows are read one at a time, upserted by email in
+batches of CONTACT_BATCH_SIZE (POST /crm/v3/objects/contacts/batch/upsert), and the returned
+contact ids are added to the target static list in batches of LIST_MEMBERSHIP_BATCH_SIZE.
+Batches run on a pool of worker threads that share the HubSpot client, and with it the token's
+rate limiter: together they go as fast as HUBSPOT_RATE_LIMIT_PER_SECOND / _BURST allow and never
+faster. The upload stops before the portal's daily allowance drops below CONTACT_UPLOAD_DAILY_RESERVE
+calls. Only a few batches per worker are held in memory, so a multi-million-row file needs no more
+memory than a small one. Progress (rows/s) is printed live; the result counts created, updated
+and failed contacts.
+
+Uploads checkpoint to the run journal (journal.py): the byte offset before which every batch is
+upserted and added to the list, and each contact id added. --resume continues the latest
+unfinished upload of the same file to the same list from its checkpoint, and never re-adds a
+contact the upload already added.
+
+Files with more than CONTACT_UPLOAD_IMPORT_THRESHOLD rows go through HubSpot's asynchronous
+Imports API instead (import_contacts): the CSV is streamed to POST /crm/v3/imports as one
+multipart upload, the import is polled with progress (for up to CONTACT_UPLOAD_IMPORT_MAX_WAIT_SECONDS),
+and the contacts it imported are copied into the target list. upload() picks the path.
+
+CSV columns are HubSpot contact property names (header case and surrounding spaces are
+ignored); an "email" column is required and empty cells are not sent. The command line first
+runs the file through contact_clean (header aliases, email normalization, dedupe) and uploads
+the clean copy; --no-clean uploads the file as it is.
+
+Usage: python -m src.contact_upload <contacts.csv> (<list name> | --list-id ID) [--workers N] [--resume]
+       [--method auto|batch|import] [--no-clean] [--report report.json]
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+import requests
+from dotenv import load_dotenv
+
+from . import deadline as run_deadline
+from .contact_clean import clean_contacts, cleaned_paths, print_summary as print_clean_summary
+from .hubspot_client import CONTACT_BATCH_SIZE, LIST_MEMBERSHIP_BATCH_SIZE, get_client as get_hubspot
+from .journal import RunJournal, get_journal
+
+load_dotenv()
+
+# Batches in flight at once. HubSpot answers a batch upsert in a few hundred milliseconds, so
+# a handful of workers is enough to keep the rate limiter busy.
+DEFAULT_UPLOAD_WORKERS = int(os.environ.get("CONTACT_UPLOAD_WORKERS", "4"))
+# Daily API calls left untouched for everything else using the portal (campaign runs, scripts)
+DAILY_RESERVE = int(os.environ.get("CONTACT_UPLOAD_DAILY_RESERVE", "1000"))
+# Rows above which upload() uses the Imports API rather than batch upserts
+IMPORT_THRESHOLD = int(os.environ.get("CONTACT_UPLOAD_IMPORT_THRESHOLD", "100000"))
+# Seconds between import status polls
+IMPORT_POLL_SECONDS = float(os.environ.get("CONTACT_UPLOAD_IMPORT_POLL_SECONDS", "5"))
+IMPORT_FINAL_STATES = frozenset({"DONE", "FAILED", "CANCELED"})
+# Longest wait for an import to finish (the run deadline, when one is active, can cut it shorter)
+IMPORT_MAX_WAIT_SECONDS = float(os.environ.get("CONTACT_UPLOAD_IMPORT_MAX_WAIT_SECONDS", "3600"))
+# Seconds between progress lines
+PROGRESS_SECONDS = 2.0
+# Error messages kept in the report (the counts cover every failure)
+MAX_REPORTED_ERRORS = 20
+COUNT_KEYS = ("rows", "created", "updated", "failed", "added_to_list")
+
+
+class _ByteLines:
+    """Decoded lines of a binary file, counting the bytes consumed so far (offset)."""
+
+    def __init__(self, f, offset: int = 0):
+        self._f = f
+        self.offset = offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self._f.readline()
+        if not line:
+            raise StopIteration
+        # utf-8-sig: spreadsheet exports often start with a byte order mark
+        text = line.decode("utf-8-sig" if self.offset == 0 else "utf-8")
+        self.offset += len(line)
+        return text
+
+
+def iter_contacts(path: Union[str, Path], start_offset: int = 0) -> Iterator[Tuple[int, Optional[dict]]]:
+    """
+    Yield (offset, contact) per CSV row: contact is a property dict, or None for a row without an
+    email, and offset is the byte offset just past the row. The file is read lazily, so only the
+    current row is in memory. start_offset (a previously yielded offset) skips the rows before it.
+    """
+    with open(path, "rb") as f:
+        lines = _ByteLines(f)
+        header = next(csv.reader(lines), None)
+        if header is None:
+            return
+        columns = [column.strip().lower() for column in header]
+        if "email" not in columns:
+            raise ValueError(f"{path} has no email column (columns: {', '.join(columns)})")
+        if start_offset > lines.offset:
+            f.seek(start_offset)
+            lines.offset = start_offset
+        # csv.reader pulls one line at a time, so lines.offset is the end of the row just read
+        for row in csv.reader(lines):
+            contact = {
+                column: value.strip()
+                for column, value in zip(columns, row)
+                if column and value and value.strip()
+            }
+            yield lines.offset, (contact if contact.get("email") else None)
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _error(report: dict, message: str) -> None:
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append(message)
+
+
+def _upsert_batch(hs, contacts: list) -> dict:
+    """Worker: upsert one batch. Returns its outcome; API errors are part of it, not raised."""
+    outcome = {"ids": [], "created": 0, "updated": 0, "failed": 0, "errors": []}
+    try:
+        results, errors = hs.upsert_contacts(contacts)
+    except requests.RequestException as e:
+        outcome["failed"] = len(contacts)
+        outcome["errors"].append(f"Upserting {len(contacts)} contact(s) failed: {e}")
+        return outcome
+    outcome["failed"] = len(contacts) - len(results)
+    outcome["errors"].extend(error.get("message") or json.dumps(error) for error in errors)
+    for result in results:
+        outcome["created" if result.get("new") else "updated"] += 1
+        outcome["ids"].append(str(result["id"]))
+    return outcome
+
+
+def _add_members(hs, list_id, members: list) -> dict:
+    """Worker: add one batch of (batch number, contact id) to the list."""
+    contact_ids = [contact_id for _, contact_id in members]
+    try:
+        result = hs.add_list_members(list_id, contact_ids)
+    except requests.RequestException as e:
+        return {"members": members, "ok": False, "errors": [f"Adding {len(members)} contact(s) to list {list_id} failed: {e}"]}
+    return {
+        "members": members,
+        "ok": True,
+        "added": {str(contact_id) for contact_id in result.get("recordIdsAdded", [])},
+        "missing": {str(contact_id) for contact_id in result.get("recordIdsMissing", [])},
+        "errors": [],
+    }
+
+
+class _Progress:
+    """Prints rows done and rows/s every PROGRESS_SECONDS; one rewritten line on a terminal."""
+
+    def __init__(self, report: dict, started: float, enabled: bool = True):
+        self.report = report
+        self.started = started
+        self.enabled = enabled
+        self.rows_before = report["rows"]
+        self._tty = sys.stdout.isatty()
+        self._printed = False
+        self._last = started
+
+    def update(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not self.enabled or (not force and now - self._last < PROGRESS_SECONDS):
+            return
+        self._last = now
+        report = self.report
+        rate = (report["rows"] - self.rows_before) / max(now - self.started, 1e-9)
+        line = (
+            f"  {report['rows']:,} rows, {rate:,.0f} rows/s: {report['created']:,} created, "
+            f"{report['updated']:,} updated, {report['failed']:,} failed"
+        )
+        print("\r" + line if self._tty else line, end="" if self._tty else "\n", flush=True)
+        self._printed = True
+
+    def close(self) -> None:
+        if self._tty and self._printed:
+            print()
+
+
+class _Checkpoint:
+    """
+    Tracks which batches are done (upserted, and every id added to the list) and moves the
+    journal checkpoint over the longest run of done batches from the start. Batches finish out
+    of order on the worker pool; the checkpoint only ever covers a gap-free prefix.
+    """
+
+    def __init__(self, journal: Optional[RunJournal], upload_id: Optional[str], offset: int, number: int, counts: dict):
+        self.journal = journal
+        self.upload_id = upload_id
+        self.offset = offset
+        self.number = number  # first batch not yet committed
+        self.counts = {key: counts.get(key, 0) for key in COUNT_KEYS}
+        self._batches: dict = {}  # number -> {"end", "counts", "upserted", "outstanding"}
+
+    def started(self, number: int, end: int, counts: dict) -> None:
+        """Batch number, ending at byte offset end, was read (counts: rows, rows rejected up front)."""
+        self._batches[number] = {"end": end, "counts": dict(counts), "upserted": False, "outstanding": 0}
+
+    def upserted(self, number: int, counts: dict, ids_to_add: int) -> None:
+        batch = self._batches[number]
+        for key, value in counts.items():
+            batch["counts"][key] = batch["counts"].get(key, 0) + value
+        batch["upserted"] = True
+        batch["outstanding"] += ids_to_add
+
+    def members_added(self, numbers: list, added: dict, ok: bool, contact_ids: Iterable = ()) -> None:
+        """A membership batch finished; numbers has one entry per id sent, added the ids added per batch."""
+        if ok:
+            for number in numbers:
+                self._batches[number]["outstanding"] -= 1
+            for number, count in added.items():
+                counts = self._batches[number]["counts"]
+                counts["added_to_list"] = counts.get("added_to_list", 0) + count
+        self.commit(contact_ids)
+
+    def commit(self, added_ids: Iterable = ()) -> None:
+        advanced = False
+        while self.number in self._batches:
+            batch = self._batches[self.number]
+            if not batch["upserted"] or batch["outstanding"] > 0:
+                break
+            for key, value in batch["counts"].items():
+                self.counts[key] += value
+            self.offset = batch["end"]
+            del self._batches[self.number]
+            self.number += 1
+            advanced = True
+        added_ids = list(added_ids)
+        if self.journal is not None and (advanced or added_ids):
+            self.journal.checkpoint_upload(
+                self.upload_id,
+                added_ids,
+                byte_offset=self.offset if advanced else None,
+                batch_number=self.number,
+                counts=self.counts,
+            )
+
+    @property
+    def complete(self) -> bool:
+        return not self._batches
+
+
+def upload_contacts(
+    hs,
+    path: Union[str, Path],
+    list_id: Optional[Union[str, int]] = None,
+    workers: Optional[int] = None,
+    batch_size: int = CONTACT_BATCH_SIZE,
+    membership_batch_size: int = LIST_MEMBERSHIP_BATCH_SIZE,
+    daily_reserve: int = DAILY_RESERVE,
+    progress: bool = True,
+    journal: Optional[RunJournal] = None,
+    resume: bool = False,
+) -> dict:
+    """
+    Upsert every contact in the CSV at path and, if list_id is given, add them to that list,
+    `workers` batches at a time. A failed batch is counted and reported, and the upload carries
+    on with the next one. Duplicate emails within a batch are merged into one contact (later
+    columns win). If the portal's daily allowance falls to daily_reserve calls, no further
+    batches are sent and "stopped" says why.
+
+    Progress is checkpointed to journal (default: the process-wide run journal). With resume,
+    the latest unfinished upload of this file to this list continues from its checkpoint: rows
+    before it are skipped, and contacts it already added to the list are not added again.
+    Returns {"rows", "created", "updated", "failed", "added_to_list", "list_add_failed", "seconds",
+    "rows_per_second", "stopped", "upload_id", "resumed_from", "errors"}; counts include the resumed
+    upload's. Contacts in list_add_failed are added by a later --resume.
+    """
+    workers = max(1, workers or DEFAULT_UPLOAD_WORKERS)
+    list_id = str(list_id) if list_id is not None else None
+    if journal is None:
+        journal = get_journal()
+    path = os.path.abspath(path)
+    previous = journal.find_upload(path, list_id) if journal is not None and resume else None
+    if resume and journal is None:
+        raise ValueError("Cannot resume an upload with journaling disabled")
+    if previous is not None:
+        upload_id = previous["upload_id"]
+        size = os.path.getsize(path)
+        if size < previous["byte_offset"]:
+            raise ValueError(f"{path} is shorter ({size} bytes) than the checkpoint ({previous['byte_offset']} bytes)")
+        print(f"↩️  Resuming upload {upload_id} at byte {previous['byte_offset']:,} (batch {previous['batch_number']})")
+        checkpoint = _Checkpoint(journal, upload_id, previous["byte_offset"], previous["batch_number"], previous["counts"])
+    else:
+        if resume:
+            print("No unfinished upload of this file to this list; starting from the beginning")
+        upload_id = journal.start_upload(path, list_id) if journal is not None else None
+        checkpoint = _Checkpoint(journal, upload_id, 0, 0, {})
+
+    started = time.perf_counter()
+    report = {
+        **checkpoint.counts,
+        "seconds": 0.0,
+        "rows_per_second": 0.0,
+        "list_add_failed": 0,
+        "stopped": None,
+        "upload_id": upload_id,
+        "resumed_from": checkpoint.offset if previous is not None else None,
+        "errors": [],
+    }
+    meter = _Progress(report, started, progress)
+    pending = []  # (batch number, contact id) waiting to be added to the list
+    running = {}  # future -> (batch number, rows), or None for list membership adds
+
+    def collect(done):
+        for future in done:
+            batch = running.pop(future)
+            outcome = future.result()
+            for error in outcome["errors"]:
+                _error(report, error)
+            if batch is None:
+                members = outcome["members"]
+                added = {}
+                if outcome["ok"]:
+                    for number, contact_id in members:
+                        if contact_id in outcome["added"]:
+                            added[number] = added.get(number, 0) + 1
+                    report["added_to_list"] += sum(added.values())
+                else:
+                    report["list_add_failed"] += len(members)
+                checkpoint.members_added(
+                    [number for number, _ in members],
+                    added,
+                    outcome["ok"],
+                    [contact_id for _, contact_id in members if contact_id not in outcome.get("missing", ())] if outcome["ok"] else (),
+                )
+                continue
+            number, rows = batch
+            report["rows"] += rows
+            for key in ("created", "updated", "failed"):
+                report[key] += outcome[key]
+            counts = {key: outcome[key] for key in ("created", "updated", "failed")}
+            ids = outcome["ids"] if list_id is not None else []
+            if ids and previous is not None:
+                # Resumed: some of these were added before the interruption; count, do not resend
+                already = journal.added_members(upload_id, ids)
+                ids = [contact_id for contact_id in ids if contact_id not in already]
+                counts["added_to_list"] = len(already)
+                report["added_to_list"] += len(already)
+            checkpoint.upserted(number, counts, len(ids))
+            pending.extend((number, contact_id) for contact_id in ids)
+            checkpoint.commit()
+
+    def submit(task, *args, batch=None):
+        # Bounded read-ahead: do not read the next batch until a worker is free
+        while len(running) >= workers:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            collect(done)
+            meter.update()
+        running[pool.submit(task, *args)] = batch
+
+    def add_pending(minimum: int):
+        while len(pending) >= max(1, minimum):
+            members = pending[:membership_batch_size]
+            del pending[:membership_batch_size]
+            submit(_add_members, hs, list_id, members)
+
+    number = checkpoint.number
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload") as pool:
+        for rows in _batches(iter_contacts(path, checkpoint.offset), batch_size):
+            remaining = hs.daily_calls_remaining()
+            if remaining is not None and remaining <= daily_reserve:
+                report["stopped"] = f"daily API limit: {remaining} calls left (reserve {daily_reserve})"
+                break
+            contacts = {}
+            first_line = report["rows"] + sum(batch[1] for batch in running.values() if batch) + 2  # line 1 is the header
+            failed = 0
+            for index, (_, row) in enumerate(rows):
+                if row is None:
+                    failed += 1
+                    _error(report, f"Line {first_line + index} has no email")
+                    continue
+                contacts.setdefault(row["email"].lower(), {}).update(row)
+            checkpoint.started(number, rows[-1][0], {"rows": len(rows), "failed": failed})
+            report["failed"] += failed
+            if contacts:
+                submit(_upsert_batch, hs, list(contacts.values()), batch=(number, len(rows)))
+            else:
+                report["rows"] += len(rows)
+                checkpoint.upserted(number, {}, 0)
+                checkpoint.commit()
+            number += 1
+            add_pending(membership_batch_size)
+            meter.update()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            collect(done)
+            add_pending(membership_batch_size)
+            meter.update()
+        add_pending(1)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            collect(done)
+    if journal is not None:
+        journal.finish_upload(upload_id, "completed" if checkpoint.complete and not report["stopped"] else "incomplete")
+    seconds = time.perf_counter() - started
+    report["seconds"] = round(seconds, 3)
+    report["rows_per_second"] = round((report["rows"] - meter.rows_before) / seconds, 1) if seconds else 0.0
+    meter.update(force=True)
+    meter.close()
+    return report
+
+
+def count_rows(path: Union[str, Path]) -> int:
+    """Data rows in the CSV (line count less the header; quoted line breaks count extra). Reads in 1 MB chunks."""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(0, lines - 1)
+
+
+def column_mappings(path: Union[str, Path]) -> list:
+    """Imports API column mappings for the CSV's header: same column rules as the batch path."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), None) or []
+    mappings = []
+    for column in header:
+        name = column.strip().lower()
+        if not name:
+            continue
+        mapping = {"columnObjectTypeId": "0-1", "columnName": column, "propertyName": name}
+        if name == "email":
+            mapping["idColumnType"] = "HUBSPOT_ALTERNATE_ID"
+        mappings.append(mapping)
+    if not any(mapping["propertyName"] == "email" for mapping in mappings):
+        raise ValueError(f"{path} has no email column (columns: {', '.join(header)})")
+    return mappings
+
+
+def import_contacts(
+    hs,
+    path: Union[str, Path],
+    list_id: Optional[Union[str, int]] = None,
+    poll_seconds: float = IMPORT_POLL_SECONDS,
+    progress: bool = True,
+    max_wait_seconds: float = IMPORT_MAX_WAIT_SECONDS,
+) -> dict:
+    """
+    Upsert the CSV's contacts with one asynchronous import (POST /crm/v3/imports), wait for it,
+    then add everything it imported to list_id (from the static list the import creates).
+    Returns the same report as upload_contacts, plus "import_id"; created / updated come from
+    the import's counters and failed is the rest of the rows (errors and in-file duplicates).
+    Waits at most max_wait_seconds, and no longer than the current run deadline: an import
+    still running then keeps going in HubSpot, and the report has "stopped" set and its
+    import_id, without adding anything to the list.
+    """
+    started = time.perf_counter()
+    path = os.path.abspath(path)
+    mappings = column_mappings(path)
+    rows = count_rows(path)
+    print(f"📦 Importing {rows:,} rows with the HubSpot Imports API")
+    started_import = hs.start_contact_import(path, mappings, name=f"{os.path.basename(path)} ({time.strftime('%Y-%m-%d %H:%M')})")
+    import_id = str(started_import["id"])
+    state = started_import.get("state")
+    result = started_import
+    last_line = None
+    wait_until = time.monotonic() + max_wait_seconds
+    deadline = run_deadline.current()
+    if deadline is not None:
+        wait_until = min(wait_until, deadline.expires_at)
+    while state not in IMPORT_FINAL_STATES:
+        if time.monotonic() + poll_seconds > wait_until:
+            break
+        time.sleep(poll_seconds)
+        result = hs.get_import(import_id)
+        state = result.get("state")
+        counters = (result.get("metadata") or {}).get("counters") or {}
+        done = counters.get("CREATED_OBJECTS", 0) + counters.get("UPDATED_OBJECTS", 0)
+        line = f"  import {import_id}: {state}, {done:,} of {rows:,} rows written"
+        if progress and line != last_line:
+            print(line, flush=True)
+            last_line = line
+
+    metadata = result.get("metadata") or {}
+    counters = metadata.get("counters") or {}
+    created = counters.get("CREATED_OBJECTS", 0)
+    updated = counters.get("UPDATED_OBJECTS", 0)
+    total = counters.get("TOTAL_ROWS", rows)
+    finished = state in IMPORT_FINAL_STATES
+    report = {
+        "rows": total,
+        "created": created,
+        "updated": updated,
+        # Rows an unfinished import has not written yet have not failed
+        "failed": max(0, total - created - updated) if finished else 0,
+        "added_to_list": 0,
+        "list_add_failed": 0,
+        "seconds": 0.0,
+        "rows_per_second": 0.0,
+        "stopped": None,
+        "import_id": import_id,
+        "errors": [],
+    }
+    if not finished:
+        report["stopped"] = (
+            f"import {import_id} still {state} after {time.perf_counter() - started:.0f}s; "
+            f"it keeps running in HubSpot (GET /crm/v3/imports/{import_id})"
+        )
+    elif state != "DONE":
+        report["stopped"] = f"import {import_id} ended {state}"
+    elif list_id is not None:
+        import_lists = [
+            object_list["listId"] for object_list in metadata.get("objectLists", [])
+            if object_list.get("objectType", "CONTACT") == "CONTACT"
+        ]
+        if not import_lists:
+            report["list_add_failed"] = created + updated
+            _error(report, f"Import {import_id} did not report the list it created; add its contacts to list {list_id} by hand")
+        else:
+            try:
+                hs.add_list_members_from(list_id, import_lists[0])
+                report["added_to_list"] = created + updated
+            except requests.RequestException as e:
+                report["list_add_failed"] = created + updated
+                _error(report, f"Adding import list {import_lists[0]} to list {list_id} failed: {e}")
+    if report["failed"]:
+        _error(report, f"{report['failed']:,} row(s) not imported; see the import's errors in HubSpot (import {import_id})")
+    seconds = time.perf_counter() - started
+    report["seconds"] = round(seconds, 3)
+    report["rows_per_second"] = round(total / seconds, 1) if seconds else 0.0
+    return report
+
+
+def upload(hs, path: Union[str, Path], list_id: Optional[Union[str, int]] = None, method: str = "auto", **kwargs) -> dict:
+    """
+    Upload with batch upserts (upload_contacts) or the Imports API (import_contacts). method
+    "auto" imports files with more than IMPORT_THRESHOLD rows, unless resuming a batch upload.
+    kwargs go to upload_contacts.
+    """
+    if method == "auto":
+        method = "import" if not kwargs.get("resume") and count_rows(path) > IMPORT_THRESHOLD else "batch"
+    if method == "import":
+        return import_contacts(hs, path, list_id, progress=kwargs.get("progress", True))
+    return upload_contacts(hs, path, list_id, **kwargs)
+
+
+def resolve_list(hs, list_name: str) -> str:
+    """Id of the static list named list_name, created if it does not exist yet."""
+    list_id = hs.find_list_by_name(list_name)
+    if list_id:
+        print(f"✅ Found list '{list_name}' (id={list_id})")
+        return list_id
+    list_id = hs.create_list(list_name, list_name)
+    if not list_id:
+        raise ValueError(f"Could not find or create list '{list_name}'")
+    print(f"✅ Created list '{list_name}' (id={list_id})")
+    return list_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload contacts from a CSV file to a HubSpot static list")
+    parser.add_argument("csv", help="CSV file with an email column; other columns are contact property names")
+    parser.add_argument("list_name", nargs="?", help="Static list (segment) name; created if missing")
+    parser.add_argument("--list-id", help="Static list id (instead of a name)")
+    parser.add_argument("--workers", type=int, default=None, help=f"Batches in flight at once (default {DEFAULT_UPLOAD_WORKERS})")
+    parser.add_argument("--resume", action="store_true", help="Continue the last unfinished upload of this file to this list")
+    parser.add_argument(
+        "--method",
+        choices=["auto", "batch", "import"],
+        default="auto",
+        help=f"batch upserts, the Imports API, or auto: import above {IMPORT_THRESHOLD:,} rows",
+    )
+    parser.add_argument(
+        "--no-clean",
+        action="store_true",
+        help="Upload the file as it is, without normalizing and deduping it into <name>.clean.csv first",
+    )
+    parser.add_argument("--report", help="Write the result counts and errors to this JSON file")
+    args = parser.parse_args()
+
+    path = Path(args.csv)
+    if not path.exists():
+        print(f"File not found: {path}")
+        sys.exit(1)
+    if not args.list_name and not args.list_id:
+        parser.error("give a list name or --list-id")
+    if args.resume and args.method == "import":
+        parser.error("--resume applies to batch uploads only")
+
+    cleaning = None
+    if not args.no_clean:
+        # Cleaning is deterministic, so a --resume run regenerates the same file and its checkpoint still fits
+        clean_path, rejects_path = cleaned_paths(path)
+        cleaning = clean_contacts(path, clean_path, rejects_path)
+        print_clean_summary(cleaning)
+        path = clean_path
+
+    hs = get_hubspot()
+    list_id = args.list_id or resolve_list(hs, args.list_name)
+    print(f"📤 Uploading {path} to list {list_id}")
+    report = upload(hs, path, list_id, method=args.method, workers=args.workers, resume=args.resume)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({**report, "cleaning": cleaning}, f, indent=2)
+
+    print(f"\n{'='*60}")
+    print(
+        f"✅ {report['rows']:,} rows in {report['seconds']:.1f}s ({report['rows_per_second']:,.0f} rows/s): "
+        f"{report['created']:,} created, {report['updated']:,} updated, {report['failed']:,} failed; "
+        f"{report['added_to_list']:,} added to the list"
+    )
+    if report["stopped"]:
+        print(f"   ⏸️  Stopped early: {report['stopped']}")
+    for error in report["errors"]:
+        print(f"   ⚠️  {error}")
+    incomplete = report["stopped"] or report["list_add_failed"]
+    if report.get("upload_id") and incomplete:
+        print("   To continue from the last checkpoint, run the same command with --resume")
+    print(f"{'='*60}")
+    if report["failed"] or incomplete:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
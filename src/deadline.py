@@ -0,0 +1,84 @@
+"""
+Per-run deadline budget.
+run() activates a Deadline for its duration; every outbound HTTP call made while it is active
+(HubSpot, Salesforce, the Zapier webhook) derives its timeout from the remaining budget, and the
+run fails fast with DeadlineExceeded once the budget is spent.
+"""
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional, Union
+
+# Upper bound for any single request, with or without a run deadline (seconds)
+DEFAULT_REQUEST_TIMEOUT = float(os.environ.get("CAMPAIGN_REQUEST_TIMEOUT_SECONDS", "30"))
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    The run's time budget ran out. run() attaches what was completed so far as `partial`
+    (same shape as its normal result dict) before re-raising.
+    """
+
+    def __init__(self, message: str, partial: Optional[dict] = None):
+        super().__init__(message)
+        self.partial = partial
+
+
+class Deadline:
+    """A point in time (monotonic clock) by which the run must be finished."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, what: str = "") -> None:
+        """Raise DeadlineExceeded if the budget is spent."""
+        if self.expired():
+            suffix = f" before {what}" if what else ""
+            raise DeadlineExceeded(f"Run deadline of {self.seconds:g}s exceeded{suffix}")
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("campaign_run_deadline", default=None)
+
+
+def current() -> Optional[Deadline]:
+    """The deadline active in this context (run() thread or one of its stage threads), if any."""
+    return _current.get()
+
+
+@contextmanager
+def activate(seconds: Optional[float]):
+    """Make a Deadline of `seconds` current for the enclosed block (no-op if seconds is None)."""
+    if seconds is None:
+        yield None
+        return
+    deadline = Deadline(float(seconds))
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def request_timeout(cap: Union[float, tuple, None] = None, what: str = "") -> Union[float, tuple]:
+    """
+    Timeout for the next outbound request: the smaller of `cap` (default DEFAULT_REQUEST_TIMEOUT)
+    and the time left on the current deadline. Raises DeadlineExceeded if nothing is left.
+    """
+    if cap is None:
+        cap = DEFAULT_REQUEST_TIMEOUT
+    deadline = current()
+    if deadline is None:
+        return cap
+    deadline.check(what)
+    if isinstance(cap, tuple):
+        # (connect, read) tuple: bound each part by the remaining budget
+        return tuple(min(part, deadline.remaining()) if part else deadline.remaining() for part in cap)
+    return min(cap, deadline.remaining())
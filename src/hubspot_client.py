@@ -3,12 +3,43 @@ HubSpot Marketing Campaigns API client.
 Creates campaigns and associates lists (OBJECT_LIST) as assets.
 Requires: marketing.campaigns.read, marketing.campaigns.write
 """
+import json
 import os
-from typing import Optional, Union
+import threading
+import time
+import uuid
+from typing import Iterable, Iterator, Optional, Tuple, Union
 import requests
 
+from .transport import RetryingSession, TokenBucket
 
-HUBSPOT_BASE = "https://api.hubapi.com"
+
+# Overridable for local stand-ins (see bench/)
+HUBSPOT_BASE = os.environ.get("HUBSPOT_API_BASE", "https://api.hubapi.com").rstrip("/")
+
+# How long the in-process list name index is trusted before it is rebuilt (seconds).
+LIST_INDEX_TTL_SECONDS = float(os.environ.get("HUBSPOT_LIST_INDEX_TTL", "900"))
+# Minimum age before a lookup miss is allowed to trigger a full index rebuild (seconds).
+LIST_INDEX_MIN_REFRESH_SECONDS = 30.0
+# Page size for POST /crm/v3/lists/search name lookups.
+LIST_SEARCH_PAGE_SIZE = 100
+# How long the campaign name index is trusted before a full rebuild (seconds); in between,
+# misses are resolved by an incremental refresh of campaigns updated since the last one.
+CAMPAIGN_INDEX_TTL_SECONDS = float(os.environ.get("HUBSPOT_CAMPAIGN_INDEX_TTL", "900"))
+
+# Client-side pacing shared by every client using the same token (private apps get 100-190
+# requests per 10 seconds depending on tier), and retry budget for 429/5xx/connection errors.
+RATE_LIMIT_PER_SECOND = float(os.environ.get("HUBSPOT_RATE_LIMIT_PER_SECOND", "10"))
+RATE_LIMIT_BURST = float(os.environ.get("HUBSPOT_RATE_LIMIT_BURST", "10"))
+MAX_RETRIES = int(os.environ.get("HUBSPOT_MAX_RETRIES", "5"))
+
+# Contacts per batch upsert request (the endpoint's maximum) and record ids per list
+# membership add request.
+CONTACT_BATCH_SIZE = 100
+LIST_MEMBERSHIP_BATCH_SIZE = 1000
+
+_rate_limiters: dict = {}
+_rate_limiters_lock = threading.Lock()
 
 
 def _headers(access_token: str) -> dict:
@@ -18,6 +49,132 @@ def _headers(access_token: str) -> dict:
     }
 
 
+def _rate_limiter(access_token: str) -> TokenBucket:
+    """One token bucket per access token, shared by all clients in the process."""
+    with _rate_limiters_lock:
+        if access_token not in _rate_limiters:
+            _rate_limiters[access_token] = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+        return _rate_limiters[access_token]
+
+
+class _MultipartBody:
+    """
+    multipart/form-data body with text fields and one file part, streamed from disk as requests
+    sends it (never loaded into memory). len() gives the Content-Length up front; seek()/tell()
+    let RetryingSession rewind it for a retry.
+    """
+
+    def __init__(self, fields: dict, file_field: str, path: str, file_type: str = "text/csv"):
+        self.boundary = uuid.uuid4().hex
+        head = "".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        )
+        head += (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+            f'filename="{os.path.basename(path)}"\r\nContent-Type: {file_type}\r\n\r\n'
+        )
+        self._head = head.encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._path = path
+        self._file_size = os.path.getsize(path)
+        self._file = None
+        self._position = 0
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return len(self._head) + self._file_size + len(self._tail)
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        base = {0: 0, 1: self._position, 2: len(self)}[whence]
+        self._position = max(0, min(len(self), base + offset))
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = len(self) - self._position
+        chunks = []
+        while size > 0 and self._position < len(self):
+            file_start = len(self._head)
+            file_end = file_start + self._file_size
+            if self._position < file_start:
+                chunk = self._head[self._position:self._position + size]
+            elif self._position < file_end:
+                if self._file is None:
+                    self._file = open(self._path, "rb")
+                self._file.seek(self._position - file_start)
+                chunk = self._file.read(min(size, file_end - self._position))
+            else:
+                chunk = self._tail[self._position - file_end:self._position - file_end + size]
+            if not chunk:
+                break
+            chunks.append(chunk)
+            self._position += len(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _ListSearchUnavailable(Exception):
+    """The list search endpoint is not available for this portal/token."""
+
+
+class _NameIndex:
+    """
+    Thread-safe name -> id map with a TTL.
+    Only (name, id) string pairs are kept, never the full API objects, so memory stays
+    proportional to the number of names rather than the size of the list JSON.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self._ttl = ttl_seconds
+        self._ids: dict = {}
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        if self._built_at is None:
+            return True
+        return self._ttl > 0 and self.age() > self._ttl
+
+    def age(self) -> float:
+        """Seconds since the index was last rebuilt (infinite if never built)."""
+        if self._built_at is None:
+            return float("inf")
+        return time.monotonic() - self._built_at
+
+    def replace(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Swap in a freshly built index. Returns the number of names indexed."""
+        ids = {}
+        for name, item_id in pairs:
+            ids[name] = item_id
+        with self._lock:
+            self._ids = ids
+            self._built_at = time.monotonic()
+        return len(ids)
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            return self._ids.get(name)
+
+    def put(self, name: str, item_id: str) -> None:
+        with self._lock:
+            self._ids[name] = item_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
 def get_client(access_token: Optional[str] = None):
     token = access_token or os.environ.get("HUBSPOT_ACCESS_TOKEN")
     if not token:
@@ -26,10 +183,40 @@ def get_client(access_token: Optional[str] = None):
 
 
 class HubSpotCampaignClient:
-    def __init__(self, access_token: str):
+    def __init__(
+        self,
+        access_token: str,
+        list_index_ttl: Optional[float] = None,
+        campaign_index_ttl: Optional[float] = None,
+    ):
         self._token = access_token
-        self._session = requests.Session()
+        # Paces requests, honors X-HubSpot-RateLimit-* / Retry-After and retries 429s and 5xx
+        self._session = RetryingSession(
+            bucket=_rate_limiter(access_token),
+            max_retries=MAX_RETRIES,
+            rate_limit_prefix="X-HubSpot-RateLimit",
+            service="hubspot",
+        )
         self._session.headers.update(_headers(access_token))
+        # name -> listId, built once from the full list catalog and refreshed by TTL
+        self._list_index = _NameIndex(LIST_INDEX_TTL_SECONDS if list_index_ttl is None else list_index_ttl)
+        self._list_index_refresh_lock = threading.Lock()
+        # Flipped off the first time the list search endpoint turns out to be unavailable
+        self._list_search_available = True
+        # hs_name -> campaign id, built by paging the campaign catalog once; misses pull in only
+        # the campaigns updated since the newest updatedAt seen (the watermark)
+        self._campaign_index = _NameIndex(
+            CAMPAIGN_INDEX_TTL_SECONDS if campaign_index_ttl is None else campaign_index_ttl
+        )
+        self._campaign_index_refresh_lock = threading.Lock()
+        self._campaign_index_watermark: Optional[str] = None
+
+    def daily_calls_remaining(self) -> Optional[int]:
+        """
+        Calls left in the portal's daily allowance, from the latest response headers of any client
+        using this token (None until a response reported it).
+        """
+        return self._session.bucket.daily_remaining
 
     def get_most_recent_campaign(self) -> Optional[dict]:
         """Get the most recently created campaign. Returns campaign object if found, None otherwise."""
@@ -41,32 +228,113 @@ class HubSpotCampaignClient:
         campaigns = result.get("results", [])
         return campaigns[0] if campaigns else None
 
+    def get_campaign(self, campaign_id: str, properties: Optional[Iterable[str]] = None) -> dict:
+        """Get a campaign by id (campaignGuid) with the given properties (default: hs_name)."""
+        url = f"{HUBSPOT_BASE}/marketing/v3/campaigns/{campaign_id}"
+        r = self._session.get(url, params={"properties": ",".join(properties or ["hs_name"])})
+        r.raise_for_status()
+        return r.json()
+
+    def update_campaign(self, campaign_id: str, properties: dict) -> dict:
+        """Update campaign properties. Returns the updated campaign object."""
+        url = f"{HUBSPOT_BASE}/marketing/v3/campaigns/{campaign_id}"
+        r = self._session.patch(url, json={"properties": properties})
+        r.raise_for_status()
+        if properties.get("hs_name"):
+            self._campaign_index.put(properties["hs_name"], str(campaign_id))
+        return r.json()
+
+    def _iter_campaigns(self) -> Iterator[dict]:
+        """Yield every campaign, most recently updated first, one page at a time."""
+        url = f"{HUBSPOT_BASE}/marketing/v3/campaigns"
+        after = None
+        while True:
+            params = {"limit": 100, "sort": "-updatedAt", "properties": "hs_name"}
+            if after:
+                params["after"] = after
+            r = self._session.get(url, params=params)
+            r.raise_for_status()
+            result = r.json()
+            yield from result.get("results", [])
+
+            after = result.get("paging", {}).get("next", {}).get("after")
+            if not after:
+                break
+
+    @staticmethod
+    def _campaign_entry(campaign: dict) -> Tuple[Optional[str], str, Optional[str]]:
+        """(hs_name, id, updatedAt or createdAt) of a campaign object."""
+        name = (campaign.get("properties") or {}).get("hs_name")
+        return name, str(campaign.get("id")), campaign.get("updatedAt") or campaign.get("createdAt")
+
+    def refresh_campaign_index(self, force: bool = True) -> int:
+        """
+        Rebuild the campaign name index from the full campaign catalog.
+        With force=False the index is only rebuilt when it is missing or older than its TTL;
+        otherwise only campaigns updated since the last refresh are fetched (usually one page).
+        Returns the number of indexed campaign names.
+        """
+        with self._campaign_index_refresh_lock:
+            if force or self._campaign_index.is_stale():
+                pairs = []
+                watermark = None
+                for campaign in self._iter_campaigns():
+                    name, campaign_id, updated = self._campaign_entry(campaign)
+                    if name:
+                        pairs.append((name, campaign_id))
+                    if updated and (watermark is None or updated > watermark):
+                        watermark = updated
+                self._campaign_index_watermark = watermark
+                return self._campaign_index.replace(pairs)
+
+            watermark = self._campaign_index_watermark
+            for campaign in self._iter_campaigns():
+                name, campaign_id, updated = self._campaign_entry(campaign)
+                # Sorted by -updatedAt: everything past the watermark is already indexed
+                if watermark and updated and updated < watermark:
+                    break
+                if name:
+                    self._campaign_index.put(name, campaign_id)
+                if updated and (self._campaign_index_watermark is None or updated > self._campaign_index_watermark):
+                    self._campaign_index_watermark = updated
+        return len(self._campaign_index)
+
+    def find_campaign_by_name(self, name: str) -> Optional[str]:
+        """
+        Find a campaign id by exact name (hs_name). Checks the campaign index first; a miss
+        triggers a refresh (incremental unless the index is missing or expired).
+        """
+        campaign_id = self._campaign_index.get(name)
+        if campaign_id:
+            return campaign_id
+        self.refresh_campaign_index(force=False)
+        return self._campaign_index.get(name)
+
     def create_campaign(self, properties: dict) -> dict:
         """
         Create a campaign. Returns campaign object with id (campaignGuid).
-        If campaign already exists (409), returns the most recently created campaign as a workaround.
+        If a campaign with the same name already exists (409), returns that campaign.
         """
         url = f"{HUBSPOT_BASE}/marketing/v3/campaigns"
         payload = {"properties": properties}
         r = self._session.post(url, json=payload)
+        campaign_name = properties.get("hs_name")
         
         # Handle conflict - campaign already exists
         if r.status_code == 409:
-            campaign_name = properties.get("hs_name", "Unknown")
             print(f"  Campaign '{campaign_name}' already exists, fetching existing campaign...")
-            # Workaround: get the most recent campaign (likely the one we just tried to create)
-            # Note: This assumes the campaign was recently created. For production, consider
-            # implementing a proper search by name if HubSpot API supports it.
-            existing = self.get_most_recent_campaign()
-            if existing:
-                return existing
+            existing_id = self.find_campaign_by_name(campaign_name) if campaign_name else None
+            if existing_id:
+                return self.get_campaign(existing_id)
             # If we can't find it, raise the error
             r.raise_for_status()
-            return {}  # Should never reach here
         
         # Check for other errors
         r.raise_for_status()
-        return r.json()
+        campaign = r.json()
+        if campaign_name and campaign.get("id"):
+            self._campaign_index.put(campaign_name, str(campaign["id"]))
+        return campaign
 
     def associate_list(self, campaign_guid: str, list_id: Union[str, int]) -> None:
         """Associate a static list (OBJECT_LIST) with the campaign."""
@@ -74,17 +342,10 @@ class HubSpotCampaignClient:
         r = self._session.put(url)
         r.raise_for_status()
 
-    def find_list_by_name(self, name: str) -> Optional[str]:
-        """
-        Find a list by name. Returns list ID if found, None otherwise.
-        Tries multiple approaches: direct query, pagination, and checking campaign associations.
-        """
+    def _iter_lists(self) -> Iterator[dict]:
+        """Yield every list in the portal, one page at a time."""
         url = f"{HUBSPOT_BASE}/crm/v3/lists"
-        
-        # Try with pagination - get all lists
         offset = None
-        all_lists = []
-        
         while True:
             params = {"limit": 100}
             if offset:
@@ -92,22 +353,78 @@ class HubSpotCampaignClient:
             r = self._session.get(url, params=params)
             r.raise_for_status()
             result = r.json()
-            lists = result.get("lists", [])
-            all_lists.extend(lists)
-            
+            yield from result.get("lists", [])
+
             # Check pagination
             paging = result.get("paging", {})
             if paging.get("next"):
                 offset = paging["next"].get("after")
             else:
                 break
-        
-        # Search client-side
-        for list_obj in all_lists:
-            if list_obj.get("name") == name:
-                return str(list_obj.get("listId"))
-        
-        return None
+
+    def refresh_list_index(self, force: bool = True) -> int:
+        """
+        Rebuild the list name index from the full list catalog.
+        With force=False the index is only rebuilt when it is missing or older than its TTL.
+        Returns the number of indexed list names.
+        """
+        with self._list_index_refresh_lock:
+            if force or self._list_index.is_stale():
+                return self._list_index.replace(
+                    (list_obj.get("name"), str(list_obj.get("listId")))
+                    for list_obj in self._iter_lists()
+                    if list_obj.get("name")
+                )
+        return len(self._list_index)
+
+    def _search_list_id(self, name: str) -> Optional[str]:
+        """
+        Look up a list by exact name with the list search endpoint (POST /crm/v3/lists/search).
+        Stops at the first page containing an exact match. Raises _ListSearchUnavailable if the
+        endpoint cannot be used, so callers can fall back to the paginated scan.
+        """
+        url = f"{HUBSPOT_BASE}/crm/v3/lists/search"
+        offset = 0
+        while True:
+            payload = {"query": name, "count": LIST_SEARCH_PAGE_SIZE, "offset": offset}
+            try:
+                r = self._session.post(url, json=payload)
+            except requests.RequestException as e:
+                raise _ListSearchUnavailable(str(e))
+            if r.status_code in (404, 405, 501):
+                self._list_search_available = False
+                raise _ListSearchUnavailable(f"list search returned {r.status_code}")
+            if r.status_code >= 400:
+                raise _ListSearchUnavailable(f"list search returned {r.status_code}")
+            result = r.json()
+            lists = result.get("lists", [])
+            for list_obj in lists:
+                if list_obj.get("name") == name:
+                    return str(list_obj.get("listId"))
+            if not result.get("hasMore") or not lists:
+                return None
+            offset = result.get("offset") or offset + len(lists)
+
+    def find_list_by_name(self, name: str) -> Optional[str]:
+        """
+        Find a list by name. Returns list ID if found, None otherwise.
+        Checks the in-process list index first, then asks the list search endpoint (one or two
+        requests). Only if search is unavailable does it fall back to indexing the full catalog.
+        """
+        list_id = self._list_index.get(name)
+        if list_id:
+            return list_id
+        if self._list_search_available:
+            try:
+                list_id = self._search_list_id(name)
+            except _ListSearchUnavailable:
+                pass
+            else:
+                if list_id:
+                    self._list_index.put(name, list_id)
+                return list_id
+        self.refresh_list_index(force=False)
+        return self._list_index.get(name)
 
     def get_campaign_assets(self, campaign_id: str) -> list:
         """Get all assets (lists) associated with a campaign."""
@@ -122,25 +439,19 @@ class HubSpotCampaignClient:
 
     def find_list_by_exact_name(self, name: str) -> Optional[str]:
         """
-        Try to find a list by exact name using search API or by querying all lists.
-        This is a fallback when regular list lookup fails.
+        Find a list by exact name, rebuilding the list index first if the name is not in it.
+        This is a fallback when regular list lookup fails (e.g. the list was created elsewhere
+        after the index was built). A search miss is authoritative, so the rebuild only
+        happens when the search endpoint is unavailable.
         """
-        # Try searching with a broader query that might return the list
-        # Since direct search doesn't work, we'll need to rely on manual list_ids in config
-        # But we can try one more approach: check if we can query lists with filters
+        list_id = self.find_list_by_name(name)
+        if list_id or self._list_search_available or self._list_index.age() < LIST_INDEX_MIN_REFRESH_SECONDS:
+            return list_id
         try:
-            # Try getting lists with a name filter (may not work due to API limitations)
-            url = f"{HUBSPOT_BASE}/crm/v3/lists"
-            # Try with a very high limit to get all lists
-            r = self._session.get(url, params={"limit": 10000})
-            if r.status_code == 200:
-                result = r.json()
-                for list_obj in result.get("lists", []):
-                    if list_obj.get("name") == name:
-                        return str(list_obj.get("listId"))
-        except Exception:
-            pass
-        return None
+            self.refresh_list_index()
+        except requests.RequestException:
+            return None
+        return self._list_index.get(name)
 
     def create_list(self, name: str, campaign_name: str, campaign_id: Optional[str] = None) -> Optional[str]:
         """
@@ -162,10 +473,11 @@ class HubSpotCampaignClient:
             if error_data.get("subCategory") == "ILS.DUPLICATE_LIST_NAMES":
                 print(f"  List '{name}' already exists, attempting to find it...")
                 
-                # Try multiple methods to find the list
+                # The list exists, so a miss means search/index lag: rebuild from the full catalog
                 existing_id = self.find_list_by_name(name)
                 if not existing_id:
-                    existing_id = self.find_list_by_exact_name(name)
+                    self.refresh_list_index()
+                    existing_id = self._list_index.get(name)
                 
                 if existing_id:
                     print(f"  Found existing list '{name}' (id={existing_id})")
@@ -181,7 +493,90 @@ class HubSpotCampaignClient:
         r.raise_for_status()
         result = r.json()
         # Response format: {"list": {"listId": "..."}}
-        return str(result["list"]["listId"])
+        list_id = str(result["list"]["listId"])
+        self._list_index.put(name, list_id)
+        return list_id
+
+    def upsert_contacts(self, contacts: list) -> Tuple[list, list]:
+        """
+        Create or update up to CONTACT_BATCH_SIZE contacts, matched on email, with one
+        POST /crm/v3/objects/contacts/batch/upsert. Each contact is a property dict with an "email".
+        Returns (results, errors): results carry the contact "id" and "new" (True if created);
+        errors are the per-contact failures of a 207 Multi-Status response.
+        Requires: crm.objects.contacts.write
+        """
+        url = f"{HUBSPOT_BASE}/crm/v3/objects/contacts/batch/upsert"
+        payload = {
+            "inputs": [
+                {"idProperty": "email", "id": contact["email"], "properties": contact}
+                for contact in contacts
+            ]
+        }
+        r = self._session.post(url, json=payload)
+        r.raise_for_status()
+        result = r.json()
+        return result.get("results", []), result.get("errors", [])
+
+    def add_list_members(self, list_id: Union[str, int], contact_ids: Iterable) -> dict:
+        """
+        Add contacts to a static list (PUT /crm/v3/lists/{listId}/memberships/add), up to
+        LIST_MEMBERSHIP_BATCH_SIZE ids per call. Adding a current member is a no-op.
+        Returns the response: recordIdsAdded and recordIdsMissing (ids that are not contacts).
+        Requires: crm.lists.write
+        """
+        url = f"{HUBSPOT_BASE}/crm/v3/lists/{list_id}/memberships/add"
+        r = self._session.put(url, json=[str(contact_id) for contact_id in contact_ids])
+        r.raise_for_status()
+        return r.json()
+
+    def start_contact_import(self, path: str, column_mappings: list, name: Optional[str] = None) -> dict:
+        """
+        Start an asynchronous import of the CSV at path (POST /crm/v3/imports). The file is
+        streamed as a multipart upload with a Content-Length, never read into memory.
+        column_mappings are the importRequest's fileImportPage.columnMappings. Contacts are
+        upserted (matched on the column mapped with idColumnType HUBSPOT_ALTERNATE_ID, i.e. email),
+        and the import creates a static list of everything it imported (metadata.objectLists once
+        the import is done). Returns the import (id, state, ...).
+        Requires: crm.import
+        """
+        url = f"{HUBSPOT_BASE}/crm/v3/imports"
+        import_request = {
+            "name": name or os.path.basename(path),
+            "importOperations": {"0-1": "UPSERT"},
+            "createContactListFromImport": True,
+            "files": [{
+                "fileName": os.path.basename(path),
+                "fileFormat": "CSV",
+                "fileImportPage": {"hasHeader": True, "columnMappings": column_mappings},
+            }],
+        }
+        body = _MultipartBody({"importRequest": json.dumps(import_request)}, "files", path)
+        try:
+            r = self._session.post(url, data=body, headers={"Content-Type": body.content_type})
+        finally:
+            body.close()
+        r.raise_for_status()
+        return r.json()
+
+    def get_import(self, import_id: str) -> dict:
+        """An import's state (STARTED, PROCESSING, DONE, FAILED, CANCELED, DEFERRED) and metadata.counters."""
+        url = f"{HUBSPOT_BASE}/crm/v3/imports/{import_id}"
+        r = self._session.get(url)
+        r.raise_for_status()
+        return r.json()
+
+    def add_list_members_from(self, list_id: Union[str, int], source_list_id: Union[str, int]) -> None:
+        """Add every member of source_list_id to list_id (PUT /crm/v3/lists/{listId}/memberships/add-from/{sourceListId})."""
+        url = f"{HUBSPOT_BASE}/crm/v3/lists/{list_id}/memberships/add-from/{source_list_id}"
+        r = self._session.put(url)
+        r.raise_for_status()
+
+    def list_workflows(self) -> list:
+        """All workflows in the portal (id, name, type, ...), from one GET /automation/v3/workflows."""
+        url = f"{HUBSPOT_BASE}/automation/v3/workflows"
+        r = self._session.get(url)
+        r.raise_for_status()
+        return r.json().get("workflows", [])
 
     def create_workflow(
         self,
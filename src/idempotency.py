@@ -0,0 +1,87 @@
+"""
+Idempotency cache for campaign submissions.
+A duplicate submission (same Idempotency-Key header, or the same normalized config) gets the
+cached result, or waits for the identical run already in flight, instead of running again.
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Tuple
+
+# Config keys that do not change what gets created and must not affect the fingerprint
+_NON_IDENTITY_KEYS = ("deadline_seconds", "concurrency")
+
+
+def config_fingerprint(config: dict) -> str:
+    """Stable hash of a campaign config (key order and run-tuning settings ignored)."""
+    identity = {k: v for k, v in config.items() if k not in _NON_IDENTITY_KEYS}
+    canonical = json.dumps(identity, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("done", "result", "error", "expires_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.expires_at = None
+
+
+class IdempotencyCache:
+    """
+    Maps idempotency keys to results for ttl_seconds after completion.
+    run(key, fn) executes fn once per key: concurrent callers with the same key block until the
+    first call finishes and share its result (or exception). Failed calls are not cached, so a
+    later retry runs again.
+    """
+
+    def __init__(self, ttl_seconds: float = 600):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fn: Callable[[], object]) -> Tuple[object, bool]:
+        """Return (result, replayed). replayed is True if fn was not executed by this call."""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = _Entry()
+
+        if not owner:
+            entry.done.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.result, True
+
+        try:
+            entry.result = fn()
+        except BaseException as e:
+            entry.error = e
+            with self._lock:
+                self._entries.pop(key, None)
+            raise
+        else:
+            entry.expires_at = time.monotonic() + self.ttl_seconds
+        finally:
+            entry.done.set()
+        return entry.result, False
+
+    def forget(self, key: str) -> None:
+        """Drop a cached result so the next call with this key runs again."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _expire(self) -> None:
+        # Caller holds the lock
+        now = time.monotonic()
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry.expires_at is not None and entry.expires_at < now
+        ]
+        for key in expired:
+            del self._entries[key]
@@ -0,0 +1,122 @@
+"""
+Background job runner for campaign creation.
+Runs submissions on a bounded thread pool so the HTTP worker can answer immediately,
+and keeps job status/results in memory for the /jobs/<id> endpoint.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the job queue is at capacity and a new job cannot be admitted."""
+
+
+class JobRunner:
+    """
+    Bounded background executor with admission control.
+    At most max_workers jobs run at once and at most max_queue more wait for a worker;
+    anything beyond that is rejected with QueueFullError instead of piling up.
+    Finished jobs are kept for ttl_seconds so clients can poll for the result.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 20, ttl_seconds: float = 3600):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="campaign-job")
+        self._jobs: dict = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> str:
+        """Queue fn(*args, **kwargs). Returns the job id. Raises QueueFullError when full."""
+        with self._lock:
+            self._expire()
+            if self._pending >= self.max_workers + self.max_queue:
+                raise QueueFullError(
+                    f"Job queue is full ({self._pending} jobs pending); try again shortly"
+                )
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self._pending += 1
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a snapshot of the job, or None if unknown/expired."""
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+            }
+
+    def _run(self, job_id: str, fn: Callable, args: tuple, kwargs: dict) -> None:
+        self._update(job_id, status="running", started_at=time.time())
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            # Keep whatever the job completed (e.g. DeadlineExceeded.partial) alongside the error
+            self._update(
+                job_id,
+                status="failed",
+                error=str(e),
+                result=getattr(e, "partial", None),
+                finished_at=time.time(),
+            )
+        else:
+            self._update(job_id, status="succeeded", result=result, finished_at=time.time())
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _expire(self) -> None:
+        # Caller holds the lock
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def runner_from_env() -> JobRunner:
+    """
+    Build a JobRunner from environment settings:
+    CAMPAIGN_JOB_WORKERS (default 2), CAMPAIGN_JOB_QUEUE_SIZE (default 20),
+    CAMPAIGN_JOB_TTL_SECONDS (default 3600).
+    """
+    return JobRunner(
+        max_workers=int(os.environ.get("CAMPAIGN_JOB_WORKERS", "2")),
+        max_queue=int(os.environ.get("CAMPAIGN_JOB_QUEUE_SIZE", "20")),
+        ttl_seconds=float(os.environ.get("CAMPAIGN_JOB_TTL_SECONDS", "3600")),
+    )
@@ -0,0 +1,319 @@
+"""
+Durable run journal (SQLite).
+run() records every completed stage with its result, and every id it creates, as it goes. If the
+process dies mid-run (redeploy, gunicorn timeout), the run can be resumed: completed stages are
+not executed again, so no API write is repeated. The same tables act as a registry of created ids
+per campaign name, which the helper scripts use instead of name searches. Contact uploads
+(contact_upload.py) checkpoint here too: the byte offset and batch number everything before which
+is done, and every contact id already added to the target list.
+
+    python -m src.journal list                 # recent runs
+    python -m src.journal show "<campaign>"    # ids recorded for a campaign
+    python -m src.journal resume <run_id>      # continue an interrupted or failed run
+
+CAMPAIGN_JOURNAL_PATH sets the database file (default .campaign-journal.sqlite3 in the working
+directory); set it to "off" to disable journaling.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from typing import Iterable, Optional
+
+JOURNAL_PATH = os.environ.get("CAMPAIGN_JOURNAL_PATH", ".campaign-journal.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    campaign_name TEXT NOT NULL,
+    config TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    result TEXT,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (run_id, stage)
+);
+CREATE TABLE IF NOT EXISTS ids (
+    campaign_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL DEFAULT '',
+    object_id TEXT NOT NULL,
+    run_id TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (campaign_name, kind, key)
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    upload_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    list_id TEXT,
+    status TEXT NOT NULL,
+    byte_offset INTEGER NOT NULL DEFAULT 0,
+    batch_number INTEGER NOT NULL DEFAULT 0,
+    counts TEXT NOT NULL DEFAULT '{}',
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS upload_members (
+    upload_id TEXT NOT NULL,
+    contact_id TEXT NOT NULL,
+    PRIMARY KEY (upload_id, contact_id)
+);
+"""
+
+
+def _stage_ids(stage: str, result) -> list:
+    """(kind, key, id) registry entries for a completed run_campaign stage."""
+    if result is None:
+        return []
+    if stage == "hubspot.campaign":
+        return [("hubspot_campaign", "", result)]
+    if stage == "salesforce.campaign":
+        return [("salesforce_campaign", "", result)]
+    if stage.startswith("hubspot.list["):
+        return [("hubspot_list", stage[len("hubspot.list["):-1], result)]
+    if stage == "salesforce.member_statuses":
+        return [("member_status", label, status_id) for label, status_id in result.items()]
+    if stage.startswith("workflow[") and result.get("id"):
+        return [("workflow", result["status"], result["id"])]
+    return []
+
+
+class RunJournal:
+    """
+    SQLite-backed journal. One connection shared by all threads (writes are serialized by a lock);
+    WAL mode and synchronous=FULL make each recorded step durable once record_step() returns.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(_SCHEMA)
+
+    def start_run(self, campaign_name: str, config: dict) -> str:
+        run_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO runs (run_id, campaign_name, config, status, started_at, updated_at) "
+                "VALUES (?, ?, ?, 'running', ?, ?)",
+                (run_id, campaign_name, json.dumps(config, default=str), now, now),
+            )
+        return run_id
+
+    def record_step(self, run_id: str, campaign_name: str, stage: str, result) -> None:
+        """Persist a completed stage and register the ids it created, in one transaction."""
+        now = time.time()
+        with self._lock:
+            with self._db:
+                self._db.execute("BEGIN")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO steps (run_id, stage, result, completed_at) VALUES (?, ?, ?, ?)",
+                    (run_id, stage, json.dumps(result, default=str), now),
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO ids (campaign_name, kind, key, object_id, run_id, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(campaign_name, kind, key, str(object_id), run_id, now)
+                     for kind, key, object_id in _stage_ids(stage, result)],
+                )
+                self._db.execute("UPDATE runs SET updated_at = ? WHERE run_id = ?", (now, run_id))
+
+    def finish_run(self, run_id: str, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE runs SET status = ?, error = ?, updated_at = ? WHERE run_id = ?",
+                ("failed" if error else "completed", str(error) if error else None, time.time(), run_id),
+            )
+
+    def reopen_run(self, run_id: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE runs SET status = 'running', error = NULL, updated_at = ? WHERE run_id = ?",
+                (time.time(), run_id),
+            )
+
+    def get_run(self, run_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT run_id, campaign_name, config, status, error, started_at, updated_at FROM runs WHERE run_id = ?",
+                (run_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("run_id", "campaign_name", "config", "status", "error", "started_at", "updated_at")
+        run = dict(zip(keys, row))
+        run["config"] = json.loads(run["config"])
+        return run
+
+    def completed_steps(self, run_id: str) -> dict:
+        """stage -> result for every stage the run completed."""
+        with self._lock:
+            rows = self._db.execute("SELECT stage, result FROM steps WHERE run_id = ?", (run_id,)).fetchall()
+        return {stage: json.loads(result) for stage, result in rows}
+
+    def recent_runs(self, limit: int = 20) -> list:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT run_id, campaign_name, status, error, updated_at FROM runs ORDER BY updated_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(zip(("run_id", "campaign_name", "status", "error", "updated_at"), row)) for row in rows]
+
+    def register(self, campaign_name: str, kind: str, object_id: str, key: str = "") -> None:
+        """Record an id created outside run() (e.g. by a helper script)."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO ids (campaign_name, kind, key, object_id, run_id, updated_at) "
+                "VALUES (?, ?, ?, ?, NULL, ?)",
+                (campaign_name, kind, key, str(object_id), time.time()),
+            )
+
+    def lookup(self, campaign_name: str, kind: str, key: str = "") -> Optional[str]:
+        """Registered id of a campaign's object, e.g. lookup(name, "hubspot_list", "Registered")."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT object_id FROM ids WHERE campaign_name = ? AND kind = ? AND key = ?",
+                (campaign_name, kind, key),
+            ).fetchone()
+        return row[0] if row else None
+
+    def ids_for(self, campaign_name: str) -> dict:
+        """{kind: {key: id}} for everything registered under a campaign name."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT kind, key, object_id FROM ids WHERE campaign_name = ? ORDER BY kind, key",
+                (campaign_name,),
+            ).fetchall()
+        ids = {}
+        for kind, key, object_id in rows:
+            ids.setdefault(kind, {})[key] = object_id
+        return ids
+
+    def start_upload(self, path: str, list_id: Optional[str]) -> str:
+        upload_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO uploads (upload_id, path, list_id, status, started_at, updated_at) "
+                "VALUES (?, ?, ?, 'running', ?, ?)",
+                (upload_id, path, list_id, now, now),
+            )
+        return upload_id
+
+    def find_upload(self, path: str, list_id: Optional[str]) -> Optional[dict]:
+        """The latest unfinished upload of path to list_id, with its checkpoint, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT upload_id, byte_offset, batch_number, counts, status FROM uploads "
+                "WHERE path = ? AND list_id IS ? AND status != 'completed' ORDER BY updated_at DESC LIMIT 1",
+                (path, list_id),
+            ).fetchone()
+        if row is None:
+            return None
+        upload = dict(zip(("upload_id", "byte_offset", "batch_number", "counts", "status"), row))
+        upload["counts"] = json.loads(upload["counts"])
+        return upload
+
+    def checkpoint_upload(
+        self,
+        upload_id: str,
+        added_ids: Iterable = (),
+        byte_offset: Optional[int] = None,
+        batch_number: Optional[int] = None,
+        counts: Optional[dict] = None,
+    ) -> None:
+        """
+        Record contact ids just added to the list and, if given, the new checkpoint (every batch
+        before batch_number, i.e. every byte before byte_offset, is done), in one transaction.
+        """
+        now = time.time()
+        with self._lock:
+            with self._db:
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO upload_members (upload_id, contact_id) VALUES (?, ?)",
+                    [(upload_id, str(contact_id)) for contact_id in added_ids],
+                )
+                if byte_offset is not None:
+                    self._db.execute(
+                        "UPDATE uploads SET byte_offset = ?, batch_number = ?, counts = ?, updated_at = ? WHERE upload_id = ?",
+                        (byte_offset, batch_number, json.dumps(counts or {}), now, upload_id),
+                    )
+
+    def added_members(self, upload_id: str, contact_ids: Iterable) -> set:
+        """Those of contact_ids that the upload has already added to its list."""
+        contact_ids = [str(contact_id) for contact_id in contact_ids]
+        added = set()
+        # Chunked: older SQLite builds allow at most 999 parameters per statement
+        for start in range(0, len(contact_ids), 500):
+            chunk = contact_ids[start:start + 500]
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT contact_id FROM upload_members WHERE upload_id = ? AND contact_id IN (%s)"
+                    % ",".join("?" * len(chunk)),
+                    (upload_id, *chunk),
+                ).fetchall()
+            added.update(row[0] for row in rows)
+        return added
+
+    def finish_upload(self, upload_id: str, status: str) -> None:
+        """status: "completed", or "incomplete" (resumable)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE uploads SET status = ?, updated_at = ? WHERE upload_id = ?", (status, time.time(), upload_id)
+            )
+
+
+_journal: Optional[RunJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> Optional[RunJournal]:
+    """The process-wide journal at CAMPAIGN_JOURNAL_PATH, or None if journaling is off."""
+    global _journal
+    if JOURNAL_PATH.lower() in ("", "off", "none", "false"):
+        return None
+    with _journal_lock:
+        if _journal is None:
+            _journal = RunJournal(JOURNAL_PATH)
+        return _journal
+
+
+def main():
+    journal = get_journal()
+    if journal is None:
+        print("Journaling is disabled (CAMPAIGN_JOURNAL_PATH=off)")
+        sys.exit(1)
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+
+    if command == "list":
+        for run in journal.recent_runs():
+            updated = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["updated_at"]))
+            error = f"  {run['error']}" if run["error"] else ""
+            print(f"{run['run_id']}  {updated}  {run['status']:<9}  {run['campaign_name']}{error}")
+    elif command == "show" and len(sys.argv) > 2:
+        print(json.dumps(journal.ids_for(sys.argv[2]), indent=2))
+    elif command == "resume" and len(sys.argv) > 2:
+        # Imported here: run_campaign writes to this journal
+        from .run_campaign import resume
+        result = resume(sys.argv[2], journal=journal)
+        print("\nDone.", result)
+    else:
+        print("Usage: python -m src.journal [list | show <campaign name> | resume <run_id>]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+In-process metrics in Prometheus text format.
+Every HubSpot and Salesforce call (through transport.RetryingSession) is counted per service,
+method, templated endpoint and status, with a latency histogram and retry count; rate-limit
+headers (X-HubSpot-RateLimit-*, Sforce-Limit-Info) feed headroom gauges. run_campaign adds
+per-stage and per-run durations. render() returns the exposition text served at /metrics.
+
+Metrics are per process: with several gunicorn workers each worker reports its own.
+"""
+import contextvars
+import re
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+from . import transport
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+API_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+STAGE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Path segments that are object ids, not part of the endpoint: numbers, GUIDs / hex ids and
+# 15/18-character Salesforce ids
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-fA-F-]{16,}|(?=[a-zA-Z0-9]*\d)(?=[a-zA-Z0-9]*[a-zA-Z])[a-zA-Z0-9]{15}(?:[a-zA-Z0-9]{3})?)$"
+)
+_VERSION_SEGMENT = re.compile(r"^v\d+(\.\d+)?$")
+
+
+def endpoint_template(url: str) -> str:
+    """/crm/v3/lists/123/memberships/add -> /crm/v3/lists/{id}/memberships/add (query dropped)."""
+    segments = urlsplit(url).path.split("/")
+    return "/".join(
+        "{id}" if segment and not _VERSION_SEGMENT.match(segment) and _ID_SEGMENT.match(segment) else segment
+        for segment in segments
+    ) or "/"
+
+
+def stage_template(stage: str) -> str:
+    """workflow[Registered] -> workflow (one series per kind of stage, not per status)."""
+    return stage.split("[", 1)[0]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def _samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (), buckets: Iterable[float] = API_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, *labels: str, value: float) -> None:
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                # [per-bucket counts..., sum, count]
+                entry = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+                    break
+            entry[-2] += value
+            entry[-1] += 1
+
+    def _samples(self):
+        for labels, entry in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(round(entry[-2], 6))}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {entry[-1]}"
+
+
+API_REQUESTS = Counter(
+    "campaign_api_requests_total", "HubSpot/Salesforce API calls by final status", ("service", "method", "endpoint", "status")
+)
+API_LATENCY = Histogram(
+    "campaign_api_request_duration_seconds", "API call latency, retries and backoff included", ("service", "method", "endpoint")
+)
+API_RETRIES = Counter("campaign_api_retries_total", "API call retries (429, 5xx, connection errors)", ("service", "endpoint"))
+RATE_LIMIT_REMAINING = Gauge(
+    "campaign_api_rate_limit_remaining", "Calls left in the API's rate-limit window, from response headers", ("service", "window")
+)
+RATE_LIMIT_MAX = Gauge("campaign_api_rate_limit_max", "Size of the API's rate-limit window", ("service", "window"))
+STAGE_DURATION = Histogram(
+    "campaign_stage_duration_seconds", "run_campaign stage wall time", ("stage",), buckets=STAGE_BUCKETS
+)
+RUN_DURATION = Histogram(
+    "campaign_run_duration_seconds", "Whole run_campaign wall time", ("outcome",), buckets=STAGE_BUCKETS
+)
+RUNS = Counter("campaign_runs_total", "run_campaign runs by outcome", ("outcome",))
+
+REGISTRY = (API_REQUESTS, API_LATENCY, API_RETRIES, RATE_LIMIT_REMAINING, RATE_LIMIT_MAX, STAGE_DURATION, RUN_DURATION, RUNS)
+
+
+def rate_limits(service: Optional[str], headers) -> dict:
+    """(window -> (remaining, max)) from a response's rate-limit headers."""
+    limits = {}
+    if service == "hubspot":
+        for window, prefix in (("interval", "X-HubSpot-RateLimit"), ("daily", "X-HubSpot-RateLimit-Daily")):
+            remaining = headers.get(f"{prefix}-Remaining")
+            if remaining is not None:
+                try:
+                    limits[window] = (int(remaining), int(headers.get(prefix) or headers.get(f"{prefix}-Max") or 0))
+                except ValueError:
+                    pass
+    elif service == "salesforce":
+        # Sforce-Limit-Info: api-usage=25/15000
+        match = re.search(r"api-usage=(\d+)/(\d+)", headers.get("Sforce-Limit-Info") or "")
+        if match:
+            used, limit = int(match.group(1)), int(match.group(2))
+            limits["daily"] = (limit - used, limit)
+    return limits
+
+
+class RunMetrics:
+    """API usage of one run, summarized into the run result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.seconds = 0.0
+        self.endpoints: dict = {}  # "METHOD /endpoint" -> [calls, seconds]
+        self.rate_limit_remaining: dict = {}  # "service.window" -> lowest remaining seen
+
+    def observe(self, key: str, event: transport.RequestEvent, limits: dict) -> None:
+        with self._lock:
+            self.calls += 1
+            self.retries += event.retries
+            self.seconds += event.seconds
+            if event.error is not None or (event.status or 0) >= 400:
+                self.errors += 1
+            entry = self.endpoints.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += event.seconds
+            for window, (remaining, _) in limits.items():
+                name = f"{event.service}.{window}"
+                self.rate_limit_remaining[name] = min(remaining, self.rate_limit_remaining.get(name, remaining))
+
+    def summary(self, top: int = 5) -> dict:
+        with self._lock:
+            slowest = sorted(self.endpoints.items(), key=lambda item: item[1][1], reverse=True)[:top]
+            return {
+                "api_calls": self.calls,
+                "api_errors": self.errors,
+                "retries": self.retries,
+                "api_seconds": round(self.seconds, 3),
+                "slowest_endpoints": [
+                    {"endpoint": key, "calls": calls, "seconds": round(seconds, 3)} for key, (calls, seconds) in slowest
+                ],
+                "rate_limit_remaining": dict(self.rate_limit_remaining),
+            }
+
+
+_current_run: contextvars.ContextVar = contextvars.ContextVar("campaign_run_metrics", default=None)
+
+
+@contextmanager
+def track_run() -> Iterator[RunMetrics]:
+    """Collect the API calls made in this context (and stages it starts) into a RunMetrics."""
+    run_metrics = RunMetrics()
+    token = _current_run.set(run_metrics)
+    try:
+        yield run_metrics
+    finally:
+        _current_run.reset(token)
+
+
+def _observe_request(event: transport.RequestEvent) -> None:
+    service = event.service or "other"
+    endpoint = endpoint_template(event.url)
+    status = str(event.status) if event.status is not None else type(event.error).__name__
+    API_REQUESTS.inc(service, event.method, endpoint, status)
+    API_LATENCY.observe(service, event.method, endpoint, value=event.seconds)
+    if event.retries:
+        API_RETRIES.inc(service, endpoint, amount=event.retries)
+    limits = rate_limits(event.service, event.headers)
+    for window, (remaining, limit) in limits.items():
+        RATE_LIMIT_REMAINING.set(service, window, value=remaining)
+        if limit:
+            RATE_LIMIT_MAX.set(service, window, value=limit)
+    run_metrics = _current_run.get()
+    if run_metrics is not None:
+        run_metrics.observe(f"{event.method} {endpoint}", event, limits)
+
+
+def observe_run(timings: dict, outcome: str, seconds: float) -> None:
+    """Record a finished run_campaign run: each stage's wall time, the total and the outcome."""
+    for stage, stage_seconds in timings.items():
+        STAGE_DURATION.observe(stage_template(stage), value=stage_seconds)
+    RUN_DURATION.observe(outcome, value=seconds)
+    RUNS.inc(outcome)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+transport.add_request_listener(_observe_request)
@@ -0,0 +1,308 @@
+"""
+Plan/apply reconciliation for campaigns that may already exist.
+plan() reads what is already there (HubSpot campaign properties and list assets, segment lists,
+workflows, the Salesforce campaign and its member statuses) with a handful of reads and diffs it
+against the config; apply() then issues only the writes in the plan. A rerun of an unchanged
+config is all reads and no writes, instead of a POST per object answered by 409/400 errors.
+
+    python -m src.run_campaign config/campaigns/my-campaign.yaml --plan    # print the plan
+    python -m src.run_campaign config/campaigns/my-campaign.yaml --apply   # plan + apply
+"""
+import os
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from .config import CampaignConfig, resolve_config
+from . import deadline as run_deadline
+from .hubspot_client import get_client as get_hubspot
+from .run_campaign import DEFAULT_DEADLINE_SECONDS, hubspot_properties, salesforce_fields
+from .salesforce_client import (
+    get_client as get_salesforce,
+    create_campaign as sf_create_campaign,
+    create_campaign_with_statuses,
+    create_campaign_member_statuses,
+    find_campaign_record,
+    find_parent_campaign,
+    update_campaign as sf_update_campaign,
+    get_member_statuses,
+    diff_member_statuses,
+    apply_member_status_changes,
+)
+
+_SYMBOLS = {"create": "+", "update": "~", "associate": "+", "notify": ">"}
+
+
+class Change:
+    """One write in a plan. apply_fn performs it, reading/updating the plan's state (ids)."""
+
+    __slots__ = ("target", "action", "detail", "apply_fn")
+
+    def __init__(self, target: str, action: str, detail: str, apply_fn: Callable[[], None]):
+        self.target = target
+        self.action = action
+        self.detail = detail
+        self.apply_fn = apply_fn
+
+    def __str__(self) -> str:
+        return f"{_SYMBOLS.get(self.action, '*')} {self.target}: {self.action} {self.detail}"
+
+
+class Plan:
+    """
+    Writes needed to make HubSpot and Salesforce match a campaign config, in the order they must
+    run. `state` holds the ids known so far; apply() fills in the ids of created objects.
+    """
+
+    def __init__(self, config: CampaignConfig):
+        self.config = config
+        self.changes: list = []
+        self.unchanged: list = []
+        self.state = {
+            "hubspot_campaign_id": None,
+            "salesforce_campaign_id": None,
+            "lists": {},  # status -> list id
+            "manual_list_ids": [],
+            "member_statuses": {},  # label -> CampaignMemberStatus Id
+            "workflows": [],
+        }
+
+    def add(self, target: str, action: str, detail: str, apply_fn: Callable[[], None]) -> None:
+        self.changes.append(Change(target, action, detail, apply_fn))
+
+    def format(self) -> str:
+        lines = [f"Plan for '{self.config.name}': {len(self.changes)} change(s), {len(self.unchanged)} up to date"]
+        lines.extend(f"  {change}" for change in self.changes)
+        lines.extend(f"  = {item}" for item in self.unchanged)
+        return "\n".join(lines)
+
+
+def _same(current, desired) -> bool:
+    """Compare an API value with a config value (APIs return strings/booleans/numbers loosely)."""
+    if current == desired:
+        return True
+    if current is None or desired is None:
+        return current in (None, "") and desired in (None, "")
+    return str(current).lower() == str(desired).lower()
+
+
+def _describe(changed: dict, current: dict) -> str:
+    return ", ".join(f"{k}: {current.get(k)!r} -> {v!r}" for k, v in changed.items())
+
+
+def plan(config: Union[str, Path, dict, CampaignConfig], hs=None, sf=None) -> Plan:
+    """Read the current state of the campaign and return the Plan of writes needed."""
+    config = resolve_config(config)
+    hs = hs or get_hubspot()
+    sf = sf or get_salesforce()
+    result = Plan(config)
+    _plan_hubspot(result, hs)
+    _plan_salesforce(result, sf)
+    _plan_workflows(result, hs)
+
+    webhook = config.workflows.zapier_webhook_url or os.environ.get("ZAPIER_CAMPAIGN_CREATED_WEBHOOK")
+    created = any(c.target.endswith(".campaign") and c.action == "create" for c in result.changes)
+    if webhook and created:
+        result.add("zapier", "notify", "campaign created webhook", lambda: _notify(result, webhook))
+    return result
+
+
+def _plan_hubspot(result: Plan, hs) -> None:
+    config, state = result.config, result.state
+    name = config.name
+    props = hubspot_properties(hs, config)
+
+    hubspot_id = hs.find_campaign_by_name(name)
+    assets = {}
+    if hubspot_id is None:
+        def create_campaign():
+            state["hubspot_campaign_id"] = hs.create_campaign(props)["id"]
+            print(f"Created HubSpot campaign: {name} (id={state['hubspot_campaign_id']})")
+        result.add("hubspot.campaign", "create", repr(name), create_campaign)
+    else:
+        state["hubspot_campaign_id"] = hubspot_id
+        current = hs.get_campaign(hubspot_id, properties=list(props)).get("properties") or {}
+        changed = {k: v for k, v in props.items() if not _same(current.get(k), v)}
+        if changed:
+            result.add(
+                "hubspot.campaign", "update", _describe(changed, current),
+                lambda: hs.update_campaign(hubspot_id, changed),
+            )
+        else:
+            result.unchanged.append(f"hubspot.campaign {name!r} ({hubspot_id})")
+        assets = {str(a.get("id")): a.get("name", "") for a in hs.get_campaign_assets(hubspot_id)}
+    asset_ids_by_name = {asset_name: asset_id for asset_id, asset_name in assets.items()}
+
+    def associate(list_id):
+        def run():
+            hs.associate_list(state["hubspot_campaign_id"], list_id)
+        return run
+
+    for status in config.hubspot.auto_create_segments:
+        list_name = f"{name} - {status}"
+        list_id = asset_ids_by_name.get(list_name)
+        if list_id:
+            state["lists"][status] = list_id
+            result.unchanged.append(f"hubspot.list {list_name!r} ({list_id})")
+            continue
+        list_id = hs.find_list_by_name(list_name)
+        if list_id:
+            state["lists"][status] = list_id
+            result.add("hubspot.list", "associate", f"{list_name!r} ({list_id})", associate(list_id))
+            continue
+
+        def create_list(status=status, list_name=list_name):
+            list_id = hs.create_list(list_name, name, campaign_id=state["hubspot_campaign_id"])
+            if list_id:
+                state["lists"][status] = list_id
+                hs.associate_list(state["hubspot_campaign_id"], list_id)
+                print(f"  ✓ Created and associated list '{list_name}' (id={list_id})")
+        result.add("hubspot.list", "create", repr(list_name), create_list)
+
+    for list_id in config.hubspot.list_ids:
+        state["manual_list_ids"].append(list_id)
+        if list_id in assets:
+            result.unchanged.append(f"hubspot.list {list_id}")
+        else:
+            result.add("hubspot.list", "associate", list_id, associate(list_id))
+
+
+def _plan_salesforce(result: Plan, sf) -> None:
+    config, state = result.config, result.state
+    name = config.name
+    statuses = config.member_statuses
+    parent_id = find_parent_campaign(sf, config.salesforce.parent_campaign) if config.salesforce.parent_campaign else None
+    if config.salesforce.parent_campaign and not parent_id:
+        print(f"  Warning: Parent campaign '{config.salesforce.parent_campaign}' not found in Salesforce")
+    sf_fields = salesforce_fields(config, parent_id)
+
+    record = find_campaign_record(sf, name, sf_fields)
+    if record is None:
+        def create_campaign():
+            if config.salesforce.use_composite and statuses:
+                created = create_campaign_with_statuses(sf, name, statuses, **sf_fields)
+                state["salesforce_campaign_id"] = created["campaign_id"]
+                state["member_statuses"].update(created["statuses"])
+                if created["errors"]:
+                    # Only the labels the composite request could not create are written again
+                    state["member_statuses"].update(
+                        create_campaign_member_statuses(sf, state["salesforce_campaign_id"], statuses)
+                    )
+            else:
+                state["salesforce_campaign_id"] = sf_create_campaign(sf, name, **sf_fields)
+                if statuses:
+                    state["member_statuses"].update(
+                        create_campaign_member_statuses(sf, state["salesforce_campaign_id"], statuses)
+                    )
+            print(f"Created Salesforce campaign: {name} (id={state['salesforce_campaign_id']})")
+        detail = repr(name) + (f" with member statuses {', '.join(statuses)}" if statuses else "")
+        result.add("salesforce.campaign", "create", detail, create_campaign)
+        return
+
+    salesforce_id = state["salesforce_campaign_id"] = record["Id"]
+    changed = {k: v for k, v in sf_fields.items() if not _same(record.get(k), v)}
+    if changed:
+        result.add(
+            "salesforce.campaign", "update", _describe(changed, record),
+            lambda: sf_update_campaign(sf, salesforce_id, **changed),
+        )
+    else:
+        result.unchanged.append(f"salesforce.campaign {name!r} ({salesforce_id})")
+
+    if not statuses:
+        return
+    ids, inserts, updates = diff_member_statuses(get_member_statuses(sf, salesforce_id), salesforce_id, statuses)
+    state["member_statuses"].update(ids)
+    if inserts or updates:
+        created = ", ".join(repr(label) for label, _ in inserts)
+        updated = ", ".join(
+            f"{label!r} ({', '.join(k for k in fields if k != 'id')})" for label, fields in updates
+        )
+        if inserts and updates:
+            action, detail = "update", f"create {created}; update {updated}"
+        else:
+            action, detail = ("create", created) if inserts else ("update", updated)
+
+        def write_statuses():
+            state["member_statuses"].update(apply_member_status_changes(sf, statuses, ids, inserts, updates))
+        result.add("salesforce.member_statuses", action, detail, write_statuses)
+    else:
+        result.unchanged.append(f"salesforce.member_statuses {', '.join(statuses)}")
+
+
+def _plan_workflows(result: Plan, hs) -> None:
+    config, state = result.config, result.state
+    if not (config.hubspot.create_workflows and config.member_statuses):
+        return
+    existing = {workflow.get("name"): workflow.get("id") for workflow in hs.list_workflows()}
+    webhook_url = config.workflows.zapier_webhook_url or os.environ.get("ZAPIER_CAMPAIGN_CREATED_WEBHOOK")
+
+    for status in config.member_statuses:
+        workflow_name = f"{config.name} - {status}"
+        if workflow_name in existing:
+            result.unchanged.append(f"workflow {workflow_name!r} ({existing[workflow_name]})")
+            continue
+
+        def create_workflow(status=status, workflow_name=workflow_name):
+            list_id = state["lists"].get(status) or hs.find_list_by_name(workflow_name)
+            if not list_id:
+                print(f"  ⚠️  Skipped workflow creation for '{workflow_name}' (list ID not found)")
+                return
+            workflow = hs.create_workflow_with_enrollment(
+                workflow_name=workflow_name,
+                list_id=list_id,
+                salesforce_campaign_id=state["salesforce_campaign_id"],
+                salesforce_status=status,
+                wait_minutes=config.workflows.wait_minutes,
+                webhook_url=webhook_url,
+                salesforce_campaign_name=config.name,
+            )
+            state["workflows"].append({
+                "name": workflow_name,
+                "id": workflow.get("id"),
+                "status": status,
+                "list_id": list_id,
+            })
+        result.add("workflow", "create", repr(workflow_name), create_workflow)
+
+
+def _notify(result: Plan, webhook: str) -> None:
+    import requests
+    r = requests.post(
+        webhook,
+        json={
+            "hubspot_campaign_id": result.state["hubspot_campaign_id"],
+            "salesforce_campaign_id": result.state["salesforce_campaign_id"],
+            "campaign_name": result.config.name,
+        },
+        timeout=run_deadline.request_timeout(what="Zapier webhook"),
+    )
+    result.state["webhook_status"] = r.status_code
+    print(f"Triggered workflow webhook: {r.status_code}")
+
+
+def apply(campaign_plan: Plan, deadline_seconds: Optional[float] = None) -> dict:
+    """
+    Perform the writes in a plan, in order. Returns the same fields as run_campaign.run() plus
+    the applied changes. The first failing write is raised; later writes are not attempted.
+    """
+    config = campaign_plan.config
+    if deadline_seconds is None:
+        deadline_seconds = config.deadline_seconds or DEFAULT_DEADLINE_SECONDS
+    applied = []
+    with run_deadline.activate(float(deadline_seconds) if deadline_seconds else None):
+        for change in campaign_plan.changes:
+            print(f"Applying {change}")
+            change.apply_fn()
+            applied.append(str(change))
+
+    state = campaign_plan.state
+    return {
+        "hubspot_campaign_id": state["hubspot_campaign_id"],
+        "salesforce_campaign_id": state["salesforce_campaign_id"],
+        "campaign_name": config.name,
+        "hubspot_list_ids": list(dict.fromkeys(list(state["lists"].values()) + state["manual_list_ids"])),
+        "hubspot_workflows": state["workflows"],
+        "workflow": {"webhook_status": state["webhook_status"]} if "webhook_status" in state else {},
+        "applied_changes": applied,
+        "unchanged": len(campaign_plan.unchanged),
+    }
@@ -1,317 +1,557 @@
 """
-Run campaign creation from a YAML config.
+Run campaign creation from a YAML config (or an in-memory config dict / CampaignConfig).
 Creates campaign in HubSpot (name, taxonomy, list associations) and Salesforce (name, type, status),
 then optionally triggers a workflow webhook (e.g. Zapier).
 """
+import argparse
 import os
 import sys
+import time
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
-import yaml
 from dotenv import load_dotenv
 
 from .hubspot_client import get_client as get_hubspot
 from .salesforce_client import (
     get_client as get_salesforce,
     create_campaign as sf_create_campaign,
+    find_campaign_by_name as sf_find_campaign_by_name,
     find_parent_campaign,
     create_campaign_member_statuses,
+    create_campaign_with_statuses,
 )
+from .config import CampaignConfig, resolve_config
+from . import deadline as run_deadline
+from . import metrics
+from . import tracing
+from .deadline import DeadlineExceeded
+from .journal import RunJournal, get_journal
+from .stage_graph import StageGraph
 
 load_dotenv()
+tracing.configure_from_env()
 
 
-def load_config(path: Union[str, Path]) -> dict:
-    with open(path) as f:
-        return yaml.safe_load(f)
+# Default number of stages run() executes at once (override per campaign with `concurrency:`)
+DEFAULT_MAX_WORKERS = int(os.environ.get("CAMPAIGN_MAX_WORKERS", "4"))
+# Default time budget for a whole run in seconds (override with `deadline_seconds:`); unset = none
+DEFAULT_DEADLINE_SECONDS = os.environ.get("CAMPAIGN_RUN_DEADLINE_SECONDS")
 
 
-def run(config_path: Union[str, Path]) -> dict:
+def _is_already_associated(error: Exception) -> bool:
+    error_str = str(error).lower()
+    return any(keyword in error_str for keyword in ["already", "409", "duplicate", "conflict"])
+
+
+def hubspot_properties(hs, config: CampaignConfig) -> dict:
+    """HubSpot campaign properties for a config."""
+    return hs.build_properties(
+        name=config.name,
+        start_date=config.start_date,
+        end_date=config.end_date,
+        taxonomy=config.taxonomy.hubspot,
+        tags=config.tags,
+        extra=config.hubspot.extra_properties,
+    )
+
+
+def salesforce_fields(config: CampaignConfig, parent_id: Optional[str] = None) -> dict:
+    """Salesforce Campaign fields (besides Name) for a config."""
+    # Required fields: IsActive=True, StartDate, EndDate
+    sf_fields = {
+        "IsActive": True,
+    }
+    if config.start_date:
+        sf_fields["StartDate"] = config.start_date
+    if config.end_date:
+        sf_fields["EndDate"] = config.end_date
+
+    # Optional fields
+    sf_fields["Status"] = config.salesforce.status
+    if config.salesforce.description:
+        sf_fields["Description"] = config.salesforce.description
+    if config.taxonomy.salesforce:
+        sf_fields.update(config.taxonomy.salesforce)
+    if config.salesforce.custom_fields:
+        sf_fields.update(config.salesforce.custom_fields)
+    if parent_id:
+        sf_fields["ParentId"] = parent_id
+    return sf_fields
+
+
+def run(
+    config: Union[str, Path, dict, CampaignConfig],
+    max_workers: Optional[int] = None,
+    deadline_seconds: Optional[float] = None,
+    hs=None,
+    sf=None,
+    journal: Optional[RunJournal] = None,
+    run_id: Optional[str] = None,
+) -> dict:
     """
-    Load YAML config, create campaign in HubSpot and Salesforce, associate lists, trigger workflows.
-    Returns dict with hubspot_campaign_id, salesforce_campaign_id, and any workflow result.
+    Load config, create campaign in HubSpot and Salesforce, associate lists, trigger workflows.
+    Returns dict with hubspot_campaign_id, salesforce_campaign_id, any workflow result, the
+    journal run_id, per-stage timings (seconds) and a summary of the API calls made (`metrics`:
+    call/error/retry counts, slowest endpoints, lowest rate-limit headroom seen). The same data
+    feeds the process-wide Prometheus metrics (src/metrics.py). With tracing on (src/tracing.py)
+    the run is one trace, a span per stage and per HTTP call, and trace_id identifies it.
+
+    config is a YAML path, a config dict (same shape as the YAML) or a CampaignConfig. It is
+    validated before any API call; an invalid config raises ValueError.
+
+    hs / sf are an existing HubSpot client and Salesforce connection to reuse (the batch runner
+    shares one of each across campaigns); by default each run creates its own.
+
+    deadline_seconds (or `deadline_seconds:` in the config, or CAMPAIGN_RUN_DEADLINE_SECONDS) caps
+    the whole run: every HubSpot/Salesforce/Zapier call takes its timeout from the remaining
+    budget, and when it runs out DeadlineExceeded is raised with `.partial` holding the result
+    fields completed so far.
+
+    Each completed stage and the ids it created are recorded in the run journal (default
+    get_journal(), see src/journal.py). run_id continues an interrupted run from that journal:
+    completed stages are skipped, and the stages whose writes may have landed before the crash
+    check for the existing Salesforce campaign and workflows instead of creating them again
+    (see resume()).
+
+    The work is an explicit stage graph run on a thread pool (at most max_workers stages at once,
+    default from `concurrency:` in the config or CAMPAIGN_MAX_WORKERS):
+
+        hubspot.campaign ─┬─ hubspot.list[<status>] ... ─┬─ hubspot.list_mapping ─┐
+                          └─ hubspot.manual_lists ───────┘                        ├─ workflow[<status>] ... ─ zapier
+        salesforce.login ─ salesforce.parent ─ salesforce.campaign ─ salesforce.member_statuses ─┘
     """
-    config = load_config(config_path)
-    name = config["name"]
-    start_date = config.get("start_date")
-    end_date = config.get("end_date")
-    taxonomy = config.get("taxonomy") or {}
-    hubspot_cfg = config.get("hubspot") or {}
-    salesforce_cfg = config.get("salesforce") or {}
-    workflows_cfg = config.get("workflows") or {}
+    run_started = time.perf_counter()
+    config = resolve_config(config)
+    name = config.name
+    hubspot_cfg = config.hubspot
+    salesforce_cfg = config.salesforce
+    if max_workers is None:
+        max_workers = config.concurrency or DEFAULT_MAX_WORKERS
+    if deadline_seconds is None:
+        deadline_seconds = config.deadline_seconds or DEFAULT_DEADLINE_SECONDS
+
+    segment_statuses = hubspot_cfg.auto_create_segments
+    manual_list_ids = hubspot_cfg.list_ids
+    manual_list_status_map = hubspot_cfg.list_status_map  # Map list_id to status
+    member_statuses = config.member_statuses
+    create_workflows = hubspot_cfg.create_workflows
+    workflow_webhook_url = config.workflows.zapier_webhook_url or os.environ.get("ZAPIER_CAMPAIGN_CREATED_WEBHOOK")
+    wait_minutes = config.workflows.wait_minutes
+    # Create the Salesforce campaign and its member statuses in one Composite request
+    use_composite = salesforce_cfg.use_composite
+    composite_statuses = {}  # Filled by salesforce.campaign when use_composite is on
+    composite_errors = {}  # Labels the composite request failed to create (label -> message)
+
+    if journal is None:
+        journal = get_journal()
+    completed = {}
+    # A resumed run may have crashed after a write went out but before any stage was recorded,
+    # so the "already created?" checks depend on resuming, not on what the journal holds
+    resuming = run_id is not None
+    if resuming:
+        if journal is None:
+            raise ValueError("Cannot resume a run with journaling disabled")
+        completed = journal.completed_steps(run_id)
+
+    # Everything that can fail before the stage graph runs happens before the journal marks the
+    # run as running, since only the graph's failures are recorded with finish_run()
+    if hs is None:
+        hs = get_hubspot()
+    # Workflows that exist already, when resuming a run that got as far as creating some
+    existing_workflows = {}
+    if resuming and create_workflows and member_statuses and any(
+        f"workflow[{status}]" not in completed for status in member_statuses
+    ):
+        existing_workflows = {workflow.get("name"): workflow.get("id") for workflow in hs.list_workflows()}
+
+    if resuming:
+        journal.reopen_run(run_id)
+        print(f"Resuming run {run_id} ({len(completed)} stage(s) already completed)")
+    elif journal is not None:
+        run_id = journal.start_run(name, config.to_dict())
+    graph = StageGraph()
 
     # --- HubSpot ---
-    hs = get_hubspot()
-    hs_props = hs.build_properties(
-        name=name,
-        start_date=start_date,
-        end_date=end_date,
-        taxonomy=taxonomy.get("hubspot"),
-        tags=config.get("tags"),
-        extra=hubspot_cfg.get("extra_properties"),
-    )
-    hubspot_campaign = hs.create_campaign(hs_props)
-    hubspot_id = hubspot_campaign["id"]
-    print(f"Created HubSpot campaign: {name} (id={hubspot_id})")
+    def hubspot_campaign(results):
+        hs_props = hubspot_properties(hs, config)
+        hubspot_campaign = hs.create_campaign(hs_props)
+        hubspot_id = hubspot_campaign["id"]
+        print(f"Created HubSpot campaign: {name} (id={hubspot_id})")
+        return hubspot_id
+
+    graph.add("hubspot.campaign", hubspot_campaign)
 
     # Create segments for each member status if auto_create_segments is enabled
-    member_statuses = hubspot_cfg.get("auto_create_segments", [])
-    created_list_ids = []
-    list_status_map = {}  # Map list_id to status name for workflow creation
-    
-    if member_statuses:
-        for status in member_statuses:
+    def segment_stage(status):
+        def create_segment(results):
+            hubspot_id = results["hubspot.campaign"]
             list_name = f"{name} - {status}"
             list_id = hs.create_list(list_name, name, campaign_id=hubspot_id)
-            if list_id:
-                created_list_ids.append(list_id)
-                list_status_map[list_id] = status
-                # Always try to associate, even if list existed before
-                try:
-                    hs.associate_list(hubspot_id, list_id)
-                    print(f"  ✓ Associated list '{list_name}' (id={list_id}) with campaign")
-                except Exception as e:
-                    # List might already be associated, that's okay
-                    error_str = str(e).lower()
-                    if any(keyword in error_str for keyword in ["already", "409", "duplicate", "conflict"]):
-                        print(f"  ✓ List '{list_name}' (id={list_id}) already associated with campaign")
-                    else:
-                        print(f"  ⚠️  Warning: Could not associate list '{list_name}': {e}")
-            else:
-                # List exists but we couldn't find its ID - try to find it one more time
-                # by checking campaign assets after all lists are processed
+            if not list_id:
+                # List exists but we couldn't find its ID - the campaign assets are checked
+                # once all lists are processed
                 print(f"  ⚠️  List '{list_name}' exists but ID not found - will retry after processing other lists")
+                return None
+            # Always try to associate, even if list existed before
+            try:
+                hs.associate_list(hubspot_id, list_id)
+                print(f"  ✓ Associated list '{list_name}' (id={list_id}) with campaign")
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                # List might already be associated, that's okay
+                if _is_already_associated(e):
+                    print(f"  ✓ List '{list_name}' (id={list_id}) already associated with campaign")
+                else:
+                    print(f"  ⚠️  Warning: Could not associate list '{list_name}': {e}")
+            return list_id
+        return create_segment
+
+    segment_stages = [
+        graph.add(f"hubspot.list[{status}]", segment_stage(status), deps=["hubspot.campaign"])
+        for status in segment_statuses
+    ]
 
     # Also associate any manually provided list IDs
-    manual_list_ids = hubspot_cfg.get("list_ids") or []
-    manual_list_status_map = hubspot_cfg.get("list_status_map", {})  # Map list_id to status
-    for list_id in manual_list_ids:
-        list_id_str = str(list_id)
-        try:
-            hs.associate_list(hubspot_id, list_id_str)
+    def manual_lists(results):
+        hubspot_id = results["hubspot.campaign"]
+        associated = []
+        for list_id in manual_list_ids:
+            list_id_str = str(list_id)
+            try:
+                hs.associate_list(hubspot_id, list_id_str)
+                associated.append(list_id_str)
+                print(f"  ✓ Associated list id={list_id_str}")
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if _is_already_associated(e):
+                    print(f"  ✓ List id={list_id_str} already associated with campaign")
+                    associated.append(list_id_str)
+                else:
+                    print(f"  ⚠️  Warning: Could not associate list id={list_id_str}: {e}")
+        return associated
+
+    graph.add("hubspot.manual_lists", manual_lists, deps=["hubspot.campaign"])
+
+    def list_mapping(results):
+        hubspot_id = results["hubspot.campaign"]
+        created_list_ids = []
+        list_status_map = {}  # Map list_id to status name for workflow creation
+        for status, stage in zip(segment_statuses, segment_stages):
+            list_id = results[stage]
+            if list_id:
+                created_list_ids.append(list_id)
+                list_status_map[list_id] = status
+        for list_id_str in results["hubspot.manual_lists"]:
             created_list_ids.append(list_id_str)
             # Try to find status for this list ID
             if list_id_str in manual_list_status_map:
                 list_status_map[list_id_str] = manual_list_status_map[list_id_str]
-            else:
-                # Try to infer status from list name if not explicitly mapped
-                # This is a fallback - ideally user should provide list_status_map
-                pass
-            print(f"  ✓ Associated list id={list_id_str}")
-        except Exception as e:
-            error_str = str(e).lower()
-            if any(keyword in error_str for keyword in ["already", "409", "duplicate", "conflict"]):
-                print(f"  ✓ List id={list_id_str} already associated with campaign")
-                created_list_ids.append(list_id_str)
-                if list_id_str in manual_list_status_map:
-                    list_status_map[list_id_str] = manual_list_status_map[list_id_str]
-            else:
-                print(f"  ⚠️  Warning: Could not associate list id={list_id_str}: {e}")
-    
-    # Try to find any missing list IDs by checking campaign assets
-    if member_statuses:
-        try:
-            assets = hs.get_campaign_assets(hubspot_id)
-            for asset in assets:
-                asset_name = asset.get("name", "")
-                asset_id = str(asset.get("id", ""))
-                # Check if this asset matches any of our expected list names
-                for status in member_statuses:
-                    expected_name = f"{name} - {status}"
-                    if asset_name == expected_name:
-                        # Add to created_list_ids if not already there
-                        if asset_id not in created_list_ids:
-                            created_list_ids.append(asset_id)
-                        # Map to status if not already mapped
-                        if asset_id not in list_status_map:
-                            list_status_map[asset_id] = status
-                            print(f"  ✓ Found and mapped existing list '{asset_name}' (id={asset_id})")
-        except Exception as e:
-            # Assets endpoint might not be available or might fail
-            print(f"  ⚠️  Could not check campaign assets: {e}")
-    
-    # Final fallback: Try to map any unmapped list IDs by searching for their names
-    if member_statuses and created_list_ids:
+
+        # Try to find any missing list IDs by checking campaign assets
+        if segment_statuses:
+            try:
+                assets = hs.get_campaign_assets(hubspot_id)
+                for asset in assets:
+                    asset_name = asset.get("name", "")
+                    asset_id = str(asset.get("id", ""))
+                    # Check if this asset matches any of our expected list names
+                    for status in segment_statuses:
+                        expected_name = f"{name} - {status}"
+                        if asset_name == expected_name:
+                            # Add to created_list_ids if not already there
+                            if asset_id not in created_list_ids:
+                                created_list_ids.append(asset_id)
+                            # Map to status if not already mapped
+                            if asset_id not in list_status_map:
+                                list_status_map[asset_id] = status
+                                print(f"  ✓ Found and mapped existing list '{asset_name}' (id={asset_id})")
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                # Assets endpoint might not be available or might fail
+                print(f"  ⚠️  Could not check campaign assets: {e}")
+
+        # Final fallback: Try to map any unmapped list IDs by searching for their names
+        statuses_to_map = list(dict.fromkeys(list(segment_statuses) + list(member_statuses)))
         unmapped_ids = [lid for lid in created_list_ids if lid not in list_status_map]
-        if unmapped_ids:
+        if statuses_to_map and unmapped_ids:
             print(f"  🔍 Found {len(unmapped_ids)} unmapped list IDs, attempting to map by name...")
             for list_id in unmapped_ids:
-                # Try to get list details to find its name
                 try:
-                    # Search all lists to find this one
-                    for status in member_statuses:
+                    for status in statuses_to_map:
                         list_name = f"{name} - {status}"
                         found_id = hs.find_list_by_name(list_name)
-                        if found_id == list_id:
+                        if found_id == str(list_id):
                             list_status_map[list_id] = status
                             print(f"  ✓ Mapped list ID {list_id} to status '{status}'")
                             break
+                except DeadlineExceeded:
+                    raise
                 except Exception as e:
                     print(f"  ⚠️  Could not map list ID {list_id}: {e}")
 
+        return created_list_ids, list_status_map
+
+    graph.add(
+        "hubspot.list_mapping",
+        list_mapping,
+        deps=segment_stages + ["hubspot.campaign", "hubspot.manual_lists"],
+    )
+
     # --- Salesforce ---
-    sf = get_salesforce()
-    desc = salesforce_cfg.get("description") or salesforce_cfg.get("Description")
-    
-    # Required fields: IsActive=True, StartDate, EndDate
-    sf_fields = {
-        "IsActive": True,
-    }
-    if start_date:
-        sf_fields["StartDate"] = start_date
-    if end_date:
-        sf_fields["EndDate"] = end_date
-    
-    # Optional fields
-    sf_fields["Status"] = salesforce_cfg.get("status") or "Planned"
-    if desc:
-        sf_fields["Description"] = desc
-    if taxonomy.get("salesforce"):
-        sf_fields.update(taxonomy["salesforce"])
-    if salesforce_cfg.get("custom_fields"):
-        sf_fields.update(salesforce_cfg["custom_fields"])
-    
+    graph.add("salesforce.login", lambda results: sf if sf is not None else get_salesforce())
+
     # Handle parent campaign lookup
-    parent_name = salesforce_cfg.get("parent_campaign")
-    if parent_name:
-        parent_id = find_parent_campaign(sf, parent_name)
+    def salesforce_parent(results):
+        parent_name = salesforce_cfg.parent_campaign
+        if not parent_name:
+            return None
+        parent_id = find_parent_campaign(results["salesforce.login"], parent_name)
         if parent_id:
-            sf_fields["ParentId"] = parent_id
             print(f"  Found parent campaign '{parent_name}' (id={parent_id})")
         else:
             print(f"  Warning: Parent campaign '{parent_name}' not found in Salesforce")
-    
-    salesforce_id = sf_create_campaign(sf, name, **sf_fields)
-    print(f"Created Salesforce campaign: {name} (id={salesforce_id})")
-    
+        return parent_id
+
+    graph.add("salesforce.parent", salesforce_parent, deps=["salesforce.login"])
+
+    def salesforce_campaign(results):
+        sf = results["salesforce.login"]
+        sf_fields = salesforce_fields(config, results["salesforce.parent"])
+
+        if resuming:
+            # The campaign may have been created before the journal recorded it
+            salesforce_id = sf_find_campaign_by_name(sf, name)
+            if salesforce_id:
+                print(f"Found existing Salesforce campaign: {name} (id={salesforce_id})")
+                return salesforce_id
+        if use_composite and member_statuses:
+            print(f"Creating Salesforce campaign with member statuses: {', '.join(member_statuses)}")
+            created = create_campaign_with_statuses(sf, name, member_statuses, **sf_fields)
+            salesforce_id = created["campaign_id"]
+            composite_statuses.update(created["statuses"])
+            composite_errors.update(created["errors"])
+        else:
+            salesforce_id = sf_create_campaign(sf, name, **sf_fields)
+        print(f"Created Salesforce campaign: {name} (id={salesforce_id})")
+        return salesforce_id
+
+    graph.add("salesforce.campaign", salesforce_campaign, deps=["salesforce.login", "salesforce.parent"])
+
     # Create campaign member statuses
-    member_statuses = salesforce_cfg.get("member_statuses") or hubspot_cfg.get("auto_create_segments", [])
-    if member_statuses:
-        print(f"Creating campaign member statuses: {', '.join(member_statuses)}")
-        create_campaign_member_statuses(sf, salesforce_id, member_statuses)
+    def salesforce_member_statuses(results):
+        if not member_statuses:
+            return {}
+        if use_composite and composite_statuses and not composite_errors:
+            # Already created in the same round trip as the campaign
+            return dict(composite_statuses)
+        if composite_errors:
+            # Only the labels the composite request could not create are written again
+            print(f"Retrying campaign member statuses: {', '.join(composite_errors)}")
+        else:
+            print(f"Creating campaign member statuses: {', '.join(member_statuses)}")
+        return create_campaign_member_statuses(
+            results["salesforce.login"], results["salesforce.campaign"], member_statuses
+        )
+
+    graph.add(
+        "salesforce.member_statuses",
+        salesforce_member_statuses,
+        deps=["salesforce.login", "salesforce.campaign"],
+    )
 
     # --- HubSpot Workflows: Create workflows to sync list enrollments to Salesforce ---
-    create_workflows = hubspot_cfg.get("create_workflows", True)  # Default to True
-    workflow_webhook_url = workflows_cfg.get("zapier_webhook_url") or os.environ.get("ZAPIER_CAMPAIGN_CREATED_WEBHOOK")
-    wait_minutes = workflows_cfg.get("wait_minutes", 10)  # Default 10 minutes
-    
-    created_workflows = []
-    if create_workflows and member_statuses and salesforce_id:
-        print(f"\nCreating HubSpot workflows to sync list enrollments to Salesforce...")
-        print(f"  List status map: {list_status_map}")
-        print(f"  Created list IDs: {created_list_ids}")
-        print(f"  Member statuses: {member_statuses}")
-        
-        # Final attempt: Match unmapped list IDs to statuses by checking list names
-        unmapped_ids = [lid for lid in created_list_ids if lid not in list_status_map]
-        if unmapped_ids:
-            print(f"  🔍 Found {len(unmapped_ids)} unmapped list IDs, attempting to map by name...")
-            for list_id in unmapped_ids:
-                for status in member_statuses:
-                    list_name = f"{name} - {status}"
-                    found_id = hs.find_list_by_name(list_name)
-                    if found_id == list_id or found_id == str(list_id):
-                        list_status_map[list_id] = status
-                        print(f"  ✓ Mapped list ID {list_id} to status '{status}' via name search")
-                        break
-        
-        for status in member_statuses:
-            # Find the list ID for this status
-            list_id = None
+    def workflow_stage(status):
+        def create_workflow(results):
+            salesforce_id = results["salesforce.campaign"]
+            _, list_status_map = results["hubspot.list_mapping"]
             list_name = f"{name} - {status}"
-            
+
             # Check if we have the list ID from created lists
-            for lid, stat in list_status_map.items():
-                if stat == status:
-                    list_id = lid
-                    break
-            
+            list_id = next((lid for lid, stat in list_status_map.items() if stat == status), None)
+
             # If not found, try to find it by searching for the list by name
             if not list_id:
                 print(f"  🔍 List ID not in map, searching for list: '{list_name}'")
                 list_id = hs.find_list_by_name(list_name)
                 if list_id:
                     print(f"  ✓ Found list '{list_name}' (id={list_id})")
-                    list_status_map[list_id] = status
                 else:
                     # Try exact name search as fallback
                     list_id = hs.find_list_by_exact_name(list_name)
                     if list_id:
                         print(f"  ✓ Found list '{list_name}' via exact search (id={list_id})")
-                        list_status_map[list_id] = status
-            
-            # If still not found, try to find it from manual list_ids
-            if not list_id and manual_list_ids:
-                # Try to match by checking if we can find the list
-                # For now, we'll create workflow even if list_id is not found
+
+            if not list_id:
                 # User will need to configure enrollment trigger manually
-                pass
-            
-            if list_id:
-                workflow_name = list_name  # Same name as segment
-                try:
-                    print(f"  🚀 Creating workflow '{workflow_name}' with list_id={list_id}, status={status}")
-                    workflow = hs.create_workflow_with_enrollment(
-                        workflow_name=workflow_name,
-                        list_id=list_id,
-                        salesforce_campaign_id=salesforce_id,
-                        salesforce_status=status,
-                        wait_minutes=wait_minutes,
-                        webhook_url=workflow_webhook_url,
-                        salesforce_campaign_name=name,
-                    )
-                    created_workflows.append({
-                        "name": workflow_name,
-                        "id": workflow.get("id"),
-                        "status": status,
-                        "list_id": list_id,
-                    })
-                    print(f"  ✅ Created workflow '{workflow_name}' (id={workflow.get('id')})")
-                except Exception as e:
-                    print(f"  ❌ Failed to create workflow for '{workflow_name}': {e}")
-                    import traceback
-                    print(f"     Traceback: {traceback.format_exc()}")
-                    print(f"     You may need to create this workflow manually in HubSpot UI")
-            else:
                 print(f"  ⚠️  Skipped workflow creation for '{list_name}' (list ID not found)")
                 print(f"     Create workflow manually: Name='{list_name}', Trigger='Contact added to list', Wait={wait_minutes}min, Update Salesforce CampaignMember status='{status}'")
+                return None
+
+            workflow_name = list_name  # Same name as segment
+            if workflow_name in existing_workflows:
+                print(f"  ✓ Workflow '{workflow_name}' already exists (id={existing_workflows[workflow_name]})")
+                return {
+                    "name": workflow_name,
+                    "id": existing_workflows[workflow_name],
+                    "status": status,
+                    "list_id": list_id,
+                }
+            try:
+                print(f"  🚀 Creating workflow '{workflow_name}' with list_id={list_id}, status={status}")
+                workflow = hs.create_workflow_with_enrollment(
+                    workflow_name=workflow_name,
+                    list_id=list_id,
+                    salesforce_campaign_id=salesforce_id,
+                    salesforce_status=status,
+                    wait_minutes=wait_minutes,
+                    webhook_url=workflow_webhook_url,
+                    salesforce_campaign_name=name,
+                )
+                print(f"  ✅ Created workflow '{workflow_name}' (id={workflow.get('id')})")
+                return {
+                    "name": workflow_name,
+                    "id": workflow.get("id"),
+                    "status": status,
+                    "list_id": list_id,
+                }
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                print(f"  ❌ Failed to create workflow for '{workflow_name}': {e}")
+                import traceback
+                print(f"     Traceback: {traceback.format_exc()}")
+                print(f"     You may need to create this workflow manually in HubSpot UI")
+                return None
+        return create_workflow
+
+    workflow_stages = []
+    if create_workflows and member_statuses:
+        workflow_stages = [
+            graph.add(
+                f"workflow[{status}]",
+                workflow_stage(status),
+                deps=["hubspot.list_mapping", "salesforce.campaign", "salesforce.member_statuses"],
+            )
+            for status in member_statuses
+        ]
 
     # --- Workflows (e.g. Zapier webhook) ---
-    webhook = workflows_cfg.get("zapier_webhook_url") or os.environ.get("ZAPIER_CAMPAIGN_CREATED_WEBHOOK")
-    workflow_result = {}
-    if webhook:
-        import requests
-        r = requests.post(
-            webhook,
-            json={
-                "hubspot_campaign_id": hubspot_id,
-                "salesforce_campaign_id": salesforce_id,
-                "campaign_name": name,
-            },
-        )
-        workflow_result["webhook_status"] = r.status_code
-        print(f"Triggered workflow webhook: {r.status_code}")
-
-    return {
-        "hubspot_campaign_id": hubspot_id,
-        "salesforce_campaign_id": salesforce_id,
-        "campaign_name": name,
-        "hubspot_list_ids": created_list_ids,
-        "hubspot_workflows": created_workflows,
-        "workflow": workflow_result,
-    }
+    def zapier(results):
+        webhook = workflow_webhook_url
+        workflow_result = {}
+        if webhook:
+            import requests
+            r = requests.post(
+                webhook,
+                json={
+                    "hubspot_campaign_id": results["hubspot.campaign"],
+                    "salesforce_campaign_id": results["salesforce.campaign"],
+                    "campaign_name": name,
+                },
+                timeout=run_deadline.request_timeout(what="Zapier webhook"),
+            )
+            workflow_result["webhook_status"] = r.status_code
+            print(f"Triggered workflow webhook: {r.status_code}")
+        return workflow_result
+
+    graph.add(
+        "zapier",
+        zapier,
+        deps=workflow_stages + ["hubspot.campaign", "hubspot.list_mapping", "salesforce.campaign", "salesforce.member_statuses"],
+    )
+
+    def build_result(results):
+        list_mapping = results.get("hubspot.list_mapping")
+        timings = dict(graph.timings)
+        timings["total"] = round(time.perf_counter() - run_started, 3)
+        return {
+            "hubspot_campaign_id": results.get("hubspot.campaign"),
+            "salesforce_campaign_id": results.get("salesforce.campaign"),
+            "campaign_name": name,
+            "hubspot_list_ids": list_mapping[0] if list_mapping else [
+                results[stage] for stage in segment_stages if results.get(stage)
+            ],
+            "hubspot_workflows": [results[stage] for stage in workflow_stages if results.get(stage)],
+            "workflow": results.get("zapier", {}),
+            "run_id": run_id,
+            "timings": timings,
+            "metrics": run_metrics.summary(),
+            "trace_id": run_span.trace_id if run_span is not None else None,
+        }
+
+    def record(stage, result):
+        # The Salesforce session is not a result worth keeping; a resumed run logs in again
+        if journal is not None and stage != "salesforce.login":
+            journal.record_step(run_id, name, stage, result)
+
+    outcome = "failed"
+    try:
+        with metrics.track_run() as run_metrics, tracing.span("campaign.run", {"campaign.name": name}) as run_span:
+            if run_span is not None and run_id:
+                run_span.set_attribute("campaign.run_id", run_id)
+            with run_deadline.activate(float(deadline_seconds) if deadline_seconds else None):
+                results = graph.run(max_workers=max_workers, completed=completed, on_done=record)
+        outcome = "completed"
+    except DeadlineExceeded as e:
+        outcome = "timeout"
+        e.partial = build_result(graph.results)
+        e.partial["completed_stages"] = sorted(graph.results)
+        print(f"❌ {e}. Completed stages: {', '.join(e.partial['completed_stages']) or 'none'}")
+        if journal is not None:
+            journal.finish_run(run_id, e)
+            print(f"   Resume with: python -m src.journal resume {run_id}")
+        raise
+    except Exception as e:
+        if journal is not None:
+            journal.finish_run(run_id, e)
+            print(f"❌ Run failed. Resume with: python -m src.journal resume {run_id}")
+        raise
+    finally:
+        metrics.observe_run(graph.timings, outcome, time.perf_counter() - run_started)
+
+    if journal is not None:
+        journal.finish_run(run_id)
+    return build_result(results)
+
+
+def resume(run_id: str, journal: Optional[RunJournal] = None, **kwargs) -> dict:
+    """
+    Continue a journaled run (interrupted, failed or timed out) from its last completed stage,
+    with the config it was started with. Takes the same keyword arguments as run().
+    """
+    journal = journal or get_journal()
+    stored = journal.get_run(run_id) if journal is not None else None
+    if stored is None:
+        raise ValueError(f"No journaled run with id {run_id}")
+    return run(CampaignConfig.from_dict(stored["config"]), journal=journal, run_id=run_id, **kwargs)
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python -m src.run_campaign <path-to-campaign.yaml>")
-        sys.exit(1)
-    path = Path(sys.argv[1]).resolve()
+    parser = argparse.ArgumentParser(description="Create a campaign in HubSpot and Salesforce from a YAML config")
+    parser.add_argument("config", help="Path to the campaign YAML")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--plan", action="store_true", help="Compare the config with what exists and print the changes, without writing")
+    mode.add_argument("--apply", action="store_true", help="Compare the config with what exists and write only the changes")
+    args = parser.parse_args()
+
+    path = Path(args.config).resolve()
     if not path.exists():
         print(f"File not found: {path}")
         sys.exit(1)
-    result = run(path)
+    if args.plan or args.apply:
+        # Imported here: reconcile builds on this module
+        from .reconcile import apply, plan
+        campaign_plan = plan(path)
+        print(campaign_plan.format())
+        if args.plan:
+            return
+        result = apply(campaign_plan)
+    else:
+        result = run(path)
     print("\nDone.", result)
 
 
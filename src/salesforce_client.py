@@ -2,16 +2,157 @@
 Salesforce Campaign (and optional CampaignMember) client.
 Uses simple_salesforce for auth and REST.
 """
+import csv
+import io
+import json
 import os
-from typing import Optional
-from simple_salesforce import Salesforce
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from simple_salesforce import Salesforce, SalesforceLogin
+
+from .transport import RetryingSession
+
+try:
+    import fcntl  # POSIX only; used to serialize logins across gunicorn workers
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+# A single Composite API request accepts at most 25 subrequests
+COMPOSITE_MAX_SUBREQUESTS = 25
+# Member statuses Salesforce creates on every new Campaign
+DEFAULT_MEMBER_STATUS_LABELS = ("Sent", "Responded")
+
+# Member loads up to this many contacts use sObject Collections; larger ones use a Bulk API 2.0 job
+BULK_MEMBER_THRESHOLD = int(os.environ.get("SALESFORCE_BULK_THRESHOLD", "2000"))
+# sObject Collections accept at most 200 records per call
+COLLECTION_BATCH_SIZE = 200
+# Bulk API 2.0 accepts up to 150 MB of CSV per job; start a new job well before that
+BULK_MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+# CSV data is kept in memory up to this size, then spilled to a temp file
+BULK_SPOOL_BYTES = 8 * 1024 * 1024
+BULK_POLL_SECONDS = 5
+# Rows that fail with UNABLE_TO_LOCK_ROW are retried this many times
+LOCK_RETRY_ATTEMPTS = 3
+# Retries for idempotent calls that hit 5xx/connection errors (requests also get deadline-bound timeouts)
+MAX_RETRIES = int(os.environ.get("SALESFORCE_MAX_RETRIES", "3"))
+
+# Campaign name -> Id cache: entries kept, and how long a hit (or, briefly, a miss) is trusted
+CAMPAIGN_NAME_CACHE_SIZE = int(os.environ.get("SALESFORCE_CAMPAIGN_CACHE_SIZE", "1024"))
+CAMPAIGN_NAME_CACHE_TTL = float(os.environ.get("SALESFORCE_CAMPAIGN_CACHE_TTL", "900"))
+CAMPAIGN_NAME_MISS_TTL = 60.0
+# Names per "WHERE Name IN (...)" query are capped by characters so the query (sent in the URL)
+# stays far below SOQL and URI length limits
+SOQL_IN_MAX_CHARS = 8000
+
+
+class _SessionCache:
+    """
+    Process-wide cache of one Salesforce (session_id, instance) pair.
+    All clients built by get_client() share it, so a login happens once per process (or once
+    per host when a cache file is configured) instead of once per run. Thread-safe; with a
+    cache file, logins are also serialized across processes with an advisory file lock.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._session: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+
+    def get(self, login: Callable[[], Tuple[str, str]]) -> Tuple[str, str]:
+        """Return the cached session, logging in (via login()) only if there is none."""
+        with self._lock:
+            if self._session is None:
+                with self._file_lock():
+                    self._session = self._read_file()
+                    if self._session is None:
+                        self._session = login()
+                        self._write_file(self._session)
+            return self._session
+
+    def invalidate(self, session_id: str) -> None:
+        """Forget session_id (e.g. after INVALID_SESSION_ID). No-op if it was already replaced."""
+        with self._lock:
+            if self._session and self._session[0] == session_id:
+                self._session = None
+            with self._file_lock():
+                cached = self._read_file()
+                if cached and cached[0] == session_id:
+                    os.unlink(self._path)
+
+    def _file_lock(self):
+        if not self._path or fcntl is None:
+            return _NullLock()
+        return _FileLock(self._path + ".lock")
+
+    def _read_file(self) -> Optional[Tuple[str, str]]:
+        if not self._path or not os.path.exists(self._path):
+            return None
+        try:
+            with open(self._path) as f:
+                data = json.load(f)
+            return data["session_id"], data["instance"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_file(self, session: Tuple[str, str]) -> None:
+        if not self._path:
+            return
+        # Write to a private temp file and rename, so readers never see a partial file
+        directory = os.path.dirname(os.path.abspath(self._path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".sf-session-")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"session_id": session[0], "instance": session[1], "saved_at": time.time()}, f)
+        os.replace(tmp_path, self._path)
+
+
+class _NullLock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _FileLock:
+    def __init__(self, path: str):
+        self._path = path
+        self._fd = None
+
+    def __enter__(self):
+        self._fd = os.open(self._path, os.O_CREAT | os.O_RDWR, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        return False
+
+
+# Optional: SALESFORCE_SESSION_CACHE_FILE lets every gunicorn worker on the host share one login
+_session_cache = _SessionCache(os.environ.get("SALESFORCE_SESSION_CACHE_FILE") or None)
+
+
+def _refresh_shared_session(sf: Salesforce, login: Callable[[], Tuple[str, str]]) -> Tuple[str, str]:
+    """simple_salesforce refresh hook: drop the expired session and fetch (or create) a new one."""
+    _session_cache.invalidate(sf.session_id)
+    return _session_cache.get(login)
 
 
 def get_client():
     """
     Build Salesforce client using username/password + security token method.
+    The session (access token + instance) is cached and shared across calls and threads; an
+    expired session (INVALID_SESSION_ID) triggers one transparent re-login for everyone.
     Requires: SALESFORCE_USERNAME, SALESFORCE_PASSWORD, SALESFORCE_SECURITY_TOKEN
     Optional: SALESFORCE_DOMAIN (defaults to 'login' for production, use 'test' for sandbox)
+    Optional: SALESFORCE_SESSION_CACHE_FILE (share the session between processes via this file)
     """
     username = os.environ.get("SALESFORCE_USERNAME")
     password = os.environ.get("SALESFORCE_PASSWORD")
@@ -21,12 +162,115 @@ def get_client():
     if not username or not password:
         raise ValueError("Set SALESFORCE_USERNAME and SALESFORCE_PASSWORD")
     
+    # Every call (including login) gets a timeout bounded by the current run deadline
+    http = RetryingSession(max_retries=MAX_RETRIES, service="salesforce")
     # Use security_token parameter if provided, otherwise assume it's appended to password
-    if security_token:
-        return Salesforce(username=username, password=password, security_token=security_token, domain=domain)
-    else:
-        # Fallback: assume token is appended to password
-        return Salesforce(username=username, password=password, domain=domain)
+    login = partial(
+        SalesforceLogin,
+        username=username,
+        password=password,
+        security_token=security_token,
+        domain=domain,
+        session=http,
+    )
+    session_id, instance = _session_cache.get(login)
+    sf = Salesforce(session_id=session_id, instance=instance, domain=domain, session=http)
+    # simple_salesforce calls this on INVALID_SESSION_ID and retries the request
+    sf._salesforce_login_partial = partial(_refresh_shared_session, sf, login)
+    return sf
+
+
+def _soql_quote(value: str) -> str:
+    """Quote a string literal for SOQL."""
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+class CampaignNameResolver:
+    """
+    Campaign name -> Id lookups, batched and cached.
+    resolve() answers every uncached name with one "WHERE Name IN (...)" query per chunk and
+    keeps the results in an LRU cache with a TTL (misses are cached for CAMPAIGN_NAME_MISS_TTL
+    only, so a campaign created elsewhere shows up soon). Names compare case-insensitively, like
+    SOQL; if several campaigns share a name, the oldest wins. Thread-safe.
+    """
+
+    def __init__(self, max_size: int = CAMPAIGN_NAME_CACHE_SIZE, ttl_seconds: float = CAMPAIGN_NAME_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()  # (instance, name.lower()) -> (id or None, expires_at)
+        self._lock = threading.Lock()
+
+    def resolve(self, sf: Salesforce, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Map each name to its Campaign Id (None if there is no such campaign)."""
+        names = list(dict.fromkeys(name for name in names if name))
+        resolved = {}
+        missing = []
+        for name in names:
+            hit, campaign_id = self._get(sf, name)
+            if hit:
+                resolved[name] = campaign_id
+            else:
+                missing.append(name)
+
+        found = {}
+        for chunk in self._chunks(missing):
+            query = (
+                "SELECT Id, Name FROM Campaign WHERE Name IN ("
+                + ", ".join(_soql_quote(name) for name in chunk)
+                + ") ORDER BY CreatedDate ASC"
+            )
+            for record in sf.query_all(query).get("records", []):
+                found.setdefault(record["Name"].lower(), record["Id"])
+        for name in missing:
+            resolved[name] = found.get(name.lower())
+            self.put(sf, name, resolved[name])
+        return resolved
+
+    def get(self, sf: Salesforce, name: str) -> Optional[str]:
+        return self.resolve(sf, [name]).get(name)
+
+    def put(self, sf: Salesforce, name: str, campaign_id: Optional[str]) -> None:
+        """Record a lookup result (e.g. a campaign that was just created)."""
+        ttl = self.ttl_seconds if campaign_id else min(self.ttl_seconds, CAMPAIGN_NAME_MISS_TTL)
+        key = (sf.sf_instance, name.lower())
+        with self._lock:
+            self._entries[key] = (campaign_id, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, sf: Salesforce, name: str) -> Tuple[bool, Optional[str]]:
+        key = (sf.sf_instance, name.lower())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    @staticmethod
+    def _chunks(names: list):
+        chunk, size = [], 0
+        for name in names:
+            length = len(_soql_quote(name)) + 2
+            if chunk and size + length > SOQL_IN_MAX_CHARS:
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(name)
+            size += length
+        if chunk:
+            yield chunk
+
+
+# Shared by every lookup in the process (parent campaigns, helper scripts, batch runs)
+campaign_names = CampaignNameResolver()
 
 
 def create_campaign(sf: Salesforce, name: str, **fields) -> str:
@@ -38,20 +282,42 @@ def create_campaign(sf: Salesforce, name: str, **fields) -> str:
     result = sf.Campaign.create(payload)
     if not result.get("success"):
         raise RuntimeError(f"Salesforce Campaign.create failed: {result}")
+    # Later campaigns in the same process may name this one as their parent
+    campaign_names.put(sf, name, result["id"])
     return result["id"]
 
 
+def find_campaign_by_name(sf: Salesforce, name: str) -> Optional[str]:
+    """Find a Campaign by name (cached, see CampaignNameResolver). Returns the Id or None."""
+    return campaign_names.get(sf, name)
+
+
+def find_campaign_record(sf: Salesforce, name: str, fields: Iterable[str] = ()) -> Optional[dict]:
+    """
+    Read a Campaign by name with the given fields in one query (oldest match if the name is
+    not unique). Returns the record (including Id) or None.
+    """
+    select = ", ".join(dict.fromkeys(["Id", *fields]))
+    result = sf.query(
+        f"SELECT {select} FROM Campaign WHERE Name = {_soql_quote(name)} ORDER BY CreatedDate ASC LIMIT 1"
+    )
+    records = result.get("records") or []
+    campaign_names.put(sf, name, records[0]["Id"] if records else None)
+    return records[0] if records else None
+
+
+def update_campaign(sf: Salesforce, campaign_id: str, **fields) -> None:
+    """Update fields of an existing Campaign."""
+    status = sf.Campaign.update(campaign_id, fields)
+    if status not in (200, 204):
+        raise RuntimeError(f"Salesforce Campaign.update failed: {status}")
+
+
 def find_parent_campaign(sf: Salesforce, parent_name: str) -> Optional[str]:
     """
     Find a parent Campaign by name. Returns the Campaign Id if found, None otherwise.
     """
-    # Escape single quotes in the name for SOQL (double them)
-    escaped_name = parent_name.replace("'", "''")
-    query = f"SELECT Id FROM Campaign WHERE Name = '{escaped_name}' LIMIT 1"
-    result = sf.query(query)
-    if result.get("records"):
-        return result["records"][0]["Id"]
-    return None
+    return find_campaign_by_name(sf, parent_name)
 
 
 def create_campaign_member_status(
@@ -80,6 +346,122 @@ def create_campaign_member_status(
     return result["id"]
 
 
+def _member_status_settings(idx: int, status_label: str, default_status: Optional[str] = None) -> tuple:
+    """SortOrder, IsDefault and HasResponded for the idx-th configured status label."""
+    # Default statuses "Sent" and "Responded" typically use sort orders 1 and 2
+    # Start our custom statuses at 3
+    sort_order = 3 + idx
+    is_default = (status_label == default_status) if default_status else False
+    # Mark "Attended" and "Responded" as having responded
+    has_responded = status_label.lower() in ["attended", "responded"]
+    return sort_order, is_default, has_responded
+
+
+def _member_status_changes(record: dict, idx: int, status_label: str, default_status: Optional[str] = None) -> dict:
+    """
+    Fields of an existing CampaignMemberStatus row that differ from the configured settings.
+    The default "Sent"/"Responded" rows keep their SortOrder; IsDefault is only ever set, since
+    Salesforce clears it on the previous default automatically.
+    """
+    sort_order, is_default, has_responded = _member_status_settings(idx, status_label, default_status)
+    changes = {}
+    if status_label.lower() not in {label.lower() for label in DEFAULT_MEMBER_STATUS_LABELS}:
+        if record.get("SortOrder") != sort_order:
+            changes["SortOrder"] = sort_order
+    if bool(record.get("HasResponded")) != has_responded:
+        changes["HasResponded"] = has_responded
+    if is_default and not record.get("IsDefault"):
+        changes["IsDefault"] = True
+    return changes
+
+
+def _collection_errors(result: dict) -> str:
+    """Flatten the errors of one sObject Collections result into a readable message."""
+    return "; ".join(f"{e.get('statusCode')}: {e.get('message')}" for e in result.get("errors", []))
+
+
+def _save_member_statuses(sf: Salesforce, method: str, items: list) -> Iterable[Tuple[str, dict]]:
+    """
+    Insert (POST) or update (PATCH) CampaignMemberStatus rows 200 per sObject Collections call
+    (allOrNone=false). items are (label, record) pairs; yields (label, result) pairs.
+    """
+    for i in range(0, len(items), COLLECTION_BATCH_SIZE):
+        batch = items[i:i + COLLECTION_BATCH_SIZE]
+        results = sf.restful("composite/sobjects", method=method, json={
+            "allOrNone": False,
+            "records": [
+                {"attributes": {"type": "CampaignMemberStatus"}, **record} for _, record in batch
+            ],
+        }) or []
+        yield from ((label, result) for (label, _), result in zip(batch, results))
+
+
+def get_member_statuses(sf: Salesforce, campaign_id: str) -> list:
+    """All CampaignMemberStatus rows of a campaign, in one query."""
+    result = sf.query_all(
+        "SELECT Id, Label, SortOrder, IsDefault, HasResponded FROM CampaignMemberStatus "
+        f"WHERE CampaignId = {_soql_quote(campaign_id)}"
+    )
+    return result.get("records", [])
+
+
+def diff_member_statuses(
+    records: list,
+    campaign_id: str,
+    statuses: list[str],
+    default_status: Optional[str] = None,
+) -> Tuple[dict, list, list]:
+    """
+    Compare existing CampaignMemberStatus rows with the configured `statuses`.
+    Returns (ids of labels that already exist, inserts, updates); inserts and updates are
+    (label, record) pairs for apply_member_status_changes().
+    """
+    existing = {record["Label"].lower(): record for record in records}
+    ids = {}
+    inserts, updates = [], []
+    for idx, status_label in enumerate(statuses):
+        record = existing.get(status_label.lower())
+        if record is None:
+            sort_order, is_default, has_responded = _member_status_settings(idx, status_label, default_status)
+            inserts.append((status_label, {
+                "CampaignId": campaign_id,
+                "Label": status_label,
+                "SortOrder": sort_order,
+                "IsDefault": is_default,
+                "HasResponded": has_responded,
+            }))
+            continue
+        ids[status_label] = record["Id"]
+        changes = _member_status_changes(record, idx, status_label, default_status)
+        if changes:
+            updates.append((status_label, {"id": record["Id"], **changes}))
+    return ids, inserts, updates
+
+
+def apply_member_status_changes(sf: Salesforce, statuses: list[str], ids: dict, inserts: list, updates: list) -> dict:
+    """Write the inserts/updates from diff_member_statuses(). Returns label -> Id in `statuses` order."""
+    created_statuses = dict(ids)
+    updated = {label for label, _ in updates}
+    for status_label in ids:
+        if status_label not in updated:
+            print(f"  Campaign member status '{status_label}' already exists")
+
+    # Updates first, so rows moving to a new SortOrder free theirs before inserts claim them
+    for status_label, outcome in _save_member_statuses(sf, "PATCH", updates):
+        if outcome.get("success"):
+            print(f"  Updated campaign member status '{status_label}'")
+        else:
+            print(f"  Warning: Failed to update status '{status_label}': {_collection_errors(outcome)}")
+    for status_label, outcome in _save_member_statuses(sf, "POST", inserts):
+        if outcome.get("success"):
+            created_statuses[status_label] = outcome["id"]
+            print(f"  Created campaign member status '{status_label}' (id={outcome['id']})")
+        else:
+            print(f"  Warning: Failed to create status '{status_label}': {_collection_errors(outcome)}")
+    
+    return {label: created_statuses[label] for label in statuses if label in created_statuses}
+
+
 def create_campaign_member_statuses(
     sf: Salesforce, 
     campaign_id: str, 
@@ -87,54 +469,337 @@ def create_campaign_member_statuses(
     default_status: Optional[str] = None
 ) -> dict[str, str]:
     """
-    Create multiple CampaignMemberStatus records for a campaign.
+    Make a campaign's CampaignMemberStatus records match `statuses`.
+    Reads the existing rows with one query, then creates only the missing labels and updates
+    rows whose SortOrder/HasResponded/IsDefault differ, in bulk via sObject Collections; the
+    default "Sent"/"Responded" rows are reconciled the same way. A rerun against an up-to-date
+    campaign costs just the query.
     Returns dict mapping status label to CampaignMemberStatus Id.
     """
-    created_statuses = {}
-    # Default statuses "Sent" and "Responded" typically use sort orders 1 and 2
-    # Start our custom statuses at 3
-    start_sort_order = 3
-    
+    records = get_member_statuses(sf, campaign_id)
+    ids, inserts, updates = diff_member_statuses(records, campaign_id, statuses, default_status)
+    return apply_member_status_changes(sf, statuses, ids, inserts, updates)
+
+
+def _composite_errors(body) -> str:
+    """Flatten a composite subrequest error body into a readable message."""
+    if isinstance(body, list):
+        return "; ".join(f"{e.get('errorCode')}: {e.get('message')}" for e in body if isinstance(e, dict))
+    return str(body)
+
+
+def create_campaign_with_statuses(
+    sf: Salesforce,
+    name: str,
+    statuses: list[str],
+    default_status: Optional[str] = None,
+    **fields
+) -> dict:
+    """
+    Create a Campaign and its CampaignMemberStatus rows in one Composite API request.
+    Status rows reference the new Campaign via "@{campaign.id}". Labels Salesforce already
+    creates for every Campaign ("Sent", "Responded") are not inserted again; their Ids are read
+    back by a query subrequest in the same round trip.
+
+    Uses allOrNone=false so one bad status does not roll back the campaign; failures are
+    reported per record. Raises RuntimeError if the Campaign itself could not be created.
+
+    Returns {"campaign_id": str, "statuses": {label: Id}, "errors": {label: message}}.
+    """
+    base = f"/services/data/v{sf.sf_version}"
+    campaign_payload = {"Name": name, **{k: v for k, v in fields.items() if v is not None}}
+    subrequests = [{
+        "method": "POST",
+        "url": f"{base}/sobjects/Campaign",
+        "referenceId": "campaign",
+        "body": campaign_payload,
+    }]
+
+    default_labels = {label.lower() for label in DEFAULT_MEMBER_STATUS_LABELS}
+    wants_defaults = any(label.lower() in default_labels for label in statuses)
+    # Leave room for the campaign insert and the read-back query
+    capacity = COMPOSITE_MAX_SUBREQUESTS - 2
+    reference_labels = {}
+    overflow = []
     for idx, status_label in enumerate(statuses):
-        sort_order = start_sort_order + idx
-        is_default = (status_label == default_status) if default_status else False
-        # Mark "Attended" and "Responded" as having responded
-        has_responded = status_label.lower() in ["attended", "responded"]
-        
+        if status_label.lower() in default_labels:
+            continue
+        if len(reference_labels) >= capacity:
+            overflow.append((idx, status_label))
+            continue
+        sort_order, is_default, has_responded = _member_status_settings(idx, status_label, default_status)
+        reference_id = f"status{idx}"
+        reference_labels[reference_id] = status_label
+        subrequests.append({
+            "method": "POST",
+            "url": f"{base}/sobjects/CampaignMemberStatus",
+            "referenceId": reference_id,
+            "body": {
+                "CampaignId": "@{campaign.id}",
+                "Label": status_label,
+                "SortOrder": sort_order,
+                "IsDefault": is_default,
+                "HasResponded": has_responded,
+            },
+        })
+    if wants_defaults:
+        subrequests.append({
+            "method": "GET",
+            "url": (
+                f"{base}/query?q=SELECT+Id,+Label,+SortOrder,+IsDefault,+HasResponded"
+                "+FROM+CampaignMemberStatus+WHERE+CampaignId+=+'@{campaign.id}'"
+            ),
+            "referenceId": "existing_statuses",
+        })
+
+    response = sf.restful("composite", method="POST", json={
+        "allOrNone": False,
+        "compositeRequest": subrequests,
+    })
+    by_reference = {item.get("referenceId"): item for item in (response or {}).get("compositeResponse", [])}
+
+    campaign_result = by_reference.get("campaign") or {}
+    if campaign_result.get("httpStatusCode") not in (200, 201):
+        raise RuntimeError(
+            f"Salesforce Campaign create (composite) failed: {_composite_errors(campaign_result.get('body'))}"
+        )
+    campaign_id = campaign_result["body"]["id"]
+    campaign_names.put(sf, name, campaign_id)
+
+    created_statuses = {}
+    errors = {}
+    for reference_id, status_label in reference_labels.items():
+        item = by_reference.get(reference_id) or {}
+        if item.get("httpStatusCode") in (200, 201):
+            created_statuses[status_label] = item["body"]["id"]
+            print(f"  Created campaign member status '{status_label}' (id={item['body']['id']})")
+        else:
+            errors[status_label] = _composite_errors(item.get("body"))
+            print(f"  Warning: Failed to create status '{status_label}': {errors[status_label]}")
+
+    if wants_defaults:
+        item = by_reference.get("existing_statuses") or {}
+        existing = {
+            record["Label"].lower(): record
+            for record in (item.get("body") or {}).get("records", [])
+        } if item.get("httpStatusCode") == 200 else {}
+        updates = []
+        for idx, status_label in enumerate(statuses):
+            if status_label.lower() in default_labels:
+                record = existing.get(status_label.lower())
+                if record:
+                    created_statuses[status_label] = record["Id"]
+                    print(f"  Campaign member status '{status_label}' already exists")
+                    changes = _member_status_changes(record, idx, status_label, default_status)
+                    if changes:
+                        updates.append((status_label, {"id": record["Id"], **changes}))
+                else:
+                    errors[status_label] = _composite_errors(item.get("body")) or "not found"
+        # e.g. make a configured default status the campaign default
+        for status_label, outcome in _save_member_statuses(sf, "PATCH", updates):
+            if not outcome.get("success"):
+                errors[status_label] = _collection_errors(outcome)
+                print(f"  Warning: Failed to update status '{status_label}': {errors[status_label]}")
+
+    # More statuses than one composite request can carry: create the rest with the campaign Id
+    for idx, status_label in overflow:
+        sort_order, is_default, has_responded = _member_status_settings(idx, status_label, default_status)
         try:
-            status_id = create_campaign_member_status(
+            created_statuses[status_label] = create_campaign_member_status(
                 sf, campaign_id, status_label, sort_order, is_default, has_responded
             )
-            created_statuses[status_label] = status_id
-            print(f"  Created campaign member status '{status_label}' (id={status_id})")
         except Exception as e:
-            # Check if status already exists
-            error_msg = str(e).lower()
-            if "duplicate" in error_msg or "already exists" in error_msg:
-                print(f"  Campaign member status '{status_label}' already exists")
-                # Try to find existing status
-                escaped_label = status_label.replace("'", "''")
-                query = f"SELECT Id, Label FROM CampaignMemberStatus WHERE CampaignId = '{campaign_id}' AND Label = '{escaped_label}' LIMIT 1"
-                result = sf.query(query)
-                if result.get("records"):
-                    created_statuses[status_label] = result["records"][0]["Id"]
-            else:
-                print(f"  Warning: Failed to create status '{status_label}': {e}")
-    
-    return created_statuses
+            errors[status_label] = str(e)
+            print(f"  Warning: Failed to create status '{status_label}': {e}")
+
+    return {"campaign_id": campaign_id, "statuses": created_statuses, "errors": errors}
+
+
+def _member_record(campaign_id: str, contact_id: str, status: str) -> dict:
+    return {
+        "attributes": {"type": "CampaignMember"},
+        "CampaignId": campaign_id,
+        "ContactId": contact_id,
+        "Status": status,
+    }
+
+
+def _is_lock_error(message: str) -> bool:
+    return "UNABLE_TO_LOCK_ROW" in (message or "")
+
+
+def _insert_members_collections(sf: Salesforce, campaign_id: str, contact_ids: list, status: str) -> dict:
+    """Insert CampaignMembers 200 per call via sObject Collections (allOrNone=false)."""
+    success, failed = [], []
+    pending = list(contact_ids)
+    for attempt in range(LOCK_RETRY_ATTEMPTS + 1):
+        locked = []
+        for i in range(0, len(pending), COLLECTION_BATCH_SIZE):
+            batch = pending[i:i + COLLECTION_BATCH_SIZE]
+            results = sf.restful("composite/sobjects", method="POST", json={
+                "allOrNone": False,
+                "records": [_member_record(campaign_id, cid, status) for cid in batch],
+            }) or []
+            for cid, result in zip(batch, results):
+                if result.get("success"):
+                    success.append({"contact_id": cid, "id": result["id"]})
+                    continue
+                error = _collection_errors(result)
+                if _is_lock_error(error) and attempt < LOCK_RETRY_ATTEMPTS:
+                    locked.append(cid)
+                else:
+                    failed.append({"contact_id": cid, "error": error})
+        if not locked:
+            break
+        print(f"  Retrying {len(locked)} CampaignMember row(s) after UNABLE_TO_LOCK_ROW")
+        time.sleep(2 ** attempt)
+        pending = locked
+    return {"success": success, "failed": failed}
+
+
+class _RewindingUpload:
+    """
+    Request body that streams a spooled file from its start every time it is sent. simple_salesforce
+    re-sends the same body after logging in again on INVALID_SESSION_ID, by which point the first
+    attempt has read the file to EOF; iterating from offset 0 makes every attempt upload it whole.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, f):
+        self._f = f
+        f.seek(0, io.SEEK_END)
+        self._size = f.tell()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        self._f.seek(0)
+        return iter(partial(self._f.read, self.chunk_size), b"")
+
+
+def _bulk2_call(sf: Salesforce, method: str, path: str, **kwargs):
+    """Raw Bulk API 2.0 call relative to /jobs/ (reuses simple_salesforce's session refresh)."""
+    return sf._call_salesforce(method, sf.bulk2_url + path, name="bulk2", **kwargs)
+
+
+def _iter_bulk_results(sf: Salesforce, job_id: str, kind: str):
+    """Stream rows (as dicts) of a job's successfulResults/ or failedResults/ CSV."""
+    r = _bulk2_call(sf, "GET", f"ingest/{job_id}/{kind}/", headers={"Accept": "text/csv"}, stream=True)
+    try:
+        lines = r.iter_lines(decode_unicode=True)
+        yield from csv.DictReader(line for line in lines if line is not None)
+    finally:
+        r.close()
+
+
+def _run_member_ingest_job(sf: Salesforce, spool, success: list, failed: list, locked: list, retry: bool) -> None:
+    """Upload one spooled CSV as a Bulk API 2.0 insert job, wait for it, and collect row results."""
+    job = _bulk2_call(sf, "POST", "ingest", json={
+        "object": "CampaignMember",
+        "operation": "insert",
+        "contentType": "CSV",
+        "lineEnding": "LF",
+    }).json()
+    job_id = job["id"]
+    _bulk2_call(
+        sf, "PUT", f"ingest/{job_id}/batches", data=_RewindingUpload(spool), headers={"Content-Type": "text/csv"}
+    )
+    _bulk2_call(sf, "PATCH", f"ingest/{job_id}", json={"state": "UploadComplete"})
+    print(f"  Bulk API job {job_id} uploaded, waiting for Salesforce to process it...")
+
+    while True:
+        info = _bulk2_call(sf, "GET", f"ingest/{job_id}").json()
+        state = info.get("state")
+        if state in ("JobComplete", "Failed", "Aborted"):
+            break
+        time.sleep(BULK_POLL_SECONDS)
+    if state != "JobComplete":
+        raise RuntimeError(f"Salesforce Bulk API job {job_id} ended in state {state}: {info.get('errorMessage')}")
+    print(f"  Bulk API job {job_id}: {info.get('numberRecordsProcessed', 0)} processed, "
+          f"{info.get('numberRecordsFailed', 0)} failed")
+
+    for row in _iter_bulk_results(sf, job_id, "successfulResults"):
+        success.append({"contact_id": row.get("ContactId"), "id": row.get("sf__Id")})
+    for row in _iter_bulk_results(sf, job_id, "failedResults"):
+        error = row.get("sf__Error", "")
+        if retry and _is_lock_error(error):
+            locked.append(row.get("ContactId"))
+        else:
+            failed.append({"contact_id": row.get("ContactId"), "error": error})
+
+
+def _insert_members_bulk(sf: Salesforce, campaign_id: str, contact_ids: Iterable[str], status: str) -> dict:
+    """
+    Stream CampaignMember rows as CSV into Bulk API 2.0 ingest jobs.
+    Rows are written to a spooled temp file (memory up to BULK_SPOOL_BYTES, then disk), so memory
+    stays flat regardless of input size; a new job is started every BULK_MAX_UPLOAD_BYTES.
+    """
+    success, failed = [], []
+    pending: Iterable[str] = contact_ids
+    for attempt in range(LOCK_RETRY_ATTEMPTS + 1):
+        locked: list = []
+        retry = attempt < LOCK_RETRY_ATTEMPTS
+        spool = None
+        for cid in chain(pending, [None]):
+            if spool is not None and (cid is None or spool.tell() >= BULK_MAX_UPLOAD_BYTES):
+                spool.flush()
+                upload = spool.detach()
+                spool = None
+                try:
+                    _run_member_ingest_job(sf, upload, success, failed, locked, retry)
+                finally:
+                    upload.close()
+            if cid is None:
+                break
+            if spool is None:
+                spool = io.TextIOWrapper(
+                    tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_BYTES), encoding="utf-8", newline=""
+                )
+                writer = csv.writer(spool, lineterminator="\n")
+                writer.writerow(["CampaignId", "ContactId", "Status"])
+            writer.writerow([campaign_id, cid, status])
+        if not locked:
+            break
+        print(f"  Retrying {len(locked)} CampaignMember row(s) after UNABLE_TO_LOCK_ROW")
+        time.sleep(2 ** attempt)
+        if len(locked) <= BULK_MEMBER_THRESHOLD:
+            # Few enough to retry through sObject Collections instead of another job
+            retried = _insert_members_collections(sf, campaign_id, locked, status)
+            success.extend(retried["success"])
+            failed.extend(retried["failed"])
+            break
+        pending = locked
+    return {"success": success, "failed": failed}
+
+
+def load_campaign_members(
+    sf: Salesforce,
+    campaign_id: str,
+    contact_ids: Iterable[str],
+    status: str = "Sent",
+) -> dict:
+    """
+    Add Contacts to a campaign as CampaignMembers, choosing the transport by size:
+    up to BULK_MEMBER_THRESHOLD contacts go through sObject Collections (200 per call), larger
+    inputs are streamed as CSV into Bulk API 2.0 ingest jobs. contact_ids may be any iterable
+    (e.g. a generator over a file); only the first BULK_MEMBER_THRESHOLD ids are held to decide.
+    UNABLE_TO_LOCK_ROW failures are retried with backoff.
+    Returns {"success": [{"contact_id", "id"}], "failed": [{"contact_id", "error"}]}.
+    """
+    ids = iter(contact_ids)
+    head = list(islice(ids, BULK_MEMBER_THRESHOLD + 1))
+    if len(head) <= BULK_MEMBER_THRESHOLD:
+        return _insert_members_collections(sf, campaign_id, head, status)
+    return _insert_members_bulk(sf, campaign_id, chain(head, ids), status)
 
 
 def add_campaign_members(sf: Salesforce, campaign_id: str, contact_ids: list[str]) -> list:
     """
     Add CampaignMembers (Contacts) to a campaign.
     contact_ids: list of Salesforce Contact Ids.
-    Returns list of created CampaignMember ids.
+    Returns list of created CampaignMember ids (see load_campaign_members for per-row failures).
     """
-    created = []
-    for cid in contact_ids:
-        r = sf.CampaignMember.create(
-            {"CampaignId": campaign_id, "ContactId": cid, "Status": "Sent"}
-        )
-        if r.get("success"):
-            created.append(r["id"])
-    return created
+    result = load_campaign_members(sf, campaign_id, contact_ids, status="Sent")
+    return [row["id"] for row in result["success"]]
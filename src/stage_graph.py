@@ -0,0 +1,93 @@
+"""
+Minimal stage-graph executor.
+Stages declare the stages they depend on; every stage whose dependencies are done is started
+on a thread pool, so independent branches overlap. Used by run_campaign to run the HubSpot and
+Salesforce branches (and per-status work) concurrently.
+"""
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Optional
+
+from . import tracing
+
+
+class StageGraph:
+    """
+    Directed acyclic graph of named stages.
+    Each stage is a callable taking the dict of finished stage results (name -> return value).
+    After run(), `timings` holds each stage's wall time in seconds.
+    """
+
+    def __init__(self):
+        self._stages: dict = {}
+        self.results: dict = {}
+        self.timings: dict = {}
+
+    def add(self, name: str, fn: Callable[[dict], object], deps: Iterable[str] = ()) -> str:
+        """Register a stage. Dependencies must already be registered. Returns the stage name."""
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        deps = tuple(deps)
+        missing = [d for d in deps if d not in self._stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {', '.join(missing)}")
+        self._stages[name] = (fn, deps)
+        return name
+
+    def run(
+        self,
+        max_workers: int = 4,
+        completed: Optional[dict] = None,
+        on_done: Optional[Callable[[str, object], None]] = None,
+    ) -> dict:
+        """
+        Execute all stages, at most max_workers at a time. Returns the results dict.
+        If a stage raises, no new stages are started; stages already running are allowed to
+        finish and the first exception is re-raised.
+
+        completed seeds results of stages that already ran (e.g. in an interrupted run); those
+        stages are not executed again. on_done(name, result) is called, from the calling thread,
+        as each stage finishes.
+        """
+        self.results.update(completed or {})
+        remaining = {name: stage for name, stage in self._stages.items() if name not in self.results}
+        running = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="stage") as pool:
+            while remaining or running:
+                if error is None:
+                    ready = [
+                        name for name, (_, deps) in remaining.items()
+                        if all(d in self.results for d in deps)
+                    ]
+                    for name in ready:
+                        fn, _ = remaining.pop(name)
+                        # Stages see the caller's context (e.g. the active run deadline)
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, self._timed, name, fn)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                        if on_done is not None:
+                            on_done(name, self.results[name])
+                    except BaseException as e:
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+        return self.results
+
+    def _timed(self, name: str, fn: Callable[[dict], object]):
+        start = time.perf_counter()
+        try:
+            with tracing.span(name, {"campaign.stage": name}):
+                return fn(self.results)
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
@@ -0,0 +1,249 @@
+"""
+Per-run span tracing.
+run() opens a "campaign.run" span, every stage runs in a child span, and every HubSpot and
+Salesforce HTTP call (through transport.RetryingSession) becomes a client span under the stage
+that made it, with method, templated endpoint, status, latency, retry count and rate-limit
+headers. Spans go to a JSONL file (works offline) or, as OTLP/HTTP JSON, to a collector.
+
+Tracing is off unless an exporter is configured:
+    CAMPAIGN_TRACE_FILE=traces.jsonl                                  # one span per line
+    CAMPAIGN_TRACE_OTLP_ENDPOINT=http://localhost:4318/v1/traces      # OTLP collector
+or in code with tracing.configure(JsonlExporter(path)).
+"""
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from . import transport
+from .metrics import endpoint_template
+
+SERVICE_NAME = os.environ.get("CAMPAIGN_TRACE_SERVICE_NAME", "campaign-automation")
+# Spans buffered by the OTLP exporter before a run ends forces a flush
+OTLP_BATCH_SIZE = 512
+
+KIND_INTERNAL = 1
+KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Response headers copied onto HTTP spans
+_RATE_LIMIT_HEADER_PREFIXES = ("x-hubspot-ratelimit", "sforce-limit-info", "retry-after")
+
+
+class Span:
+    """One timed operation. Times are Unix epoch nanoseconds."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "message")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, kind: int = KIND_INTERNAL, attributes: Optional[dict] = None):
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.message = ""
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.message = f"{type(error).__name__}: {error}"
+        self.attributes["error.type"] = type(error).__name__
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": "client" if self.kind == KIND_CLIENT else "internal",
+            "start": self.start_ns / 1e9,
+            "duration_ms": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "status": "error" if self.status == STATUS_ERROR else "ok",
+            "message": self.message or None,
+            "attributes": self.attributes,
+        }
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> dict:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns or span.start_ns),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+        "status": {"code": span.status, "message": span.message} if span.message else {"code": span.status},
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+class JsonlExporter:
+    """Appends each finished span as one JSON line to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+    def flush(self) -> None:
+        pass
+
+
+class OtlpHttpExporter:
+    """
+    Buffers spans and sends them as OTLP/HTTP JSON (POST <collector>/v1/traces) when a trace's
+    root span ends or the buffer fills. Export failures are reported and dropped, never raised.
+    """
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._spans: list = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            full = len(self._spans) >= OTLP_BATCH_SIZE
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if not spans:
+            return
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "src.tracing"}, "spans": [_otlp_span(span) for span in spans]}],
+            }]
+        }
+        try:
+            # Plain requests (not RetryingSession) so the export is not traced itself
+            r = requests.post(self.endpoint, json=payload, timeout=self.timeout)
+            r.raise_for_status()
+        except requests.RequestException as e:
+            print(f"  ⚠️  Could not export {len(spans)} span(s) to {self.endpoint}: {e}")
+
+
+_exporter = None
+_current: contextvars.ContextVar = contextvars.ContextVar("campaign_trace_span", default=None)
+
+
+def configure(exporter=None) -> None:
+    """Send spans to exporter (None turns tracing off)."""
+    global _exporter
+    _exporter = exporter
+
+
+def configure_from_env() -> None:
+    if os.environ.get("CAMPAIGN_TRACE_OTLP_ENDPOINT"):
+        configure(OtlpHttpExporter(os.environ["CAMPAIGN_TRACE_OTLP_ENDPOINT"]))
+    elif os.environ.get("CAMPAIGN_TRACE_FILE"):
+        configure(JsonlExporter(os.environ["CAMPAIGN_TRACE_FILE"]))
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def _finish(span: Span) -> None:
+    span.end_ns = time.time_ns()
+    exporter = _exporter
+    if exporter is None:
+        return
+    exporter.export(span)
+    if span.parent_id is None:
+        exporter.flush()
+
+
+@contextmanager
+def span(name: str, attributes: Optional[dict] = None) -> Iterator[Optional[Span]]:
+    """
+    Run the enclosed block in a span, a child of the current one. Yields None when tracing is
+    off. Stage threads started by StageGraph inherit the current span through the context.
+    """
+    if _exporter is None:
+        yield None
+        return
+    current = Span(name, _current.get(), attributes=attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        _finish(current)
+
+
+def _trace_request(event: transport.RequestEvent) -> None:
+    if _exporter is None:
+        return
+    parent = _current.get()
+    endpoint = endpoint_template(event.url)
+    attributes = {
+        "http.request.method": event.method,
+        "url.template": endpoint,
+        "server.address": urlsplit(event.url).hostname or "",
+        "campaign.service": event.service or "other",
+        "http.retry_count": event.retries,
+    }
+    if event.status is not None:
+        attributes["http.response.status_code"] = event.status
+    for header, value in (event.headers or {}).items():
+        if header.lower().startswith(_RATE_LIMIT_HEADER_PREFIXES):
+            attributes[f"http.response.header.{header.lower()}"] = value
+    http_span = Span(f"{event.method} {endpoint}", parent, kind=KIND_CLIENT, attributes=attributes)
+    # The listener runs after the call; place the span where the call actually happened
+    http_span.start_ns = int(event.started_at * 1e9)
+    if event.error is not None:
+        http_span.set_error(event.error)
+    elif event.status is not None and event.status >= 400:
+        http_span.status = STATUS_ERROR
+        http_span.message = f"HTTP {event.status}"
+    http_span.end_ns = http_span.start_ns + int(event.seconds * 1e9)
+    _exporter.export(http_span)
+    if parent is None:
+        _exporter.flush()
+
+
+transport.add_request_listener(_trace_request)
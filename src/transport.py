@@ -0,0 +1,242 @@
+"""
+HTTP transport shared by the API clients.
+RetryingSession is a drop-in requests.Session: it paces requests with a token bucket, honors
+rate-limit headers (Retry-After and X-HubSpot-RateLimit-*), and retries 429s, 5xx responses and
+connection errors with jittered exponential backoff. Every request gets a timeout derived from the
+active run deadline (see deadline.py). Every caller of the session (client methods and scripts
+using hs._session directly) gets this behavior automatically.
+
+Request listeners (add_request_listener) see every finished call, retries included, as one
+RequestEvent; metrics.py uses this to count calls and watch rate-limit headers.
+"""
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+
+from . import deadline as run_deadline
+from .deadline import DeadlineExceeded
+
+
+# Methods that are safe to repeat after a 5xx or a dropped connection
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Server errors worth retrying (for idempotent methods)
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+_listeners: list = []
+
+
+class RequestEvent:
+    """
+    One call made through a RetryingSession, passed to request listeners once it has finished.
+    retries counts the attempts after the first; status is None when no response came back
+    (error holds the exception then). headers are the final response's headers.
+    """
+
+    __slots__ = ("service", "method", "url", "started_at", "seconds", "retries", "status", "headers", "error")
+
+    def __init__(self, service: Optional[str], method: str, url: str):
+        self.service = service
+        self.method = method
+        self.url = url
+        self.started_at = time.time()
+        self.seconds = 0.0
+        self.retries = 0
+        self.status: Optional[int] = None
+        self.headers: dict = {}
+        self.error: Optional[BaseException] = None
+
+
+def add_request_listener(listener: Callable[[RequestEvent], None]) -> None:
+    """Call listener(event) after every request made through any RetryingSession."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_request_listener(listener: Callable[[RequestEvent], None]) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second on average, bursts up to `capacity`.
+    pause() blocks all callers until a given time, used when the server says the window is spent.
+    daily_remaining is the API's daily allowance left, as last reported in response headers
+    (None until a response carried it), so callers sharing the bucket can stop before it runs out.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.daily_remaining: Optional[int] = None
+
+    def acquire(self) -> None:
+        """Block until one token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (extends, never shortens, an existing pause)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+            # Refill from the end of the pause, not the last acquire: otherwise the paused interval
+            # comes back as a full burst the moment it ends
+            self._updated = self._paused_until
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class RetryingSession(requests.Session):
+    """
+    requests.Session with pacing, rate-limit awareness and retries.
+
+    - bucket: optional TokenBucket shared by everything that talks to the same API account
+    - rate_limit_prefix: header prefix of the API's rate-limit headers, e.g. "X-HubSpot-RateLimit";
+      when "<prefix>-Remaining" hits 0 the bucket is paused for "<prefix>-Interval-Milliseconds",
+      and "<prefix>-Daily-Remaining" is kept on the bucket (daily_remaining)
+    - 429 responses are retried for every method (the request was not processed); 5xx responses and
+      connection errors only for idempotent methods
+    - timeout: per-request cap in seconds (default deadline.DEFAULT_REQUEST_TIMEOUT); each attempt
+      uses the smaller of the cap and the time left on the current run deadline
+    - service: name reported to request listeners, e.g. "hubspot"
+    """
+
+    def __init__(
+        self,
+        bucket: Optional[TokenBucket] = None,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        rate_limit_prefix: Optional[str] = None,
+        timeout: Optional[float] = None,
+        service: Optional[str] = None,
+    ):
+        super().__init__()
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limit_prefix = rate_limit_prefix
+        self.timeout = timeout
+        self.service = service
+
+    def request(self, method, url, *args, **kwargs):
+        event = RequestEvent(self.service, method.upper(), url)
+        started = time.perf_counter()
+        try:
+            response = self._send(event, *args, **kwargs)
+        except BaseException as e:
+            event.error = e
+            raise
+        else:
+            event.status = response.status_code
+            event.headers = response.headers
+            return response
+        finally:
+            event.seconds = time.perf_counter() - started
+            for listener in list(_listeners):
+                try:
+                    listener(event)
+                except Exception:
+                    # Instrumentation must never fail the call it observes
+                    pass
+
+    def _send(self, event: RequestEvent, *args, **kwargs):
+        method, url = event.method, event.url
+        idempotent = method in IDEMPOTENT_METHODS
+        body = kwargs.get("data")
+        # File-like bodies can only be resent if we can rewind them
+        body_start = body.tell() if hasattr(body, "seek") and hasattr(body, "tell") else None
+        replayable = not hasattr(body, "read") or body_start is not None
+        timeout_cap = kwargs.pop("timeout", None) or self.timeout
+
+        attempt = 0
+        while True:
+            if body_start is not None:
+                body.seek(body_start)
+            if self.bucket is not None:
+                self.bucket.acquire()
+            timeout = run_deadline.request_timeout(timeout_cap, what=f"{method} {url}")
+            try:
+                response = super().request(method, url, *args, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                deadline = run_deadline.current()
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded(f"Run deadline of {deadline.seconds:g}s exceeded during {method} {url}") from e
+                if not (idempotent and replayable and attempt < self.max_retries):
+                    raise
+                self._sleep(self._backoff(attempt))
+                attempt += 1
+                event.retries = attempt
+                continue
+
+            self._observe_rate_limit(response)
+            retry_after = _retry_after_seconds(response)
+            if response.status_code == 429 and replayable and attempt < self.max_retries:
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if self.bucket is not None:
+                    self.bucket.pause(delay)
+                response.close()
+                self._sleep(delay)
+                attempt += 1
+                event.retries = attempt
+                continue
+            if response.status_code in RETRY_STATUSES and idempotent and replayable and attempt < self.max_retries:
+                response.close()
+                self._sleep(retry_after if retry_after is not None else self._backoff(attempt))
+                attempt += 1
+                event.retries = attempt
+                continue
+            return response
+
+    def _observe_rate_limit(self, response: requests.Response) -> None:
+        if not self.rate_limit_prefix or self.bucket is None:
+            return
+        remaining = response.headers.get(f"{self.rate_limit_prefix}-Remaining")
+        interval_ms = response.headers.get(f"{self.rate_limit_prefix}-Interval-Milliseconds")
+        daily_remaining = response.headers.get(f"{self.rate_limit_prefix}-Daily-Remaining")
+        try:
+            if daily_remaining is not None:
+                self.bucket.daily_remaining = int(daily_remaining)
+            if remaining is not None and int(remaining) <= 0:
+                self.bucket.pause(int(interval_ms or 1000) / 1000.0)
+        except ValueError:
+            pass
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _sleep(seconds: float) -> None:
+        deadline = run_deadline.current()
+        if deadline is not None and deadline.remaining() < seconds:
+            raise DeadlineExceeded(f"Run deadline of {deadline.seconds:g}s would be exceeded while backing off")
+        time.sleep(seconds)
@@ -0,0 +1,14 @@
+"""Tests for src/config.py."""
+import pytest
+
+from src.config import CampaignConfig
+
+
+@pytest.mark.parametrize("value", [0, "0", -5])
+def test_deadline_seconds_must_be_positive(value):
+    with pytest.raises(ValueError, match="deadline_seconds must be greater than 0"):
+        CampaignConfig.from_dict({"name": "Spring Summit", "deadline_seconds": value})
+
+
+def test_deadline_seconds_accepts_positive_values():
+    assert CampaignConfig.from_dict({"name": "Spring Summit", "deadline_seconds": "0.5"}).deadline_seconds == 0.5
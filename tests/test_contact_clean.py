@@ -0,0 +1,56 @@
+"""Tests for src/contact_clean.py."""
+import pytest
+
+from src.contact_clean import clean_contacts
+
+RAGGED_CSV = (
+    "Email,First Name,Company\n"
+    "a@x.com,Ann,,\n"  # trailing comma: one cell more than the header
+    "\n"
+    'B@X.com ,"Bo, Jr",Acme,extra,more\n'
+    "c@x.com\n"  # short row
+    "not-an-email,x\n"
+    "a@x.com,dup,,\n"
+    ",,,\n"
+)
+
+
+def _clean(tmp_path, use_pandas, chunk_rows=2):
+    source = tmp_path / "contacts.csv"
+    source.write_text(RAGGED_CSV, encoding="utf-8")
+    output, rejects = tmp_path / f"clean-{use_pandas}.csv", tmp_path / f"rejects-{use_pandas}.csv"
+    report = clean_contacts(source, output, rejects, chunk_rows=chunk_rows, use_pandas=use_pandas)
+    return report, output.read_text(encoding="utf-8"), rejects.read_text(encoding="utf-8")
+
+
+def test_csv_engine_pads_and_cuts_ragged_rows(tmp_path):
+    report, output, _ = _clean(tmp_path, use_pandas=False)
+    assert output.splitlines() == [
+        "email,firstname,company",
+        "a@x.com,Ann,",
+        'b@x.com,"Bo, Jr",Acme',
+        "c@x.com,,",
+    ]
+    assert report["rows"] == 6
+    assert report["rejected"] == {"missing email": 1, "invalid email": 1, "duplicate email": 1}
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 100])
+def test_engines_write_identical_output_for_ragged_rows(tmp_path, chunk_rows):
+    pytest.importorskip("pandas")
+    csv_report, csv_output, csv_rejects = _clean(tmp_path, False, chunk_rows)
+    pandas_report, pandas_output, pandas_rejects = _clean(tmp_path, True, chunk_rows)
+    assert pandas_output == csv_output
+    assert pandas_rejects == csv_rejects
+    for key in ("rows", "clean", "rejected"):
+        assert pandas_report[key] == csv_report[key]
+
+
+def test_pandas_engine_drops_trailing_comma_on_every_row(tmp_path):
+    pytest.importorskip("pandas")
+    source = tmp_path / "contacts.csv"
+    source.write_text("Email,First Name\na@x.com,Ann,\nb@x.com,Bo,\n", encoding="utf-8")
+    output = tmp_path / "clean.csv"
+    report = clean_contacts(source, output, use_pandas=True)
+    assert output.read_text(encoding="utf-8").splitlines() == ["email,firstname", "a@x.com,Ann", "b@x.com,Bo"]
+    assert report["clean"] == 2
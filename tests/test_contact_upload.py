@@ -0,0 +1,49 @@
+"""Tests for src/contact_upload.py."""
+import pytest
+
+from src import deadline as run_deadline
+from src.contact_upload import import_contacts
+
+
+class StuckImportHubSpot:
+    """Imports API stand-in whose import never leaves PROCESSING."""
+
+    def __init__(self):
+        self.polls = 0
+        self.list_adds = []
+
+    def start_contact_import(self, path, mappings, name):
+        return {"id": 42, "state": "STARTED"}
+
+    def get_import(self, import_id):
+        self.polls += 1
+        return {"id": import_id, "state": "PROCESSING", "metadata": {"counters": {"CREATED_OBJECTS": 1}}}
+
+    def add_list_members_from(self, list_id, source_list_id):
+        self.list_adds.append((list_id, source_list_id))
+
+
+@pytest.fixture
+def contacts(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text("email,firstname\na@x.com,Ann\nb@x.com,Bo\n", encoding="utf-8")
+    return path
+
+
+def test_import_stops_waiting_after_max_wait(contacts):
+    hs = StuckImportHubSpot()
+    report = import_contacts(hs, contacts, list_id="7", poll_seconds=0.01, progress=False, max_wait_seconds=0.05)
+    assert report["import_id"] == "42"
+    assert "still PROCESSING" in report["stopped"]
+    assert report["failed"] == 0
+    assert hs.polls >= 1
+    assert hs.list_adds == []
+
+
+def test_import_stops_waiting_at_run_deadline(contacts):
+    hs = StuckImportHubSpot()
+    with run_deadline.activate(0.05):
+        report = import_contacts(hs, contacts, list_id="7", poll_seconds=0.01, progress=False)
+    assert report["import_id"] == "42"
+    assert "still PROCESSING" in report["stopped"]
+    assert report["seconds"] < 1
@@ -0,0 +1,137 @@
+"""Tests for src/run_campaign.py."""
+import pytest
+
+from src import run_campaign
+from src.journal import RunJournal
+
+CONFIG = {
+    "name": "Spring Summit",
+    "salesforce": {"member_statuses": ["Registered", "Attended"]},
+    "hubspot": {
+        "list_ids": ["11", "12"],
+        "list_status_map": {"11": "Registered", "12": "Attended"},
+        "create_workflows": True,
+    },
+}
+
+
+class FakeHubSpot:
+    def __init__(self, workflows=()):
+        self.workflows = list(workflows)
+        self.created_workflows = []
+
+    def build_properties(self, **fields):
+        return {"hs_name": fields["name"]}
+
+    def create_campaign(self, properties):
+        return {"id": "hs-1"}
+
+    def associate_list(self, campaign_id, list_id):
+        pass
+
+    def list_workflows(self):
+        return self.workflows
+
+    def create_workflow_with_enrollment(self, workflow_name, **kwargs):
+        self.created_workflows.append(workflow_name)
+        return {"id": f"wf-{len(self.created_workflows)}"}
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError("resumed run created a Salesforce campaign that already exists")
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return RunJournal(str(tmp_path / "journal.sqlite3"))
+
+
+def test_resume_after_crash_before_first_journal_write_does_not_duplicate(journal, monkeypatch):
+    monkeypatch.setenv("ZAPIER_CAMPAIGN_CREATED_WEBHOOK", "")
+    # The crash came after the Salesforce campaign and one workflow were created, but before
+    # any stage was recorded: the journal holds the run and nothing else
+    run_id = journal.start_run(CONFIG["name"], CONFIG)
+    assert journal.completed_steps(run_id) == {}
+    monkeypatch.setattr(run_campaign, "sf_find_campaign_by_name", lambda sf, name: "701EXISTING")
+    monkeypatch.setattr(run_campaign, "sf_create_campaign", _fail)
+    monkeypatch.setattr(run_campaign, "create_campaign_with_statuses", _fail)
+    monkeypatch.setattr(run_campaign, "create_campaign_member_statuses", lambda sf, campaign_id, statuses: {})
+    hs = FakeHubSpot(workflows=[{"name": "Spring Summit - Registered", "id": "wf-existing"}])
+
+    result = run_campaign.run(CONFIG, hs=hs, sf=object(), journal=journal, run_id=run_id)
+
+    assert result["salesforce_campaign_id"] == "701EXISTING"
+    assert hs.created_workflows == ["Spring Summit - Attended"]
+    assert {w["name"]: w["id"] for w in result["hubspot_workflows"]} == {
+        "Spring Summit - Registered": "wf-existing",
+        "Spring Summit - Attended": "wf-1",
+    }
+
+
+def test_new_run_skips_existing_checks(journal, monkeypatch):
+    monkeypatch.setenv("ZAPIER_CAMPAIGN_CREATED_WEBHOOK", "")
+    monkeypatch.setattr(run_campaign, "sf_find_campaign_by_name", _fail)
+    monkeypatch.setattr(
+        run_campaign,
+        "create_campaign_with_statuses",
+        lambda sf, name, statuses, **fields: {"campaign_id": "701NEW", "statuses": {s: s for s in statuses}, "errors": {}},
+    )
+    hs = FakeHubSpot()
+    hs.list_workflows = _fail
+
+    result = run_campaign.run(CONFIG, hs=hs, sf=object(), journal=journal)
+
+    assert result["salesforce_campaign_id"] == "701NEW"
+    assert sorted(hs.created_workflows) == ["Spring Summit - Attended", "Spring Summit - Registered"]
+
+
+def test_failed_client_setup_leaves_no_running_run(journal, monkeypatch):
+    def no_token():
+        raise ValueError("HUBSPOT_ACCESS_TOKEN is not set")
+
+    monkeypatch.setattr(run_campaign, "get_hubspot", no_token)
+    with pytest.raises(ValueError, match="HUBSPOT_ACCESS_TOKEN"):
+        run_campaign.run(CONFIG, sf=object(), journal=journal)
+    assert journal.recent_runs() == []
+
+
+def test_failed_workflow_listing_on_resume_keeps_run_status(journal):
+    run_id = journal.start_run(CONFIG["name"], CONFIG)
+    journal.finish_run(run_id, RuntimeError("crashed"))
+    hs = FakeHubSpot()
+
+    def unavailable():
+        raise ConnectionError("HubSpot unavailable")
+
+    hs.list_workflows = unavailable
+    with pytest.raises(ConnectionError):
+        run_campaign.run(CONFIG, hs=hs, sf=object(), journal=journal, run_id=run_id)
+    assert journal.get_run(run_id)["status"] == "failed"
+
+
+def test_member_statuses_failed_in_composite_request_are_retried(journal, monkeypatch):
+    monkeypatch.setenv("ZAPIER_CAMPAIGN_CREATED_WEBHOOK", "")
+    monkeypatch.setattr(
+        run_campaign,
+        "create_campaign_with_statuses",
+        lambda sf, name, statuses, **fields: {
+            "campaign_id": "701NEW",
+            "statuses": {"Registered": "01Y1"},
+            "errors": {"Attended": "DUPLICATE_VALUE: duplicate value found"},
+        },
+    )
+    retried = []
+
+    def create_statuses(sf, campaign_id, statuses):
+        retried.append((campaign_id, statuses))
+        return {"Registered": "01Y1", "Attended": "01Y2"}
+
+    monkeypatch.setattr(run_campaign, "create_campaign_member_statuses", create_statuses)
+
+    result = run_campaign.run(CONFIG, hs=FakeHubSpot(), sf=object(), journal=journal)
+
+    assert retried == [("701NEW", ["Registered", "Attended"])]
+    assert journal.completed_steps(result["run_id"])["salesforce.member_statuses"] == {
+        "Registered": "01Y1",
+        "Attended": "01Y2",
+    }
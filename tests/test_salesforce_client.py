@@ -0,0 +1,65 @@
+"""Tests for src/salesforce_client.py."""
+import io
+import json
+
+import requests
+from requests.adapters import BaseAdapter
+from simple_salesforce import Salesforce
+
+from src.salesforce_client import _insert_members_bulk
+
+
+class ExpiringSessionAdapter(BaseAdapter):
+    """Bulk API 2.0 stand-in that rejects the first CSV upload with INVALID_SESSION_ID."""
+
+    def __init__(self):
+        super().__init__()
+        self.uploads = []
+
+    def send(self, request, **kwargs):
+        path = request.path_url.split("/jobs/", 1)[-1].split("?")[0]
+        if request.method == "PUT":
+            body = request.body if isinstance(request.body, bytes) else b"".join(request.body)
+            self.uploads.append((request.headers["Authorization"], body))
+            if len(self.uploads) == 1:
+                return self._response(request, 401, [{"errorCode": "INVALID_SESSION_ID", "message": "expired"}])
+            return self._response(request, 201, None)
+        if request.method == "POST":
+            return self._response(request, 200, {"id": "750JOB"})
+        if path.endswith("successfulResults/"):
+            return self._response(request, 200, "sf__Id,sf__Created,CampaignId,ContactId,Status\n"
+                                                "00vA,true,701C,003A,Sent\n00vB,true,701C,003B,Sent\n")
+        if path.endswith("failedResults/"):
+            return self._response(request, 200, "sf__Id,sf__Error,CampaignId,ContactId,Status\n")
+        return self._response(request, 200, {"state": "JobComplete", "numberRecordsProcessed": 2})
+
+    @staticmethod
+    def _response(request, status, body):
+        response = requests.Response()
+        response.status_code = status
+        response.request = request
+        response.url = request.url
+        response.encoding = "utf-8"
+        content = body if isinstance(body, str) else json.dumps(body)
+        response.raw = io.BytesIO(content.encode())
+        return response
+
+    def close(self):
+        pass
+
+
+def test_bulk_upload_resends_whole_csv_after_session_refresh():
+    adapter = ExpiringSessionAdapter()
+    session = requests.Session()
+    session.mount("https://", adapter)
+    sf = Salesforce(instance="example.my.salesforce.com", session_id="expired", session=session)
+    sf._salesforce_login_partial = lambda: ("fresh", "example.my.salesforce.com")
+
+    result = _insert_members_bulk(sf, "701C", ["003A", "003B"], "Sent")
+
+    assert len(adapter.uploads) == 2
+    (first_auth, first_body), (second_auth, second_body) = adapter.uploads
+    assert (first_auth, second_auth) == ("Bearer expired", "Bearer fresh")
+    assert second_body == first_body == b"CampaignId,ContactId,Status\n701C,003A,Sent\n701C,003B,Sent\n"
+    assert [row["contact_id"] for row in result["success"]] == ["003A", "003B"]
+    assert result["failed"] == []
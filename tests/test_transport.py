@@ -0,0 +1,16 @@
+"""Tests for src/transport.py."""
+import time
+
+from src.transport import TokenBucket
+
+
+def test_pause_does_not_refill_for_the_paused_interval():
+    bucket = TokenBucket(rate=10, capacity=10)
+    for _ in range(10):
+        bucket.acquire()
+    started = time.monotonic()
+    bucket.pause(0.5)
+    bucket.acquire()
+    bucket.acquire()
+    # Tokens accrue only once the pause ends: 0.1s each at 10/s, not a burst of 10
+    assert time.monotonic() - started >= 0.65
@@ -0,0 +1,48 @@
+"""Tests for webhook_server.py."""
+import pytest
+
+import webhook_server
+from src.idempotency import IdempotencyCache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    runs = []
+
+    def fake_run(config):
+        runs.append(config)
+        return {"campaign_name": config.name, "hubspot_campaign_id": "hs-1", "salesforce_campaign_id": "701A"}
+
+    monkeypatch.setattr(webhook_server, "run_campaign", fake_run)
+    monkeypatch.setattr(webhook_server, "completed_submissions", IdempotencyCache())
+    webhook_server.app.config["TESTING"] = True
+    with webhook_server.app.test_client() as client:
+        client.runs = runs
+        yield client
+
+
+def test_differently_formatted_duplicate_submissions_run_once(client):
+    first = {
+        "campaign_name": "Spring Summit",
+        "campaign_start_date": "2026-11-01",
+        "campaign_end_date": "2026-11-02",
+        "campaign_member_statuses": "Registered, Attended",
+    }
+    # Same campaign once normalized: other field spellings, US dates, blank optional fields
+    second = {
+        "campaignname": "Spring Summit",
+        "startdate": "11/1/2026",
+        "enddate": "11/02/26",
+        "memberstatuses": "Registered;Attended",
+        "wait_minutes": "10",
+        "parent_campaign": "  ",
+        "webhook_url": " ",
+    }
+
+    first_response = client.post("/webhook/campaign-create", json=first)
+    second_response = client.post("/webhook/campaign-create", json=second)
+
+    assert first_response.status_code == second_response.status_code == 200
+    assert len(client.runs) == 1
+    assert second_response.headers.get("Idempotent-Replayed") == "true"
+    assert second_response.get_json()["data"] == first_response.get_json()["data"]
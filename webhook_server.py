@@ -3,11 +3,14 @@ Webhook server for HubSpot form submissions.
 HubSpot landing page form → Webhook → Campaign creation
 """
 import os
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, url_for
 from dotenv import load_dotenv
 from src.run_campaign import run as run_campaign
-import tempfile
-import yaml
+from src.config import CampaignConfig
+from src.jobs import QueueFullError, runner_from_env
+from src.deadline import DeadlineExceeded
+from src.idempotency import IdempotencyCache, config_fingerprint
+from src import metrics
 import logging
 
 load_dotenv()
@@ -19,7 +22,19 @@ logger = logging.getLogger(__name__)
 # Add CORS support - Allow all origins for webhook (HubSpot domains)
 from flask_cors import CORS
 # Allow all origins for webhook endpoints to support HubSpot landing pages
-CORS(app, origins="*", methods=["GET", "POST", "OPTIONS"], allow_headers=["Content-Type", "Authorization", "X-Requested-With"])
+CORS(app, origins="*", methods=["GET", "POST", "OPTIONS"], allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Prefer", "X-Deadline-Seconds", "Idempotency-Key"])
+
+# Async mode: campaign creation runs on a bounded background pool and the webhook returns 202.
+# Opt in per request (?async=true or "Prefer: respond-async") or for all requests with CAMPAIGN_ASYNC_MODE=true.
+# Job state lives in this process, so run a single gunicorn worker (the Procfile default) when using it.
+job_runner = runner_from_env()
+ASYNC_BY_DEFAULT = os.environ.get("CAMPAIGN_ASYNC_MODE", "").lower() in ("1", "true", "yes")
+
+# Duplicate submissions (double-clicks, the form interceptor firing twice) return the cached
+# result or join the run in flight instead of creating everything again.
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("CAMPAIGN_IDEMPOTENCY_TTL_SECONDS", "600"))
+completed_submissions = IdempotencyCache(ttl_seconds=IDEMPOTENCY_TTL_SECONDS)
+queued_submissions = IdempotencyCache(ttl_seconds=IDEMPOTENCY_TTL_SECONDS)
 
 
 def hubspot_form_to_config(form_data):
@@ -154,6 +169,56 @@ def hubspot_form_to_config(form_data):
     return config
 
 
+def wants_async(req):
+    """Return True if this request asked for (or defaults to) async job mode."""
+    flag = req.args.get("async")
+    if flag is not None:
+        return flag.lower() in ("1", "true", "yes")
+    if "respond-async" in req.headers.get("Prefer", "").lower():
+        return True
+    return ASYNC_BY_DEFAULT
+
+
+def idempotency_key(req, config):
+    """Idempotency-Key header if sent, otherwise a fingerprint of the normalized config."""
+    header = (req.headers.get("Idempotency-Key") or "").strip()
+    if header:
+        return f"key:{header}"
+    return f"config:{config_fingerprint(config)}"
+
+
+def request_deadline_seconds(req):
+    """Optional run time budget from ?deadline_seconds= or the X-Deadline-Seconds header."""
+    value = req.args.get("deadline_seconds") or req.headers.get("X-Deadline-Seconds")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid deadline_seconds: {value}")
+    if seconds <= 0:
+        raise ValueError(f"Invalid deadline_seconds: {value}")
+    return seconds
+
+
+def campaign_result_data(result):
+    """Subset of the run_campaign result returned to the landing page."""
+    return {
+        "campaign_name": result.get("campaign_name"),
+        "hubspot_campaign_id": result.get("hubspot_campaign_id"),
+        "salesforce_campaign_id": result.get("salesforce_campaign_id"),
+        "hubspot_list_ids": result.get("hubspot_list_ids", []),
+        "hubspot_workflows": result.get("hubspot_workflows", []),
+    }
+
+
+def create_campaign_from_config(config):
+    """Run campaign creation for a config dict (or CampaignConfig) and return the response data."""
+    result = run_campaign(config)
+    logger.info(f"Campaign created successfully: {result}")
+    return campaign_result_data(result)
+
+
 @app.route("/webhook/campaign-create", methods=["POST", "OPTIONS"])
 def webhook_campaign_create():
     # Handle preflight requests
@@ -174,40 +239,75 @@ def webhook_campaign_create():
         
         # Convert to config
         config = hubspot_form_to_config(data)
+        deadline_seconds = request_deadline_seconds(request)
+        if deadline_seconds:
+            config["deadline_seconds"] = deadline_seconds
+        # Validate up front so a bad submission gets a 400 before anything is queued or created
+        campaign_config = CampaignConfig.from_dict(config)
         
-        # Create temporary YAML file
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
-            temp_path = f.name
+        key = idempotency_key(request, campaign_config.to_dict())
         
-        try:
-            # Run campaign creation
-            result = run_campaign(temp_path)
-            
-            # Clean up temp file
-            os.unlink(temp_path)
-            
-            logger.info(f"Campaign created successfully: {result}")
-            
-            # Return success response
-            return jsonify({
-                "status": "success",
-                "message": "Campaign created successfully",
-                "data": {
-                    "campaign_name": result.get("campaign_name"),
-                    "hubspot_campaign_id": result.get("hubspot_campaign_id"),
-                    "salesforce_campaign_id": result.get("salesforce_campaign_id"),
-                    "hubspot_list_ids": result.get("hubspot_list_ids", []),
-                    "hubspot_workflows": result.get("hubspot_workflows", []),
-                }
-            }), 200
-            
-        except Exception as e:
-            # Clean up temp file on error
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            raise e
+        if wants_async(request):
+            try:
+                job_id, replayed = queued_submissions.run(
+                    key, lambda: job_runner.submit(create_campaign_from_config, campaign_config)
+                )
+                job = job_runner.get(job_id)
+                if replayed and (job is None or job["status"] == "failed"):
+                    # The earlier job failed or expired: let this submission try again
+                    queued_submissions.forget(key)
+                    job_id, replayed = queued_submissions.run(
+                        key, lambda: job_runner.submit(create_campaign_from_config, campaign_config)
+                    )
+            except QueueFullError as e:
+                logger.warning(f"Rejected campaign submission: {e}")
+                response = jsonify({
+                    "status": "error",
+                    "message": str(e),
+                })
+                response.headers["Retry-After"] = "30"
+                return response, 429
+
+            if replayed:
+                logger.info(f"Duplicate submission joined campaign creation job {job_id}")
+            else:
+                logger.info(f"Queued campaign creation job {job_id}")
+            status_url = url_for("job_status", job_id=job_id)
+            response = jsonify({
+                "status": "accepted",
+                "message": "Campaign creation queued",
+                "job_id": job_id,
+                "status_url": status_url,
+            })
+            response.headers["Location"] = status_url
+            if replayed:
+                response.headers["Idempotent-Replayed"] = "true"
+            return response, 202
+        
+        # Run campaign creation (or reuse the result of an identical submission)
+        data, replayed = completed_submissions.run(key, lambda: create_campaign_from_config(campaign_config))
+        if replayed:
+            logger.info(f"Duplicate submission served from idempotency cache: {data.get('campaign_name')}")
+        
+        # Return success response
+        response = jsonify({
+            "status": "success",
+            "message": "Campaign created successfully",
+            "data": data,
+        })
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return response, 200
             
+    except DeadlineExceeded as e:
+        logger.error(f"Campaign creation timed out: {e}")
+        return jsonify({
+            "status": "error",
+            "message": f"Campaign creation did not finish in time: {str(e)}",
+            "data": campaign_result_data(e.partial) if e.partial else None,
+            "completed_stages": (e.partial or {}).get("completed_stages", []),
+        }), 504
+        
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         return jsonify({
@@ -223,12 +323,39 @@ def webhook_campaign_create():
         }), 500
 
 
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """Status and result of an async campaign creation job."""
+    job = job_runner.get(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown or expired job: {job_id}"
+        }), 404
+    
+    return jsonify({
+        "job_id": job["id"],
+        "status": job["status"],
+        "submitted_at": job["submitted_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "data": job["result"],
+        "error": job["error"],
+    }), 200
+
+
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint."""
     return jsonify({"status": "ok"}), 200
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus metrics: stage timings, API calls per endpoint, rate-limit headroom."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     # Check required environment variables
     required_vars = ["HUBSPOT_ACCESS_TOKEN", "SALESFORCE_USERNAME", "SALESFORCE_PASSWORD"]
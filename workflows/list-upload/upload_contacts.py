@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Upload contacts from a CSV file to a HubSpot static list (segment).
+Thin wrapper around src/contact_upload.py, so the workflow can be run from its own folder:
+
+    python workflows/list-upload/upload_contacts.py attendees.csv "Event Attendees - Registered"
+    python workflows/list-upload/upload_contacts.py attendees.csv --list-id 12345678
+"""
+import os
+import sys
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.contact_upload import main
+
+if __name__ == "__main__":
+    main()